@@ -0,0 +1,298 @@
+"""Asyncio (ASGI) serving mode for the leaderboard API.
+
+Exposes the same JSON routes as server.py on an event loop, without Flask:
+
+    GET  /players[?offset=&limit=&live=1]
+    GET  /player/<name>                GET  /player/<name>/rank
+    GET  /player/<name>/around[?radius=]
+    POST /add_player                   POST /update_player
+    POST /remove_player                POST /record_match
+    POST /record_matches               GET  /events (server-sent events)
+
+Mutations go through AsyncLeaderboard (the single-writer service), reads
+come from its lock-free snapshots, so no request ever blocks the loop.
+GET responses are cached per snapshot version and carry an ETag; a
+matching If-None-Match gets a 304.
+
+Run with any ASGI server, e.g.:
+
+    uvicorn asgi_server:app --port 8000
+
+or `python asgi_server.py`, which starts uvicorn if it is installed.
+"""
+
+import asyncio
+import json
+import os
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from live import KEEPALIVE_FRAME, AsyncSubscription
+from persistence import LeaderboardStore
+from response_cache import ResponseCache, etag_matches
+from service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, AsyncLeaderboard, LeaderboardService, StandingsSnapshot
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int_arg(query: Dict[str, list], name: str, default: int) -> int:
+    try:
+        return int(query[name][0])
+    except (KeyError, IndexError, ValueError):
+        return default
+
+
+def _dumps(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+class LeaderboardApp:
+    """Minimal ASGI application serving the leaderboard routes."""
+
+    def __init__(self, data_dir: str, name: str = "Main", k_factor: float = 32):
+        self.data_dir = data_dir
+        self.name = name
+        self.k_factor = k_factor
+        self.store: Optional[LeaderboardStore] = None
+        self.service: Optional[LeaderboardService] = None
+        self.board: Optional[AsyncLeaderboard] = None
+        self.cache = ResponseCache()
+
+    # ----- lifecycle -----
+
+    def startup(self) -> None:
+        if self.board is None:
+            self.store = LeaderboardStore(self.data_dir)
+            lb = self.store.load(self.name, k_factor=self.k_factor)
+            self.service = LeaderboardService(lb, self.store)
+            self.service.attach_broadcaster()
+            self.board = AsyncLeaderboard(self.service)
+
+    def shutdown(self) -> None:
+        if self.service is not None:
+            self.service.close()
+        if self.store is not None:
+            self.store.close()
+        self.store = self.service = self.board = None
+
+    # ----- routes -----
+
+    # GET handlers are given the snapshot their response is cached under
+
+    async def get_players(self, snap: StandingsSnapshot, query: Dict[str, list]):
+        # without paging parameters keep returning the full standings array
+        if "offset" not in query and "limit" not in query:
+            return list(snap.players)
+        offset = max(0, _int_arg(query, "offset", 0))
+        limit = min(MAX_PAGE_SIZE, max(0, _int_arg(query, "limit", DEFAULT_PAGE_SIZE)))
+        return {"version": snap.version, "total": snap.total, "offset": offset, "limit": limit,
+                "players": snap.page(offset, limit)}
+
+    async def get_player(self, name: str, snap: StandingsSnapshot, query: Dict[str, list]):
+        p = snap.get(name)
+        if p is None:
+            raise HTTPError(404, "Player not found")
+        return p
+
+    async def get_player_rank(self, name: str, snap: StandingsSnapshot, query: Dict[str, list]):
+        rank = snap.rank(name)
+        if rank is None:
+            raise HTTPError(404, "Player not found")
+        return {"name": name, "rank": rank, "total": snap.total}
+
+    async def get_players_around(self, name: str, snap: StandingsSnapshot, query: Dict[str, list]):
+        if snap.get(name) is None:
+            raise HTTPError(404, "Player not found")
+        radius = min(MAX_PAGE_SIZE // 2, max(0, _int_arg(query, "radius", 5)))
+        offset, players = snap.around(name, radius)
+        return {"name": name, "rank": snap.rank(name), "total": snap.total, "offset": offset, "players": players}
+
+    async def add_player(self, query: Dict[str, list], body: Optional[dict]):
+        data = body or {}
+        try:
+            return await self.board.add_player(data["name"], int(data.get("wins", 0)), int(data.get("losses", 0)))  # type: ignore[union-attr]
+        except ValueError as exc:
+            raise HTTPError(400, str(exc))
+
+    async def update_player(self, query: Dict[str, list], body: Optional[dict]):
+        data = body or {}
+        name = data.get("name")
+        try:
+            return await self.board.update_player(name, int(data.get("wins", 0)), int(data.get("losses", 0)))  # type: ignore[union-attr]
+        except KeyError:
+            raise HTTPError(404, f"Player '{name}' not found")
+
+    async def remove_player(self, query: Dict[str, list], body: Optional[dict]):
+        name = (body or {})["name"]
+        await self.board.remove_player(name)  # type: ignore[union-attr]
+        return {"message": f"removed {name}"}
+
+    async def record_match(self, query: Dict[str, list], body: Optional[dict]):
+        data = body or {}
+        winner, loser = data["winner"], data["loser"]
+        await self.board.record_match(winner, loser)  # type: ignore[union-attr]
+        return {"message": f"{winner} defeated {loser}"}
+
+    async def record_matches(self, query: Dict[str, list], body: Optional[dict]):
+        # body: {"matches": [{"winner": "a", "loser": "b"}, ["c", "d"], ...]}
+        matches = (body or {}).get("matches", [])
+        pairs = [(m.get("winner"), m.get("loser")) if isinstance(m, dict) else m for m in matches]
+        return await self.board.record_matches(pairs)  # type: ignore[union-attr]
+
+    def _route(self, method: str, path: str) -> Tuple[Callable[..., Awaitable], tuple]:
+        static = {
+            ("GET", "/players"): self.get_players,
+            ("POST", "/add_player"): self.add_player,
+            ("POST", "/update_player"): self.update_player,
+            ("POST", "/remove_player"): self.remove_player,
+            ("POST", "/record_match"): self.record_match,
+            ("POST", "/record_matches"): self.record_matches,
+        }
+        handler = static.get((method, path))
+        if handler is not None:
+            return handler, ()
+        parts = path.split("/")
+        # /player/<name>[/rank|/around]
+        if method == "GET" and len(parts) in (3, 4) and parts[1] == "player" and parts[2]:
+            name = parts[2]  # ASGI paths arrive already percent-decoded
+            if len(parts) == 3:
+                return self.get_player, (name,)
+            if parts[3] == "rank":
+                return self.get_player_rank, (name,)
+            if parts[3] == "around":
+                return self.get_players_around, (name,)
+        raise HTTPError(404, "Not found")
+
+    # ----- ASGI plumbing -----
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        # servers that skip lifespan events still get a working app
+        self.startup()
+
+        if scope["method"] == "GET" and scope["path"] == "/events":
+            await self._events(receive, send)
+            return
+
+        status, payload, etag = 200, None, None
+        try:
+            handler, args = self._route(scope["method"], scope["path"])
+            query_string = scope.get("query_string", b"").decode("latin-1")
+            query = parse_qs(query_string)
+            if scope["method"] == "POST":
+                payload = await handler(*args, query, await self._read_json(receive))
+            else:
+                if scope["path"] == "/players" and "live" in query:
+                    # the standings last pushed to /events, which the next delta applies to
+                    snap = self.service.broadcaster.snapshot()  # type: ignore[union-attr]
+                else:
+                    snap = self.board.snapshot()  # type: ignore[union-attr]
+                key = f"{scope['path']}?{query_string}"
+                cached = self.cache.lookup(key, snap.version)
+                if cached is None:
+                    body = _dumps(await handler(*args, snap, query))
+                    etag = self.cache.store(key, snap.version, body)
+                else:
+                    body, etag = cached
+                if etag_matches(_header(scope, b"if-none-match"), etag):
+                    await self._respond(send, 304, b"", etag)
+                else:
+                    await self._respond(send, 200, body, etag)
+                return
+        except HTTPError as exc:
+            status, payload = exc.status, {"error": exc.message}
+        except KeyError as exc:
+            status, payload = 404, {"error": str(exc).strip("'\"")}
+        except (TypeError, ValueError) as exc:
+            status, payload = 400, {"error": str(exc)}
+        await self._respond(send, status, _dumps(payload))
+
+    async def _respond(self, send, status: int, body: bytes, etag: Optional[str] = None) -> None:
+        headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        if etag is not None:
+            headers.append((b"etag", etag.encode("latin-1")))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _events(self, receive, send, keepalive: float = 15.0) -> None:
+        """Stream the broadcaster's SSE frames until the client disconnects."""
+        broadcaster = self.service.broadcaster  # type: ignore[union-attr]
+        sub = broadcaster.subscribe(AsyncSubscription(asyncio.get_running_loop()))
+
+        async def disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        gone = asyncio.ensure_future(disconnect())
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+            })
+            frame: Optional[bytes] = broadcaster.reset_frame()
+            while True:
+                await send({"type": "http.response.body", "body": frame or KEEPALIVE_FRAME, "more_body": True})
+                nxt = asyncio.ensure_future(sub.next(keepalive))
+                await asyncio.wait({nxt, gone}, return_when=asyncio.FIRST_COMPLETED)
+                if gone.done():
+                    nxt.cancel()
+                    return
+                frame = nxt.result()
+        finally:
+            gone.cancel()
+            broadcaster.unsubscribe(sub)
+
+    async def _read_json(self, receive) -> Optional[dict]:
+        chunks = []
+        more = True
+        while more:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        raw = b"".join(chunks)
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise HTTPError(400, "request body must be JSON")
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+# not server.py's ./data: each directory belongs to one running store (see persistence)
+DATA_DIR = os.environ.get("LEADERBOARD_DATA_DIR",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "data-asgi"))
+app = LeaderboardApp(DATA_DIR)
+
+
+if __name__ == "__main__":
+    import uvicorn  # optional dependency, only needed to serve directly
+
+    uvicorn.run(app, host="127.0.0.1", port=int(os.environ.get("PORT", 8000)))
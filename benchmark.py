@@ -0,0 +1,603 @@
+"""Benchmark suite for the leaderboard, Elo and HTTP hot paths.
+
+Builds synthetic leagues of each requested size (players with random
+records, matches biased towards the stronger player) and times:
+
+    micro   Leaderboard construction, record_match, record_matches,
+            standings, top_n, page, find_index, rank, Elo.update_ratings,
+            calculate_rating_from_record (uniform records up to 500/500 and
+            a realistic mix of careers), ratings_from_records,
+            PlayerTable.order and snapshot builds
+    http    GET /players pages, GET /player/<name> and POST /record_match
+            through the Flask test client (needs flask installed; skipped
+            otherwise)
+
+Every benchmark runs `--repeat` times and reports the best time per
+operation. Results are written as JSON (`--json`), and `--baseline`
+compares them with an earlier results file, flagging benchmarks whose
+time per operation moved by more than `--threshold`:
+
+    python benchmark.py --sizes 1000 100000 --json bench.json
+    python benchmark.py --sizes 1000 100000 --baseline bench.json --fail-on-regression
+
+`--compare` does the second step against the committed
+benchmark_baseline.json (at the sizes recorded in it, unless --sizes is
+given; the 1e6 rows only with --large) and exits with status 1 on any
+regression. After an intended change in performance, refresh the
+baseline on the reference machine:
+
+    python benchmark.py --large --json benchmark_baseline.json
+    python benchmark.py --compare
+
+`--large` adds a 1e6-player league to the sizes. It is opt-in because it
+takes minutes and a few GB of memory.
+
+`--check` runs scaling checks instead: assertions about how costs grow
+with the board (a record_matches batch is no slower per match than a
+record_match loop at 1e5 players; a service write costs about the same
+at 1e3 and 1e5 players; a PlayerTable row takes under an eighth of the
+memory of a board's player) that fail with exit status 1.
+
+Operation counts are capped (`--max-ops`, `--http-ops`) so the largest
+sizes measure per-operation cost at scale without running for hours.
+Results are machine-specific; compare runs from the same machine. Each
+run also times a fixed calibration workload, and comparisons divide out
+the difference in machine speed between the two runs.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from columnar import PlayerTable
+from elo import Elo
+from leaderboard import Leaderboard, Player
+from service import LeaderboardService, StandingsSnapshot
+
+DEFAULT_SIZES = (1_000, 100_000)
+# opt-in (--large): building and timing a 1e6-player league takes minutes and a few GB
+LARGE_SIZE = 1_000_000
+# committed results of a --large run, compared against by --compare
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+# benchmark name -> (group, setup); setup(league, ops) returns a callable doing the work
+_BENCHMARKS: Dict[str, Tuple[str, Callable]] = {}
+
+
+def bench(name: str, group: str = "micro"):
+    def register(setup):
+        _BENCHMARKS[name] = (group, setup)
+        return setup
+    return register
+
+
+# ----- synthetic data -----
+
+class League:
+    """A seeded synthetic league: player rows plus a match stream."""
+
+    def __init__(self, size: int, seed: int = 1):
+        self.size = int(size)
+        self.rng = random.Random(seed)
+        rng = self.rng
+        self.rows = [
+            {"name": f"player{i:07d}", "winRecord": rng.randint(0, 60), "lossRecord": rng.randint(0, 60),
+             "rating": round(rng.gauss(1500, 200), 2)}
+            for i in range(self.size)
+        ]
+        self.names = [r["name"] for r in self.rows]
+        self._board: Optional[Leaderboard] = None
+
+    @property
+    def board(self) -> Leaderboard:
+        """The league's shared Leaderboard, built on first use (mutated by write benchmarks)."""
+        if self._board is None:
+            self._board = Leaderboard("Bench", players=[Player.from_dict(r) for r in self.rows])
+        return self._board
+
+    def matches(self, count: int) -> List[Tuple[str, str]]:
+        """Random pairings; the higher-rated player wins 3 times out of 4."""
+        rng, rows, n = self.rng, self.rows, self.size
+        out = []
+        for _ in range(count):
+            a, b = rng.randrange(n), rng.randrange(n - 1)
+            b += b >= a
+            strong, weak = (a, b) if rows[a]["rating"] >= rows[b]["rating"] else (b, a)
+            out.append((rows[strong]["name"], rows[weak]["name"]) if rng.random() < 0.75
+                       else (rows[weak]["name"], rows[strong]["name"]))
+        return out
+
+    def sample_names(self, count: int) -> List[str]:
+        return [self.names[self.rng.randrange(self.size)] for _ in range(count)]
+
+
+# ----- micro benchmarks -----
+
+@bench("leaderboard.build")
+def _build(league: League, ops: int):
+    rows = league.rows
+
+    def run():
+        Leaderboard("Build", players=[Player.from_dict(r) for r in rows])
+        return len(rows)
+    return run
+
+
+@bench("leaderboard.record_match")
+def _record_match(league: League, ops: int):
+    lb, matches = league.board, league.matches(ops)
+
+    def run():
+        for w, l in matches:
+            lb.record_match(w, l)
+        return len(matches)
+    return run
+
+
+@bench("leaderboard.record_matches")
+def _record_matches(league: League, ops: int):
+    lb, matches = league.board, league.matches(ops)
+
+    def run():
+        lb.record_matches(matches)
+        return len(matches)
+    return run
+
+
+@bench("leaderboard.standings")
+def _standings(league: League, ops: int):
+    lb = league.board
+
+    def run():
+        lb.standings()
+        return 1
+    return run
+
+
+@bench("leaderboard.top_n")
+def _top_n(league: League, ops: int):
+    lb = league.board
+
+    def run():
+        for _ in range(ops):
+            lb.top_n(10)
+        return ops
+    return run
+
+
+@bench("leaderboard.page")
+def _page(league: League, ops: int):
+    lb, rng = league.board, league.rng
+    offsets = [rng.randrange(max(1, league.size - 50)) for _ in range(ops)]
+
+    def run():
+        for offset in offsets:
+            lb.page(offset, 50)
+        return len(offsets)
+    return run
+
+
+@bench("leaderboard.find_index")
+def _find_index(league: League, ops: int):
+    lb, names = league.board, league.sample_names(ops)
+
+    def run():
+        for name in names:
+            lb.find_index(name)
+        return len(names)
+    return run
+
+
+@bench("leaderboard.rank")
+def _rank(league: League, ops: int):
+    lb, names = league.board, league.sample_names(ops)
+
+    def run():
+        for name in names:
+            lb.rank(name)
+        return len(names)
+    return run
+
+
+@bench("elo.update_ratings")
+def _update_ratings(league: League, ops: int):
+    elo, rng = Elo(32), league.rng
+    pairs = [(Player("w", rating=rng.gauss(1500, 200)), Player("l", rating=rng.gauss(1500, 200))) for _ in range(ops)]
+
+    def run():
+        for w, l in pairs:
+            elo.update_ratings(w, l)
+        return len(pairs)
+    return run
+
+
+@bench("elo.calculate_rating_from_record")
+def _rating_from_record(league: League, ops: int):
+    rng = league.rng
+    records = [(rng.randint(0, 500), rng.randint(0, 500)) for _ in range(ops)]
+
+    def run():
+        for w, l in records:
+            Elo.calculate_rating_from_record(w, l)
+        return len(records)
+    return run
+
+
+def record_mix(rng: random.Random, count: int) -> List[Tuple[int, int]]:
+    """Records shaped like a real ladder: mostly short careers, a long tail of veterans."""
+    out = []
+    for _ in range(count):
+        games = min(5_000, int(rng.paretovariate(1.1) * 8) - 8)
+        wins = round(games * min(1.0, max(0.0, rng.gauss(0.5, 0.12))))
+        out.append((wins, games - wins))
+    return out
+
+
+@bench("elo.rating_from_record_mix")
+def _rating_from_record_mix(league: League, ops: int):
+    records = record_mix(league.rng, ops)
+    elo = Elo(32)
+
+    def run():
+        for w, l in records:
+            elo.rating_from_record(w, l)
+        return len(records)
+    return run
+
+
+@bench("elo.ratings_from_records")
+def _ratings_from_records(league: League, ops: int):
+    records = [(r["winRecord"], r["lossRecord"]) for r in league.rows[:ops]]
+    elo = Elo(32)
+
+    def run():
+        elo.ratings_from_records(records)
+        return len(records)
+    return run
+
+
+@bench("columnar.order")
+def _table_order(league: League, ops: int):
+    table = PlayerTable.from_dicts(league.rows)
+
+    def run():
+        table.order()
+        return 1
+    return run
+
+
+@bench("service.snapshot_build")
+def _snapshot_build(league: League, ops: int):
+    lb = league.board
+
+    def run():
+        StandingsSnapshot.build(lb)
+        return 1
+    return run
+
+
+# ----- HTTP benchmarks (Flask test client) -----
+
+_http: dict = {}
+
+
+def _flask_server(league: League):
+    """Flask test client for server.py serving a fresh copy of the league.
+
+    server.py is imported against a scratch data directory; its service is
+    swapped for one over the league's players (without the mutation log).
+    """
+    if "server" not in _http:
+        os.environ["LEADERBOARD_DATA_DIR"] = tempfile.mkdtemp(prefix="leaderboard-bench-")
+        import server  # reads LEADERBOARD_DATA_DIR at import time
+        _http["server"] = server
+    server = _http["server"]
+    if _http.get("league") is not league:
+        old = server.service
+        server.service = LeaderboardService(Leaderboard("Main", players=[Player.from_dict(r) for r in league.rows]))
+        server.broadcaster = server.service.attach_broadcaster()
+        old.close()
+        _http["league"] = league
+    return server.app.test_client()
+
+
+@bench("http.get_players_page", group="http")
+def _http_page(league: League, ops: int):
+    client, rng = _flask_server(league), league.rng
+    urls = [f"/players?offset={rng.randrange(max(1, league.size - 50))}&limit=50" for _ in range(ops)]
+
+    def run():
+        for url in urls:
+            client.get(url)
+        return len(urls)
+    return run
+
+
+@bench("http.get_player", group="http")
+def _http_player(league: League, ops: int):
+    client = _flask_server(league)
+    urls = [f"/player/{name}" for name in league.sample_names(ops)]
+
+    def run():
+        for url in urls:
+            client.get(url)
+        return len(urls)
+    return run
+
+
+@bench("http.record_match", group="http")
+def _http_record_match(league: League, ops: int):
+    client = _flask_server(league)
+    # every write waits for a snapshot publish, so keep the count modest
+    matches = league.matches(max(1, ops // 10))
+
+    def run():
+        for w, l in matches:
+            client.post("/record_match", json={"winner": w, "loser": l})
+        return len(matches)
+    return run
+
+
+# ----- scaling checks -----
+
+# check name -> fn(log) returning {"name", "passed", ...measurements}
+_CHECKS: Dict[str, Callable] = {}
+
+
+def check(name: str):
+    def register(fn):
+        _CHECKS[name] = fn
+        return fn
+    return register
+
+
+def _best_per_op(setup: Callable[[], Callable[[], int]], repeat: int) -> float:
+    """Best seconds per operation over `repeat` runs; setup() is untimed and returns the timed run."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        run = setup()
+        start = time.perf_counter()
+        count = run()
+        best = min(best, (time.perf_counter() - start) / count)
+    return best
+
+
+@check("record_matches_vs_loop")
+def check_batch_vs_loop(size: int = 100_000, counts=(2_000, 20_000), repeat: int = 3, log=None) -> dict:
+    """A record_matches batch costs no more per match than record_match in a loop, at scale."""
+    league = League(size)
+    rows = []
+    for count in counts:
+        matches = league.matches(count)
+
+        def fresh(apply):
+            lb = Leaderboard("Check", players=[Player.from_dict(r) for r in league.rows])
+            return lambda: apply(lb)
+
+        batch = _best_per_op(lambda: fresh(lambda lb: lb.record_matches(matches)["recorded"]), repeat)
+        loop = _best_per_op(lambda: fresh(lambda lb: [lb.record_match(w, l) for w, l in matches] and len(matches)),
+                            repeat)
+        rows.append({"matches": count, "batch_us": batch * 1e6, "loop_us": loop * 1e6})
+        if log:
+            log(f"record_matches n={size} batch of {count}: {batch * 1e6:.1f} us/match, loop {loop * 1e6:.1f} us/match")
+    return {"name": "record_matches_vs_loop", "size": size, "runs": rows,
+            "passed": all(r["batch_us"] <= r["loop_us"] for r in rows)}
+
+
+@check("service_write_latency_flat")
+def check_write_latency(sizes=(1_000, 100_000), ops: int = 300, repeat: int = 3, max_growth: float = 3.0,
+                        log=None) -> dict:
+    """LeaderboardService.record_match (apply + publish) costs about the same at every board size."""
+    rows = []
+    for size in sizes:
+        league = League(size)
+        matches = league.matches(ops)
+
+        def setup():
+            service = LeaderboardService(Leaderboard("Check", players=[Player.from_dict(r) for r in league.rows]))
+
+            def run():
+                for w, l in matches:
+                    service.record_match(w, l)
+                service.close()
+                return len(matches)
+            return run
+
+        per_op = _best_per_op(setup, repeat)
+        rows.append({"size": size, "per_op_us": per_op * 1e6})
+        if log:
+            log(f"service.record_match n={size}: {per_op * 1e6:.1f} us/op")
+    growth = rows[-1]["per_op_us"] / rows[0]["per_op_us"]
+    return {"name": "service_write_latency_flat", "runs": rows, "growth": growth, "passed": growth <= max_growth}
+
+
+@check("columnar_memory")
+def check_table_memory(size: int = 100_000, max_fraction: float = 0.125, log=None) -> dict:
+    """A PlayerTable holds a player in at most max_fraction of the memory a Leaderboard needs."""
+    rows = League(size).rows
+
+    def traced(build: Callable[[], object]) -> float:
+        """Bytes per player allocated by build() and still held by its result."""
+        gc.collect()
+        tracemalloc.start()
+        built = build()
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del built
+        return held / size
+
+    board = traced(lambda: Leaderboard("Check", players=[Player.from_dict(r) for r in rows]))
+    table = traced(lambda: PlayerTable.from_dicts(rows))
+    if log:
+        log(f"memory n={size}: Leaderboard {board:.0f} B/player, PlayerTable {table:.0f} B/player")
+    return {"name": "columnar_memory", "size": size, "board_bytes": board, "table_bytes": table,
+            "passed": table <= board * max_fraction}
+
+
+def run_checks(names: Optional[List[str]] = None, log=None) -> List[dict]:
+    """Run the selected scaling checks (all by default) and return their results."""
+    return [fn(log=log) for name, fn in _CHECKS.items() if not names or name in names]
+
+
+# ----- runner -----
+
+def calibrate(repeat: int = 5) -> float:
+    """Best time in us of a fixed pure-Python workload: the machine's current speed."""
+    rng = random.Random(0)
+    keys = [(rng.random(), f"k{i}") for i in range(20_000)]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        index = {name: value for value, name in sorted(keys)}
+        sum(index[name] for _, name in keys)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def run_suite(sizes, groups=("micro", "http"), repeat: int = 3, max_ops: int = 200_000, http_ops: int = 2_000,
+              only: Optional[List[str]] = None, log=None) -> dict:
+    """Run the selected benchmarks at every size and return a results document."""
+    results = []
+    calibration = calibrate()
+    for size in sizes:
+        league = League(size)
+        for name, (group, setup) in _BENCHMARKS.items():
+            if group not in groups or (only and not any(name.startswith(o) for o in only)):
+                continue
+            ops = min(size, http_ops if group == "http" else max_ops)
+            try:
+                fn = setup(league, ops)
+            except ImportError as exc:  # optional dependency (flask) missing
+                if log:
+                    log(f"skip {name}: {exc}")
+                continue
+            times, count = [], 0
+            for _ in range(max(1, repeat)):
+                start = time.perf_counter()
+                count = fn()
+                times.append(time.perf_counter() - start)
+            best = min(times)
+            result = {
+                "name": name, "group": group, "size": size, "ops": count,
+                "best_s": best, "median_s": statistics.median(times), "per_op_us": best / count * 1e6,
+            }
+            results.append(result)
+            if log:
+                log(f"{name:<36} n={size:<9} {result['per_op_us']:>12.3f} us/op  ({count} ops, best of {len(times)})")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sizes": list(sizes),
+            "repeat": repeat,
+            # the faster of two timings, taken before and after the benchmarks
+            "calibration_us": min(calibration, calibrate()),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25) -> List[dict]:
+    """Per-benchmark ratio of current to baseline time per op, for (name, size) pairs in both.
+
+    When both runs carry a calibration time the ratio is divided by the
+    ratio of those, so a machine that is uniformly slower (or busier) than
+    when the baseline was taken does not show up as a regression.
+    """
+    base = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+    now_cal = current.get("meta", {}).get("calibration_us")
+    base_cal = baseline.get("meta", {}).get("calibration_us")
+    speed = now_cal / base_cal if now_cal and base_cal else 1.0
+    rows = []
+    for r in current["results"]:
+        b = base.get((r["name"], r["size"]))
+        if b is None or not b["per_op_us"]:
+            continue
+        ratio = r["per_op_us"] / b["per_op_us"] / speed
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else "ok"
+        rows.append({"name": r["name"], "size": r["size"], "baseline_us": b["per_op_us"],
+                     "current_us": r["per_op_us"], "ratio": ratio, "status": status})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", help=f"league sizes (players, default {list(DEFAULT_SIZES)})")
+    parser.add_argument("--large", action="store_true", help=f"also run at {LARGE_SIZE} players")
+    parser.add_argument("--group", choices=("micro", "http"), action="append", help="only these groups")
+    parser.add_argument("--only", nargs="+", help="only benchmarks whose name starts with one of these")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ops", type=int, default=200_000, help="operation cap for micro benchmarks")
+    parser.add_argument("--http-ops", type=int, default=2_000, help="request cap for HTTP benchmarks")
+    parser.add_argument("--json", metavar="PATH", help="write results to PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="compare with an earlier --json results file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 on any regression")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_FILE, metavar="PATH",
+                        help="--baseline PATH --fail-on-regression, PATH defaulting to the committed baseline")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    parser.add_argument("--check", nargs="*", metavar="NAME",
+                        help="run scaling checks (all, or the named ones) instead of benchmarks; exit 1 on failure")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (group, _) in _BENCHMARKS.items():
+            print(f"{group:<6} {name}")
+        for name in _CHECKS:
+            print(f"check  {name}")
+        return 0
+
+    def log(msg):
+        print(msg, file=sys.stderr)
+
+    if args.check is not None:
+        checks = run_checks(args.check, log)
+        for c in checks:
+            print(f"{c['name']:<36} {'ok' if c['passed'] else 'FAILED'}")
+        return 0 if all(c["passed"] for c in checks) else 1
+
+    baseline = None
+    if args.compare:
+        args.baseline, args.fail_on_regression = args.compare, True
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    sizes = args.sizes or list(DEFAULT_SIZES)
+    if args.compare and not args.sizes:
+        # the committed baseline also has the --large rows; they only run with --large
+        sizes = [n for n in baseline["meta"]["sizes"] if n != LARGE_SIZE]
+    if args.large and LARGE_SIZE not in sizes:
+        sizes = list(sizes) + [LARGE_SIZE]
+
+    results = run_suite(sizes, tuple(args.group or ("micro", "http")), args.repeat, args.max_ops,
+                        args.http_ops, args.only, log)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if baseline is None:
+        return 0
+
+    rows = compare(results, baseline, args.threshold)
+    base_cal = baseline.get("meta", {}).get("calibration_us")
+    if base_cal:
+        print(f"machine speed vs baseline: {base_cal / results['meta']['calibration_us']:.2f}x (ratios are adjusted)")
+    print(f"{'benchmark':<36} {'size':>9} {'base us':>12} {'now us':>12} {'ratio':>7}  status")
+    for r in rows:
+        print(f"{r['name']:<36} {r['size']:>9} {r['baseline_us']:>12.3f} {r['current_us']:>12.3f} {r['ratio']:>7.2f}  {r['status']}")
+    regressions = [r for r in rows if r["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Columnar (struct-of-arrays) storage for player records.
+
+A Player object costs a couple of hundred bytes once its attribute
+storage, name string and boxed numbers are counted. PlayerTable instead
+keeps one typed array per field and packs all names into a single UTF-8
+buffer, so a player costs roughly 40 bytes plus the length of its name:
+
+    rating  array('d')     wins / losses  array('q')
+    names   bytearray + array('q') of offsets
+
+Players are identified by an integer id (their row). The name -> id
+lookup dict is only built the first time a lookup by name is made, so
+bulk workflows (import, sort, serialize, stats) never pay for it.
+
+A table is a snapshot for whole-board work, not a Leaderboard backend: a
+live board needs a rank-index node and a rank key per player, which in
+pure Python outweigh the Player object itself, so backing one with
+columns would save nothing. Convert with Leaderboard.to_table(), or load
+an export straight into a table with streaming.load_table().
+
+Sorting and statistics use NumPy when it is installed and fall back to
+plain Python otherwise.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from elo import BASE_RATING
+from leaderboard import Player
+
+try:  # optional, used to vectorize whole-table operations
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is missing
+    np = None
+
+
+class PlayerTable:
+    """Struct-of-arrays player storage with packed names and integer ids.
+
+    Removed rows are tombstoned so ids stay valid.
+    """
+
+    def __init__(self):
+        self.rating = array("d")
+        self.wins = array("q")
+        self.losses = array("q")
+        self.alive = bytearray()
+        self._name_bytes = bytearray()
+        self._name_offsets = array("q", [0])
+        self._ids: Optional[Dict[str, int]] = None
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return len(self.alive) - self._removed
+
+    # ----- rows -----
+
+    def name(self, pid: int) -> str:
+        start, stop = self._name_offsets[pid], self._name_offsets[pid + 1]
+        return self._name_bytes[start:stop].decode("utf-8")
+
+    def _index(self) -> Dict[str, int]:
+        if self._ids is None:
+            self._ids = {self.name(pid): pid for pid in self.live_ids()}
+        return self._ids
+
+    def find(self, name: str) -> int:
+        """Id of a live player, or -1."""
+        return self._index().get(name, -1)
+
+    def add(self, name: str, wins: int = 0, losses: int = 0, rating: float = BASE_RATING) -> int:
+        """Append a player and return its id.
+
+        Raises ValueError if the name exists; the check uses the name index,
+        so bulk loads that never look names up skip it.
+        """
+        name = str(name)
+        if self._ids is not None and name in self._ids:
+            raise ValueError(f"player '{name}' already exists")
+        pid = len(self.alive)
+        self._name_bytes += name.encode("utf-8")
+        self._name_offsets.append(len(self._name_bytes))
+        self.rating.append(float(rating))
+        self.wins.append(int(wins))
+        self.losses.append(int(losses))
+        self.alive.append(1)
+        if self._ids is not None:
+            self._ids[name] = pid
+        return pid
+
+    def remove(self, name: str) -> None:
+        """Tombstone a player. Raises KeyError if not found."""
+        pid = self.find(name)
+        if pid == -1:
+            raise KeyError(f"player '{name}' not found")
+        self.alive[pid] = 0
+        self._removed += 1
+        del self._ids[name]  # type: ignore[union-attr]
+
+    def live_ids(self) -> Iterator[int]:
+        if not self._removed:
+            return iter(range(len(self.alive)))
+        return (pid for pid, alive in enumerate(self.alive) if alive)
+
+    # ----- conversion -----
+
+    @classmethod
+    def from_dicts(cls, rows: Iterable[dict]) -> "PlayerTable":
+        """Build a table from Player.to_dict()-style rows (the "players" schema)."""
+        table = cls()
+        for d in rows:
+            table.add(d.get("name"), d.get("winRecord", 0), d.get("lossRecord", 0), d.get("rating", BASE_RATING))  # type: ignore[arg-type]
+        return table
+
+    @classmethod
+    def from_players(cls, players: Iterable[Player]) -> "PlayerTable":
+        table = cls()
+        for p in players:
+            table.add(p.name, p.wins, p.losses, p.rating)
+        return table
+
+    def to_dicts(self, ids: Optional[Iterable[int]] = None) -> List[dict]:
+        """Rows as Player.to_dict()-style dicts, in id order unless ids are given."""
+        rating, wins, losses, name = self.rating, self.wins, self.losses, self.name
+        return [
+            {"name": name(pid), "winRecord": wins[pid], "lossRecord": losses[pid], "rating": rating[pid]}
+            for pid in (self.live_ids() if ids is None else ids)
+        ]
+
+    # ----- whole-table operations -----
+
+    def order(self) -> List[int]:
+        """Live ids in standings order (same rules as Leaderboard.standings)."""
+        ids = list(self.live_ids())
+        if np is None or not ids:
+            rating, wins, losses, name = self.rating, self.wins, self.losses, self.name
+
+            def key(pid):
+                total = wins[pid] + losses[pid]
+                return (rating[pid], wins[pid] / total if total else 0.0, wins[pid], -losses[pid], name(pid))
+
+            return sorted(ids, key=key, reverse=True)
+
+        idx = np.fromiter(ids, dtype=np.int64, count=len(ids))
+        rating = np.frombuffer(self.rating, dtype=np.float64)[idx]
+        wins = np.frombuffer(self.wins, dtype=np.int64)[idx]
+        losses = np.frombuffer(self.losses, dtype=np.int64)[idx]
+        total = wins + losses
+        win_rate = np.divide(wins, total, out=np.zeros(len(idx)), where=total > 0)
+        # lexsort: last key is primary; reverse ascending order for standings
+        keys = (-losses, wins, win_rate, rating)
+        perm = np.lexsort(keys)
+        same = np.ones(len(perm) - 1, dtype=bool)
+        for k in keys:
+            sorted_k = k[perm]
+            same &= sorted_k[1:] == sorted_k[:-1]
+        if same.any():
+            # rows equal on every numeric key fall back to the name
+            names = np.array([self.name(pid) for pid in ids])
+            perm = np.lexsort((names,) + keys)
+        return idx[perm[::-1]].tolist()
+
+    def standings(self, n: Optional[int] = None) -> List[dict]:
+        order = self.order()
+        return self.to_dicts(order if n is None else order[:max(0, int(n))])
+
+    def stats(self) -> dict:
+        """Player count, rating spread and game totals over live players."""
+        ids = list(self.live_ids())
+        if not ids:
+            return {"players": 0, "games": 0, "rating_mean": None, "rating_min": None, "rating_max": None}
+        if np is not None:
+            idx = np.asarray(ids, dtype=np.int64)
+            rating = np.frombuffer(self.rating, dtype=np.float64)[idx]
+            wins = int(np.frombuffer(self.wins, dtype=np.int64)[idx].sum())
+            return {
+                "players": len(ids),
+                "games": wins,  # every game has exactly one winner
+                "rating_mean": float(rating.mean()),
+                "rating_min": float(rating.min()),
+                "rating_max": float(rating.max()),
+            }
+        ratings = [self.rating[pid] for pid in ids]
+        return {
+            "players": len(ids),
+            "games": sum(self.wins[pid] for pid in ids),
+            "rating_mean": sum(ratings) / len(ratings),
+            "rating_min": min(ratings),
+            "rating_max": max(ratings),
+        }
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns and packed names (excluding the lazy name index)."""
+        return (
+            self.rating.itemsize * len(self.rating)
+            + self.wins.itemsize * len(self.wins)
+            + self.losses.itemsize * len(self.losses)
+            + len(self.alive)
+            + len(self._name_bytes)
+            + self._name_offsets.itemsize * len(self._name_offsets)
+        )
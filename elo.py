@@ -1,7 +1,26 @@
-from typing import TYPE_CHECKING
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple
+from metrics import Counter
 if TYPE_CHECKING:
     from leaderboard import Player  # type hint only to avoid circular import
 
+try:  # optional, used by the batched expected-score APIs
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is missing
+    np = None
+
+#ratings rebuilt from a win/loss record, and the loss trajectories replayed for them (cache misses)
+RECORD_RATINGS = Counter("elo_record_ratings_total", "Ratings rebuilt from a win/loss record")
+TRAJECTORY_REPLAYS = Counter("elo_trajectory_replays_total", "Loss trajectories replayed for record ratings")
+
+#the batched APIs agree with expected_score to within this (absolute)
+BATCH_TOLERANCE = 1e-12
+
+#starting rating of a new player and of the baseline opponent used when
+#rebuilding a rating from a win/loss record
+BASE_RATING = 1500.0
+
 #This class handles all elo rating calculations
 class Elo:
     
@@ -17,37 +36,194 @@ class Elo:
     def expected_score(self, rating_a: float, rating_b: float) -> float:
         return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
     
+    #new (winner, loser) ratings after one match, rounded like update_ratings
+    #the loser's expected score is 1 - the winner's, so one power is enough;
+    #the rounded results match evaluating both expected scores separately
+    def exchange(self, winner_rating: float, loser_rating: float) -> Tuple[float, float]:
+        delta = self.k_factor * (1 - 1 / (1 + 10 ** ((loser_rating - winner_rating) / 400)))
+        return round(winner_rating + delta, 2), round(loser_rating - delta, 2)
+
+    def expected_scores(self, ratings_a: Sequence[float], ratings_b: Sequence[float]):
+        """Expected score of a[i] against b[i] for equal-length sequences of ratings.
+
+        Returns a NumPy array when NumPy is installed, else a list. Values
+        agree with expected_score within BATCH_TOLERANCE.
+        """
+        if len(ratings_a) != len(ratings_b):
+            raise ValueError("ratings_a and ratings_b must have the same length")
+        if np is None:
+            return [1 / (1 + 10 ** ((b - a) / 400)) for a, b in zip(ratings_a, ratings_b)]
+        a = np.asarray(ratings_a, dtype=np.float64)
+        b = np.asarray(ratings_b, dtype=np.float64)
+        return 1.0 / (1.0 + np.power(10.0, (b - a) / 400.0))
+
+    def probability_matrix(self, ratings: Sequence[float]):
+        """n x n matrix whose [i][j] is the chance that player i beats player j.
+
+        Built by broadcasting the rating vector against itself; the diagonal
+        is 0.5 and m[i][j] + m[j][i] == 1. Returns a NumPy array when NumPy is
+        installed, else a list of lists.
+        """
+        if np is None:
+            return [[1 / (1 + 10 ** ((b - a) / 400)) for b in ratings] for a in ratings]
+        r = np.asarray(ratings, dtype=np.float64)
+        return 1.0 / (1.0 + np.power(10.0, (r[np.newaxis, :] - r[:, np.newaxis]) / 400.0))
+
+    def period_changes(self, ratings: Sequence[float], winners: Sequence[int], losers: Sequence[int]):
+        """Total rating change of every player over one rating period.
+
+        ratings[i] is player i's rating at the start of the period and match m
+        is a win of player winners[m] over player losers[m]. Every match is
+        scored against the pre-period ratings, so the result does not depend
+        on the order of the matches: each contributes +k(1 - E) to its winner
+        and -k(1 - E) to its loser, summed per player. Returns a NumPy array
+        when NumPy is installed, else a list.
+        """
+        if len(winners) != len(losers):
+            raise ValueError("winners and losers must have the same length")
+        k = self.k_factor
+        if np is None:
+            changes = [0.0] * len(ratings)
+            for w, l in zip(winners, losers):
+                delta = k * (1 - 1 / (1 + 10 ** ((ratings[l] - ratings[w]) / 400)))
+                changes[w] += delta
+                changes[l] -= delta
+            return changes
+        r = np.asarray(ratings, dtype=np.float64)
+        w = np.asarray(winners, dtype=np.intp)
+        l = np.asarray(losers, dtype=np.intp)
+        delta = k * (1.0 - 1.0 / (1.0 + np.power(10.0, (r[l] - r[w]) / 400.0)))
+        return np.bincount(w, delta, minlength=len(r)) - np.bincount(l, delta, minlength=len(r))
+
     #update ratings for winner and loser
     def update_ratings(self, winner: "Player", loser: "Player") -> None:
-        #calculate scores
-        expected_win = self.expected_score(winner.rating, loser.rating)
-        expected_lose = self.expected_score(loser.rating, winner.rating)
-
-        #update ratings
-        winner.rating += self.k_factor * (1 - expected_win)
-        loser.rating += self.k_factor * (0 - expected_lose)
-
-        #round the final rating to two decimal places for consistency
-        winner.rating = round(winner.rating, 2)
-        loser.rating = round(loser.rating, 2)
-            
+        #calculate scores and round the final ratings to two decimal places
+        winner.rating, loser.rating = self.exchange(winner.rating, loser.rating)
+
+    def rating_from_record(self, wins: int, losses: int) -> float:
+        """Rating after `wins` wins then `losses` losses against a baseline player.
+
+        Gives exactly the same result as replaying every game through
+        update_ratings, but the replayed trajectories are cached per k-factor
+        and stop growing once rounding pins the ratings in place (about 15k
+        games), so the cost does not grow with the size of the record.
+        """
+        RECORD_RATINGS.inc()
+        return _record_table(self.k_factor).rating(int(wins), int(losses))
+
+    def ratings_from_records(self, records: Iterable[Tuple[int, int]]) -> List[float]:
+        """Bulk form of rating_from_record for many (wins, losses) pairs.
+
+        Records are grouped by their win count so each distinct loss
+        trajectory is replayed once for the whole batch.
+        """
+        records = [(int(w), int(l)) for w, l in records]
+        RECORD_RATINGS.inc(len(records))
+        return _record_table(self.k_factor).ratings(records)
+
+    @staticmethod
     def calculate_rating_from_record(wins: int, losses: int, k: float = 32) -> float:
         """Simulate a player's Elo rating based on wins and losses against a baseline player"""
-        
-        elo = Elo(k_factor=k)
-
-        #temporary player with default starting rating of 1500
-        player = Player(name = "temp", winRecord = wins, lossRecord = losses, rating = 1500)
-        
-        #baseline opponent
-        opponent = Player(name = "baseline", rating = 1500)
-
-        # simulate wins
-        for _ in range(wins):
-            elo.update_ratings(player, opponent)
-        
-        # simulate losses
-        for _ in range(losses):
-            elo.update_ratings(opponent, player)
-        
-        return player.rating
\ No newline at end of file
+        return Elo(k).rating_from_record(wins, losses)
+
+
+class _Trajectory:
+    """Ratings of one side of a repeated pairing, replayed lazily.
+
+    Each step the same side wins (or loses). Rounding to two decimals means
+    the ratings eventually stop moving; after that the trajectory is
+    "saturated" and every later step has the same value.
+    """
+
+    def __init__(self, elo: Elo, player: float, opponent: float, player_wins: bool):
+        self.elo = elo
+        self.player_wins = player_wins
+        self.player = array("d", [player])
+        self.opponent = array("d", [opponent])
+        self.saturated = False
+
+    def extend_to(self, steps: int) -> None:
+        player, opponent = self.player, self.opponent
+        exchange = self.elo.exchange
+        p, o = player[-1], opponent[-1]
+        while not self.saturated and len(player) <= steps:
+            if self.player_wins:
+                new_p, new_o = exchange(p, o)
+            else:
+                new_o, new_p = exchange(o, p)
+            if new_p == p and new_o == o:
+                self.saturated = True
+                break
+            p, o = new_p, new_o
+            player.append(p)
+            opponent.append(o)
+
+    def index(self, steps: int) -> int:
+        """Position in the stored arrays that holds the state after `steps` steps (none if negative)."""
+        self.extend_to(steps)
+        return max(0, min(steps, len(self.player) - 1))
+
+
+class _RecordTable:
+    """Cached win trajectory plus an LRU of loss trajectories for one k-factor.
+
+    There is one loss trajectory per distinct win count, so the LRU is
+    bounded by the steps stored across all of them rather than by their
+    number: every record up to a few hundred games each fits at once.
+    """
+
+    #about 16 bytes per stored step (player and opponent rating)
+    MAX_LOSS_STEPS = 1 << 20
+
+    def __init__(self, k_factor: float):
+        self.elo = Elo(k_factor)
+        self.wins = _Trajectory(self.elo, BASE_RATING, BASE_RATING, player_wins=True)
+        self.losses: "OrderedDict[int, _Trajectory]" = OrderedDict()
+        self.loss_steps = 0
+
+    def _losses_after(self, win_index: int) -> _Trajectory:
+        traj = self.losses.get(win_index)
+        if traj is None:
+            TRAJECTORY_REPLAYS.inc()
+            traj = _Trajectory(self.elo, self.wins.player[win_index], self.wins.opponent[win_index], player_wins=False)
+            self.losses[win_index] = traj
+            self.loss_steps += len(traj.player)
+        else:
+            self.losses.move_to_end(win_index)
+        return traj
+
+    def _loss_rating(self, traj: _Trajectory, losses: int) -> float:
+        stored = len(traj.player)
+        rating = traj.player[traj.index(losses)]
+        self.loss_steps += len(traj.player) - stored
+        #evict least recently used trajectories, never the one just read (it is last)
+        while self.loss_steps > self.MAX_LOSS_STEPS and len(self.losses) > 1:
+            _, old = self.losses.popitem(last=False)
+            self.loss_steps -= len(old.player)
+        return rating
+
+    def rating(self, wins: int, losses: int) -> float:
+        win_index = self.wins.index(wins)
+        if losses <= 0:
+            return self.wins.player[win_index]
+        return self._loss_rating(self._losses_after(win_index), losses)
+
+    def ratings(self, records: List[Tuple[int, int]]) -> List[float]:
+        out = [0.0] * len(records)
+        groups: Dict[int, List[int]] = {}
+        for i, (w, _) in enumerate(records):
+            groups.setdefault(self.wins.index(w), []).append(i)
+        for win_index, members in groups.items():
+            for i in members:
+                out[i] = self.rating(win_index, records[i][1])
+        return out
+
+
+_record_tables: Dict[float, _RecordTable] = {}
+
+
+def _record_table(k_factor: float) -> _RecordTable:
+    table = _record_tables.get(k_factor)
+    if table is None:
+        table = _record_tables[k_factor] = _RecordTable(k_factor)
+    return table
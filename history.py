@@ -0,0 +1,158 @@
+"""Per-player rating history as compact time series.
+
+RatingHistory watches a Leaderboard (Leaderboard.watch) and appends a
+(time, rating) point whenever a player's rating changes. Each player's
+series is two arrays: whole seconds since the epoch as uint32 and the
+rating in hundredths of a point as int32 (ratings are already rounded to
+two decimals), so a point costs 8 bytes and a rated match 16.
+
+Changes made in one batch (record_matches, imports) share a timestamp,
+so only a player's last rating from the batch is stored; a point-in-time
+query could not tell the intermediate values apart anyway.
+
+Writes happen on the leaderboard's writer thread while request threads
+read. The rating is appended before the time and readers only look at
+the first len(times) entries, so reads need no lock.
+"""
+
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
+
+from leaderboard import Leaderboard, Player
+
+
+class _Series:
+    __slots__ = ("times", "ratings")
+
+    def __init__(self):
+        self.times = array("I")
+        self.ratings = array("i")
+
+
+class RatingHistory:
+    """Rating time series for every player on a Leaderboard.
+
+    Players already on the board get a first point at their current
+    rating when the history is created. `clock` returns the current time
+    in seconds (time.time by default).
+    """
+
+    def __init__(self, lb: Optional[Leaderboard] = None, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._series: Dict[str, _Series] = {}
+        self.lb = lb
+        if lb is not None:
+            now = clock()
+            for p in lb.players:
+                self.record(p.name, p.rating, now)
+            lb.watch(self)
+
+    def close(self) -> None:
+        """Stop following the leaderboard."""
+        if self.lb is not None:
+            self.lb.unwatch(self)
+
+    # ----- writes -----
+
+    def record(self, name: str, rating: float, at: Optional[float] = None) -> None:
+        """Append a point at time `at` (default: now).
+
+        An explicit `at` before the player's last point raises ValueError; a
+        clock that stepped backwards is clamped to the last point instead. A
+        point with the same time as the previous one replaces it, and a point
+        with the previous rating is not stored.
+        """
+        t = int(self._clock() if at is None else at)
+        value = int(round(rating * 100))
+        series = self._series.get(name)
+        if series is None:
+            series = self._series[name] = _Series()
+        elif series.times:
+            last = series.times[-1]
+            if t < last:
+                if at is not None:
+                    raise ValueError(f"history for '{name}' is already at {last}")
+                t = last
+            if series.ratings[-1] == value:
+                return
+            if t == last:
+                series.ratings[-1] = value
+                return
+        series.ratings.append(value)
+        series.times.append(t)
+
+    def player_changed(self, p: Player) -> None:
+        """Leaderboard watcher hook."""
+        self.record(p.name, p.rating)
+
+    def player_removed(self, p: Player) -> None:
+        """Leaderboard watcher hook; the history of a removed player is kept."""
+
+    # ----- reads -----
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._series
+
+    def __len__(self) -> int:
+        """Stored points across all players."""
+        return sum(len(s.times) for s in self._series.values())
+
+    def nbytes(self) -> int:
+        """Bytes used by the stored points (excluding per-player object overhead)."""
+        return sum(len(s.times) * 8 for s in self._series.values())
+
+    def rating_at(self, name: str, at: float) -> Optional[float]:
+        """A player's rating at time `at`, or None before their first point.
+
+        Raises KeyError if the player has no history.
+        """
+        series = self._series.get(name)
+        if series is None:
+            raise KeyError(f"no history for '{name}'")
+        n = len(series.times)
+        i = bisect_right(series.times, int(at), 0, n) - 1
+        return series.ratings[i] / 100 if i >= 0 else None
+
+    def count(self, name: str, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        """Points in [start, end]. Raises KeyError if the player has no history."""
+        lo, hi = self._bounds(name, start, end)
+        return hi - lo
+
+    def _bounds(self, name: str, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        series = self._series.get(name)
+        if series is None:
+            raise KeyError(f"no history for '{name}'")
+        n = len(series.times)
+        lo = 0 if start is None else bisect_left(series.times, int(start), 0, n)
+        hi = n if end is None else bisect_right(series.times, int(end), 0, n)
+        return lo, max(lo, hi)
+
+    def series(self, name: str, start: Optional[float] = None, end: Optional[float] = None,
+               points: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(time, rating) points in [start, end], oldest first.
+
+        With `points`, the range is split into points // 2 equal-count
+        buckets and each contributes its lowest and highest rating (in time
+        order), so a chart keeps every peak and dip with at most `points`
+        points. Raises KeyError if the player has no history.
+        """
+        lo, hi = self._bounds(name, start, end)
+        series = self._series[name]
+        times, ratings = series.times, series.ratings
+        if points is None or hi - lo <= max(2, int(points)):
+            return [(times[i], ratings[i] / 100) for i in range(lo, hi)]
+        buckets = max(1, int(points) // 2)
+        out: List[Tuple[int, float]] = []
+        size = (hi - lo) / buckets
+        for b in range(buckets):
+            first, last = lo + int(b * size), lo + int((b + 1) * size)
+            if first >= last:
+                continue
+            chunk = ratings[first:last]
+            i_min = first + chunk.index(min(chunk))
+            i_max = first + chunk.index(max(chunk))
+            for i in sorted({i_min, i_max}):
+                out.append((times[i], ratings[i] / 100))
+        return out
@@ -0,0 +1,288 @@
+"""Command-line bulk import of roster and match files into a leaderboard.
+
+Reads CSV, NDJSON or JSON files a row at a time and applies them in
+batches: roster rows inside one Leaderboard batch (each player is
+re-ranked once per batch), match rows through Leaderboard.record_matches.
+Memory stays bounded by the board itself plus one batch, however large
+the input files are.
+
+    roster   name,winRecord,lossRecord,rating  (wins/losses accepted too; a
+             row without a rating gets one rebuilt from its record)
+    matches  winner,loser                     (applied in file order; other
+             columns such as date or matchId are ignored)
+
+Rows missing a required field (a roster row's name, a match's winner or
+loser) or with an unreadable record are skipped and listed in the file's
+summary with the failed matches, and the command exits with status 1.
+
+CSV files need a header row. .ndjson/.jsonl files hold one object per
+line and any other file is read as JSON (an export document or a bare
+array of objects). The result is written as standings in rank order
+(--out, JSON or NDJSON by extension) and/or as a snapshot of a
+persistence.LeaderboardStore directory (--data-dir; stop the server
+first, the store is loaded and snapshotted in place).
+
+    python ingest.py --players roster.csv --matches matches.ndjson --out standings.json
+    python ingest.py --data-dir data --matches season.csv --auto-add
+
+Progress (rows, percent of the file read, rows/s) goes to stderr. Only
+leaderboard modules are imported, so the tool starts without loading the
+web server.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from leaderboard import Leaderboard
+from persistence import LeaderboardStore
+from streaming import format_for_path, iter_json, iter_ndjson, load_leaderboard, read_players
+
+DEFAULT_BATCH = 10_000
+# failed rows kept for the summary; the rest are only counted
+MAX_ERRORS = 20
+
+
+def input_format(path: str) -> str:
+    return "csv" if path.endswith(".csv") else format_for_path(path)
+
+
+class Progress:
+    """Periodic progress lines on a stream, plus the final throughput."""
+
+    def __init__(self, label: str, total_bytes: Optional[int] = None, stream: Optional[IO] = None,
+                 interval: float = 1.0):
+        self.label = label
+        self.total_bytes = total_bytes
+        self.stream = stream
+        self.interval = float(interval)
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._next = self.started + self.interval
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    def update(self, rows: int, position: Optional[int] = None) -> None:
+        self.rows = rows
+        now = time.perf_counter()
+        if self.stream is None or now < self._next:
+            return
+        self._next = now + self.interval
+        done = f" {position / self.total_bytes:6.1%}" if position is not None and self.total_bytes else ""
+        print(f"{self.label}: {rows:,} rows{done}  {self.rate:,.0f} rows/s", file=self.stream, flush=True)
+
+    def finish(self) -> dict:
+        summary = {"rows": self.rows, "seconds": round(self.elapsed, 3), "rowsPerSecond": round(self.rate)}
+        if self.stream is not None:
+            print(f"{self.label}: {self.rows:,} rows in {self.elapsed:.2f}s ({self.rate:,.0f} rows/s)",
+                  file=self.stream, flush=True)
+        return summary
+
+
+def iter_rows(f: IO[bytes], fmt: str) -> Iterator[dict]:
+    """Yield one dict per row from a binary file object."""
+    if fmt == "csv":
+        text = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.DictReader(text)
+        finally:
+            text.detach()  # leave f open for the caller
+    elif fmt == "ndjson":
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from read_players(f, "json")
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _field(row: dict, *keys: str):
+    for key in keys:
+        value = row.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def apply_players(lb: Leaderboard, rows: List[dict]) -> dict:
+    """Add or overwrite roster rows.
+
+    Returns {"added": n, "updated": n, "failed": [{"index", "name", "error"}, ...]};
+    rows without a name or with a non-numeric record are skipped and reported.
+    """
+    added = updated = 0
+    failed: List[dict] = []
+    unrated: List[str] = []
+    with lb._batch():
+        for i, row in enumerate(rows):
+            name = _field(row, "name")
+            if name is None:
+                failed.append({"index": i, "name": None, "error": "missing name"})
+                continue
+            name = str(name)
+            try:
+                wins = int(_field(row, "winRecord", "wins") or 0)
+                losses = int(_field(row, "lossRecord", "losses") or 0)
+                rating = _field(row, "rating")
+                rating = None if rating is None else float(rating)
+            except (TypeError, ValueError):
+                failed.append({"index": i, "name": name, "error": "invalid record or rating"})
+                continue
+            p = lb.get_player(name)
+            if p is None:
+                p = lb.add_player(name, wins, losses)
+                added += 1
+            else:
+                updated += 1
+            if rating is None:
+                p.update_records(wins, losses, p.rating)
+                unrated.append(name)
+            else:
+                p.update_records(wins, losses, rating)
+        if unrated:
+            # one bulk pass for every row that needs a record-based rating
+            lb.rate_from_records(unrated)
+    return {"added": added, "updated": updated, "failed": failed}
+
+
+def apply_matches(lb: Leaderboard, rows: List[dict], auto_add: bool = False) -> dict:
+    """Record match rows in order (see Leaderboard.record_matches); auto_add creates unknown players.
+
+    Rows without a winner or loser are reported in "failed" like unknown players.
+    """
+    pairs: List[Tuple[str, str]] = []
+    # row index of each pair, and the rows rejected before recording
+    positions: List[int] = []
+    failed: List[dict] = []
+    for i, row in enumerate(rows):
+        winner, loser = _field(row, "winner"), _field(row, "loser")
+        if winner is None or loser is None:
+            failed.append({"index": i, "winner": winner, "loser": loser,
+                           "error": "missing winner" if winner is None else "missing loser"})
+            continue
+        pairs.append((str(winner), str(loser)))
+        positions.append(i)
+    if auto_add:
+        with lb._batch():
+            for pair in pairs:
+                for name in pair:
+                    if lb.get_player(name) is None:
+                        lb.add_player(name)
+    summary = lb.record_matches(pairs)
+    failed.extend(dict(error, index=positions[error["index"]]) for error in summary["failed"])
+    failed.sort(key=lambda error: error["index"])
+    return {"recorded": summary["recorded"], "failed": failed}
+
+
+def ingest_file(lb: Leaderboard, path: str, kind: str, batch_size: int = DEFAULT_BATCH, auto_add: bool = False,
+                fmt: Optional[str] = None, progress: Optional[Callable[[str, int], Progress]] = None) -> dict:
+    """Stream one roster ("players") or match ("matches") file into lb in batches and return its summary."""
+    fmt = fmt or input_format(path)
+    summary: Dict = {"file": path, "kind": kind}
+    if kind == "players":
+        summary.update(added=0, updated=0)
+    else:
+        summary.update(recorded=0)
+    summary.update(failed=0, errors=[])
+    with open(path, "rb") as f:
+        meter = progress(f"{kind} {os.path.basename(path)}", os.fstat(f.fileno()).st_size) if progress else None
+        rows = 0
+        for batch in _batches(iter_rows(f, fmt), batch_size):
+            if kind == "players":
+                result = apply_players(lb, batch)
+                summary["added"] += result["added"]
+                summary["updated"] += result["updated"]
+            else:
+                result = apply_matches(lb, batch, auto_add)
+                summary["recorded"] += result["recorded"]
+            summary["failed"] += len(result["failed"])
+            for error in result["failed"][:MAX_ERRORS - len(summary["errors"])]:
+                summary["errors"].append(dict(error, index=rows + error["index"]))
+            rows += len(batch)
+            if meter is not None:
+                meter.update(rows, f.tell())
+    summary["rows"] = rows
+    if meter is not None:
+        summary.update(meter.finish())
+    return summary
+
+
+def write_standings(lb: Leaderboard, path: str) -> None:
+    """Write the standings in rank order, as JSON (export document) or NDJSON by extension."""
+    standings = lb.standings()
+    with open(path, "w", encoding="utf-8") as f:
+        chunks = iter_ndjson(standings) if format_for_path(path) == "ndjson" else iter_json(lb.name, standings, len(standings))
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--base", metavar="PATH", help="start from an exported leaderboard (JSON/NDJSON)")
+    source.add_argument("--data-dir", metavar="DIR", help="load this store, then write its snapshot when done")
+    parser.add_argument("--players", metavar="PATH", action="append", default=[], help="roster file (repeatable)")
+    parser.add_argument("--matches", metavar="PATH", action="append", default=[], help="match file (repeatable)")
+    parser.add_argument("--out", metavar="PATH", help="write the standings here (.json or .ndjson)")
+    parser.add_argument("--name", default="Main", help="leaderboard name when starting empty")
+    parser.add_argument("--k-factor", type=float, default=32)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH)
+    parser.add_argument("--auto-add", action="store_true", help="add players that appear only in match files")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+    if not args.players and not args.matches:
+        parser.error("nothing to import; pass --players and/or --matches")
+    if not args.out and not args.data_dir:
+        parser.error("nowhere to write the result; pass --out and/or --data-dir")
+
+    store = None
+    if args.data_dir:
+        store = LeaderboardStore(args.data_dir)
+        lb = store.load(args.name, k_factor=args.k_factor)
+    elif args.base:
+        lb = load_leaderboard(args.base, name=args.name, k_factor=args.k_factor)
+    else:
+        lb = Leaderboard(args.name, k_factor=args.k_factor)
+
+    stream = None if args.quiet else sys.stderr
+    progress = lambda label, size: Progress(label, size, stream)  # noqa: E731
+    summaries = []
+    try:
+        for path in args.players:
+            summaries.append(ingest_file(lb, path, "players", args.batch_size, progress=progress))
+        for path in args.matches:
+            summaries.append(ingest_file(lb, path, "matches", args.batch_size, args.auto_add, progress=progress))
+        if args.out:
+            write_standings(lb, args.out)
+        if store is not None:
+            store.snapshot()
+    finally:
+        if store is not None:
+            store.close()
+    print(json.dumps({"players": len(lb.players), "files": summaries}, indent=2))
+    return 1 if any(s.get("failed") for s in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,8 +16,25 @@ Usage example:
 
 """
 
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from elo import Elo  # import the Elo class
+from metrics import Counter
+from ranking import PositionIndex, RankIndex
+if TYPE_CHECKING:
+    from columnar import PlayerTable  # type hint only to avoid circular import
+
+# process-wide counters exposed on /metrics
+RATING_UPDATES = Counter("leaderboard_rating_updates_total", "Match results applied to ratings")
+_QUERIES = Counter("leaderboard_standings_queries_total", "Ranked reads by kind", ("kind",))
+_LOOKUPS = Counter("leaderboard_lookups_total", "Player lookups by kind", ("kind",))
+_STANDINGS, _TOP_N, _PAGE, _AROUND = (_QUERIES.labels(k) for k in ("standings", "top_n", "page", "around"))
+_GET_PLAYER, _FIND_INDEX, _RANK = (_LOOKUPS.labels(k) for k in ("get_player", "find_index", "rank"))
+
+# batches changing at most this many players (a single match) re-rank them
+# one by one; larger ones go through RankIndex.update
+SMALL_BATCH = 2
+
 
 class Player:
     """Represents a player with a win/loss record.
@@ -28,11 +45,52 @@ class Player:
     - lossRecord (int)
     """
 
+    # no per-instance __dict__: keeps large boards compact
+    __slots__ = ("name", "_wins", "_losses", "_rating", "_board", "_rank_key")
+
     def __init__(self, name: str, winRecord: int = 0, lossRecord: int = 0, rating: float = 1500):
         self.name = str(name)
-        self.winRecord = int(winRecord)
-        self.lossRecord = int(lossRecord)
-        self.rating = float(rating) #elo rating (default 1500)
+        self._wins = int(winRecord)
+        self._losses = int(lossRecord)
+        self._rating = float(rating) #elo rating (default 1500)
+        # leaderboard that ranks this player (set by Leaderboard)
+        self._board: Optional["Leaderboard"] = None
+        self._rank_key: Optional[tuple] = None
+
+    def _set(self, wins: int, losses: int, rating: float) -> None:
+        """Change record and rating, keeping the owning leaderboard's ranking in sync."""
+        board = self._board
+        if board is not None:
+            board._before_change(self)
+        self._wins = wins
+        self._losses = losses
+        self._rating = rating
+        if board is not None:
+            board._after_change(self)
+
+    @property
+    def winRecord(self) -> int:
+        return self._wins
+
+    @winRecord.setter
+    def winRecord(self, value: int) -> None:
+        self._set(int(value), self._losses, self._rating)
+
+    @property
+    def lossRecord(self) -> int:
+        return self._losses
+
+    @lossRecord.setter
+    def lossRecord(self, value: int) -> None:
+        self._set(self._wins, int(value), self._rating)
+
+    @property
+    def rating(self) -> float:
+        return self._rating
+
+    @rating.setter
+    def rating(self, value: float) -> None:
+        self._set(self._wins, self._losses, float(value))
 
     def record_win(self, count: int = 1) -> None:
         """Add wins to this player's record."""
@@ -44,9 +102,11 @@ class Player:
 
     def update_records(self, wins: int, losses: int, rating: float) -> None:
         """Update a player's win/loss records and Elo rating."""
-        self.winRecord = int(wins)
-        self.lossRecord = int(losses)
-        self.rating = float(rating)
+        self._set(int(wins), int(losses), float(rating))
+
+    def rank_key(self) -> tuple:
+        """Sort key used for standings (larger key = higher rank)."""
+        return (self._rating, self.win_rate, self._wins, -self._losses, self.name)
 
     @property
     def wins(self) -> int:
@@ -69,10 +129,10 @@ class Player:
 
         If the player has no games, return 0.0.
         """
-        total = self.total_games
+        total = self._wins + self._losses
         if total == 0:
             return 0.0
-        return self.winRecord / total
+        return self._wins / total
 
     def to_dict(self) -> dict:
         return {"name": self.name, "winRecord": self.winRecord, "lossRecord": self.lossRecord, "rating": self.rating}
@@ -89,10 +149,15 @@ class Leaderboard:
     """Manage a collection of players and produce ranked standings.
 
     Sorting rules for standings (highest ranked first):
-    1. Higher win rate (wins / total games)
-    2. Higher number of wins
-    3. Fewer losses
-    4. Alphabetical by name
+    1. Higher Elo rating
+    2. Higher win rate (wins / total games)
+    3. Higher number of wins
+    4. Fewer losses
+    5. Name (reverse alphabetical, matching the original sort)
+
+    Players are indexed by name and kept in a RankIndex that is updated
+    whenever a player's record or rating changes, so lookups are O(1) and
+    standings/top_n/rank queries are O(log n + k) instead of a full sort.
     """
 
     def __init__(self, name: str, playerCount: int = 0, players: Optional[List[Player]] = None, k_factor: float = 32):
@@ -101,12 +166,116 @@ class Leaderboard:
         self.playerCount = int(playerCount)
         self.players: List[Player] = list(players) if players else []
         self.elo = Elo(k_factor)
+        self._index: Dict[str, Player] = {}
+        self._ranking = RankIndex()
+        # position of each name in self.players, built lazily for find_index
+        self._positions: Optional[PositionIndex] = None
+        # players whose re-ranking is deferred until the current batch ends
+        self._batch_depth = 0
+        # bumped by every mutation; lets readers cache anything derived from the board
+        self.version = 0
+        self._pending: Set[Player] = set()
+        # objects notified after a player is re-ranked or removed (e.g. teams.TeamBoard)
+        self._watchers: List = []
+        # (winner, loser) results queued for the open rating period
+        self._period: List[Tuple[str, str]] = []
+        with self._batch():
+            for p in self.players:
+                self._attach(p)
+
+    # ----- ranking maintenance -----
+
+    def _attach(self, p: Player) -> None:
+        self.version += 1
+        self._index[p.name] = p
+        p._board = self
+        if self._batch_depth:
+            self._pending.add(p)
+        else:
+            self._rerank(p)
+
+    def _detach(self, p: Player) -> None:
+        self.version += 1
+        self._unrank(p)
+        self._pending.discard(p)
+        p._board = None
+        del self._index[p.name]
+        for w in self._watchers:
+            w.player_removed(p)
+
+    def _unrank(self, p: Player) -> None:
+        if p._rank_key is not None:
+            self._ranking.remove(p._rank_key)
+            p._rank_key = None
+
+    def _rerank(self, p: Player) -> None:
+        self._unrank(p)
+        key = p.rank_key()
+        self._ranking.insert(key, p)
+        p._rank_key = key
+        for w in self._watchers:
+            w.player_changed(p)
+
+    def _before_change(self, p: Player) -> None:
+        # inside a batch p keeps its old key in the ranking until the batch ends
+        if not self._batch_depth:
+            self._unrank(p)
+
+    def _after_change(self, p: Player) -> None:
+        self.version += 1
+        if self._batch_depth:
+            self._pending.add(p)
+        else:
+            self._rerank(p)
+
+    @contextmanager
+    def _batch(self) -> Iterator[None]:
+        """Defer re-ranking of changed players until the outermost batch ends."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._pending:
+                pending, self._pending = self._pending, set()
+                if len(pending) <= SMALL_BATCH:
+                    for p in pending:
+                        self._rerank(p)
+                else:
+                    self._rerank_many(pending)
+
+    def _rerank_many(self, changed: Set[Player]) -> None:
+        """Re-rank many players with one RankIndex.update (see there for the cost)."""
+        removed = [p._rank_key for p in changed if p._rank_key is not None]
+        added = []
+        for p in changed:
+            p._rank_key = p.rank_key()
+            added.append((p._rank_key, p))
+        self._ranking.update(removed, added)
+        for w in self._watchers:
+            for p in changed:
+                w.player_changed(p)
+
+    # ----- public API -----
+
+    def watch(self, watcher) -> None:
+        """Notify watcher of player changes (see teams.TeamBoard).
+
+        watcher.player_changed(p) runs whenever p is (re-)ranked and
+        watcher.player_removed(p) when p leaves the board. Changes made inside
+        a batch are reported once, when the batch ends.
+        """
+        self._watchers.append(watcher)
+
+    def unwatch(self, watcher) -> None:
+        self._watchers.remove(watcher)
 
     def find_index(self, name: str) -> int:
-        for i, p in enumerate(self.players):
-            if p.name == name:
-                return i
-        return -1
+        """Position of the player in self.players, or -1."""
+        _FIND_INDEX.inc()
+        if self._positions is None:
+            self._positions = PositionIndex(p.name for p in self.players)
+        return self._positions.get(name)
 
     def add_player(self, name: str, wins: int = 0, losses: int = 0) -> Player:
         """Add a new player. Raises ValueError if a player with the same name exists."""
@@ -114,20 +283,26 @@ class Leaderboard:
             raise ValueError(f"player '{name}' already exists")
         p = Player(name, wins, losses)
         self.players.append(p)
+        if self._positions is not None:
+            self._positions.append(p.name)
+        self._attach(p)
         # keep playerCount as metadata in case it was used elsewhere
         self.playerCount = max(self.playerCount, len(self.players))
         return p
 
     def remove_player(self, name: str) -> None:
         """Remove a player by name. Raises KeyError if not found."""
-        idx = self.find_index(name)
-        if idx == -1:
+        p = self._index.get(name)
+        if p is None:
             raise KeyError(f"player '{name}' not found")
-        self.players.pop(idx)
+        if self._positions is None:
+            self._positions = PositionIndex(p.name for p in self.players)
+        self.players.pop(self._positions.remove(name))
+        self._detach(p)
 
     def get_player(self, name: str) -> Optional[Player]:
-        idx = self.find_index(name)
-        return self.players[idx] if idx != -1 else None
+        _GET_PLAYER.inc()
+        return self._index.get(name)
 
     def record_match(self, winner: str, loser: str) -> None:
         """Record a single match result. Both winner and loser must exist.
@@ -135,36 +310,218 @@ class Leaderboard:
         This increments winner.winRecord and loser.lossRecord by 1.
         Raises KeyError if a player is missing.
         """
-        w = self.get_player(winner)
-        l = self.get_player(loser)
+        w = self._index.get(winner)
+        l = self._index.get(loser)
         if w is None:
             raise KeyError(f"winner '{winner}' not found")
         if l is None:
             raise KeyError(f"loser '{loser}' not found")
-        w.record_win(1)
-        l.record_loss(1)
-        #update elo ratings of players
-        self.elo.update_ratings(w, l)
+        with self._batch():
+            w.record_win(1)
+            l.record_loss(1)
+            #update elo ratings of players
+            self.elo.update_ratings(w, l)
+        RATING_UPDATES.inc()
+
+    def record_matches(self, matches: Iterable[Tuple[str, str]]) -> dict:
+        """Record many (winner, loser) results in order.
+
+        Ratings are updated sequentially exactly as repeated record_match
+        calls would, but re-ranking is deferred until the end of the batch so
+        each touched player is re-indexed once. Results that cannot be
+        applied are skipped and reported by their position in the batch.
+
+        Returns {"recorded": int, "failed": [{"index", "winner", "loser", "error"}]}.
+        """
+        index = self._index
+        exchange = self.elo.exchange
+        recorded = 0
+        failed: List[dict] = []
+        with self._batch():
+            pending = self._pending
+            for i, match in enumerate(matches):
+                try:
+                    winner, loser = match
+                except (TypeError, ValueError):
+                    failed.append({"index": i, "winner": None, "loser": None, "error": "expected a (winner, loser) pair"})
+                    continue
+                w = index.get(winner)
+                l = index.get(loser)
+                if w is None or l is None:
+                    missing = f"winner '{winner}' not found" if w is None else f"loser '{loser}' not found"
+                    failed.append({"index": i, "winner": winner, "loser": loser, "error": missing})
+                    continue
+                pending.add(w)
+                pending.add(l)
+                w._wins += 1
+                l._losses += 1
+                w._rating, l._rating = exchange(w._rating, l._rating)
+                recorded += 1
+            if recorded:
+                self.version += 1
+                RATING_UPDATES.inc(recorded)
+        return {"recorded": recorded, "failed": failed}
+
+    def queue_match(self, winner: str, loser: str) -> int:
+        """Queue a result for the current rating period (see close_period).
+
+        Nothing changes until the period is closed, so this is only an
+        append. Raises KeyError if a player is missing. Returns the number
+        of results queued in the period.
+        """
+        if winner not in self._index:
+            raise KeyError(f"winner '{winner}' not found")
+        if loser not in self._index:
+            raise KeyError(f"loser '{loser}' not found")
+        self._period.append((winner, loser))
+        return len(self._period)
+
+    def queue_matches(self, matches: Iterable[Tuple[str, str]]) -> dict:
+        """Queue many (winner, loser) results; the batch form of queue_match.
+
+        Results naming a missing player are skipped and reported like
+        record_matches failures. Returns {"queued": int, "failed": [...]}.
+        """
+        queued = 0
+        failed: List[dict] = []
+        for i, match in enumerate(matches):
+            try:
+                winner, loser = match
+                self.queue_match(winner, loser)
+            except (TypeError, ValueError):
+                failed.append({"index": i, "winner": None, "loser": None, "error": "expected a (winner, loser) pair"})
+            except KeyError as exc:
+                failed.append({"index": i, "winner": winner, "loser": loser, "error": exc.args[0]})
+            else:
+                queued += 1
+        return {"queued": queued, "failed": failed}
+
+    @property
+    def period_matches(self) -> int:
+        """Results queued in the open rating period."""
+        return len(self._period)
+
+    def close_period(self) -> dict:
+        """Apply every queued result at once and start a new rating period.
+
+        Each result is scored against the ratings players had when the
+        period opened (Elo.period_changes), so the outcome does not depend on
+        the order results arrived in. Records and ratings are then committed
+        in one batch. Results whose players were removed since they were
+        queued are skipped and reported like record_matches failures.
+
+        Returns {"recorded": int, "players": int, "failed": [...]}.
+        """
+        queued, self._period = self._period, []
+        ids: Dict[str, int] = {}
+        players: List[Player] = []
+        winners: List[int] = []
+        losers: List[int] = []
+        failed: List[dict] = []
+        for i, (winner, loser) in enumerate(queued):
+            w, l = self._index.get(winner), self._index.get(loser)
+            if w is None or l is None:
+                missing = f"winner '{winner}' not found" if w is None else f"loser '{loser}' not found"
+                failed.append({"index": i, "winner": winner, "loser": loser, "error": missing})
+                continue
+            for p in (w, l):
+                if p.name not in ids:
+                    ids[p.name] = len(players)
+                    players.append(p)
+            winners.append(ids[winner])
+            losers.append(ids[loser])
+        if winners:
+            changes = self.elo.period_changes([p.rating for p in players], winners, losers)
+            wins = [0] * len(players)
+            losses = [0] * len(players)
+            for w_id, l_id in zip(winners, losers):
+                wins[w_id] += 1
+                losses[l_id] += 1
+            with self._batch():
+                for i, p in enumerate(players):
+                    p.update_records(p.wins + wins[i], p.losses + losses[i], round(p.rating + float(changes[i]), 2))
+            RATING_UPDATES.inc(len(winners))
+        return {"recorded": len(winners), "players": len(players), "failed": failed}
+
+    def rate_from_records(self, names: Optional[List[str]] = None) -> None:
+        """Rebuild ratings from each player's win/loss record in one pass.
+
+        Uses Elo.ratings_from_records, so importing thousands of players
+        with existing records costs one bulk call instead of replaying every
+        game. Defaults to every player on the board.
+        """
+        targets = self.players if names is None else [self._index[n] for n in names]
+        ratings = self.elo.ratings_from_records((p.wins, p.losses) for p in targets)
+        with self._batch():
+            for p, rating in zip(targets, ratings):
+                p.rating = rating
 
     def standings(self) -> List[Player]:
         """Return the players sorted by the ranking rules described above."""
-        # sort by key tuple and reverse to have highest first
-        return sorted(
-            self.players,
-            key=lambda p: (p.rating, p.win_rate, p.wins, -p.losses, p.name),
-            reverse=True,
-        )
+        _STANDINGS.inc()
+        return self._ranking.slice(0, len(self._ranking))
 
     def top_n(self, n: int = 10) -> List[Player]:
-        return self.standings()[: max(0, int(n))]
+        _TOP_N.inc()
+        return self._ranking.slice(0, max(0, int(n)))
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[Player]:
+        """Return standings[offset:offset + limit] without building the full list."""
+        _PAGE.inc()
+        offset = max(0, int(offset))
+        return self._ranking.slice(offset, offset + max(0, int(limit)))
+
+    def around(self, name: str, radius: int = 5) -> Tuple[int, List[Player]]:
+        """Return (offset, players) for the window of `radius` places either side of a player.
+
+        offset is the 0-based standings position of the first returned player.
+        Raises KeyError if the player is not found.
+        """
+        _AROUND.inc()
+        radius = max(0, int(radius))
+        position = self.rank(name) - 1
+        start = max(0, position - radius)
+        return start, self._ranking.slice(start, position + radius + 1)
+
+    def rank(self, name: str) -> int:
+        """Return the 1-based standings position of a player. Raises KeyError if not found."""
+        _RANK.inc()
+        p = self._index.get(name)
+        if p is None or p._rank_key is None:
+            raise KeyError(f"player '{name}' not found")
+        return self._ranking.rank_of(p._rank_key) + 1
+
+    def to_table(self) -> "PlayerTable":
+        """Copy the players into a new columnar PlayerTable."""
+        from columnar import PlayerTable
+        return PlayerTable.from_players(self.players)
+
+    def probability_matrix(self, names: List[str]):
+        """Elo.probability_matrix for the named players, in the given order.
+
+        Raises KeyError if a player is not found.
+        """
+        ratings = []
+        for name in names:
+            p = self._index.get(name)
+            if p is None:
+                raise KeyError(f"player '{name}' not found")
+            ratings.append(p.rating)
+        return self.elo.probability_matrix(ratings)
 
     def to_dict(self) -> dict:
-        return {"name": self.name, "playerCount": self.playerCount, "players": [p.to_dict() for p in self.players]}
+        d = {"name": self.name, "playerCount": self.playerCount, "players": [p.to_dict() for p in self.players]}
+        if self._period:
+            # results queued in the open rating period
+            d["period"] = [list(m) for m in self._period]
+        return d
 
     @classmethod
     def from_dict(cls, d: dict) -> "Leaderboard":
         players = [Player.from_dict(pd) for pd in d.get("players", [])]
-        return cls(name=d.get("name", ""), playerCount=d.get("playerCount", len(players)), players=players)
+        lb = cls(name=d.get("name", ""), playerCount=d.get("playerCount", len(players)), players=players)
+        lb._period = [(w, l) for w, l in d.get("period", [])]
+        return lb
 
     def __repr__(self) -> str:
-        return f"Leaderboard(name={self.name!r}, players={len(self.players)})"      
\ No newline at end of file
+        return f"Leaderboard(name={self.name!r}, players={len(self.players)})"
@@ -0,0 +1,219 @@
+"""Live standings deltas pushed to subscribers (server-sent events).
+
+LeaderboardService hands every snapshot it publishes to a
+DeltaBroadcaster together with the names of the players its mutations
+touched. The broadcaster coalesces bursts: at most once per
+`min_interval` it diffs the last snapshot it emitted against the newest
+one over the accumulated names, encodes that delta as one SSE frame and
+appends the same bytes to every subscriber's queue.
+
+A delta lists only the players whose row changed:
+
+    {"baseVersion": 40, "version": 42, "total": 1000, "players": [
+        {"name": "bob", "rating": 1516.0, "winRecord": 3, "lossRecord": 1, "rank": 2, "prevRank": 7},
+        {"name": "eve", "rank": null, "prevRank": 12},                   # removed
+    ]}
+
+Every other player kept its relative order, so a client can derive its
+new rank from the changed players' prevRank/rank alone. Deltas chain:
+each applies to the state at its baseVersion, which is the version of
+the previous frame. Clients (re)load that state from snapshot(), the
+last snapshot sent (the server's /players?live=1). When a delta cannot be
+computed (too many changes, unknown mutations) or a subscriber falls
+behind, a "reset" event tells the client to refetch instead.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Iterable, Iterator, List, Optional, Set
+
+if TYPE_CHECKING:  # avoid an import cycle; service imports this module
+    from service import StandingsSnapshot
+
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+
+def sse_frame(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+def diff_snapshots(old: "StandingsSnapshot", new: "StandingsSnapshot", names: Iterable[str]) -> dict:
+    """Delta (module docstring format) between two snapshots over the given names."""
+    players = []
+    for name in names:
+        prev_rank, rank = old.rank(name), new.rank(name)
+        if rank is None:
+            if prev_rank is not None:
+                players.append({"name": name, "rank": None, "prevRank": prev_rank})
+            continue
+        row = new.get(name)
+        if rank == prev_rank and row == old.get(name):
+            continue
+        players.append(dict(row, rank=rank, prevRank=prev_rank))  # type: ignore[arg-type]
+    return {"baseVersion": old.version, "version": new.version, "total": new.total, "players": players}
+
+
+class Subscription:
+    """One subscriber's queue of encoded frames.
+
+    The queue is bounded: a subscriber that falls more than `max_pending`
+    frames behind has its backlog replaced by a single reset frame.
+    """
+
+    def __init__(self, max_pending: int = 64):
+        self.max_pending = int(max_pending)
+        self._frames: Deque[bytes] = deque()
+        self._cond = threading.Condition()
+
+    def deliver(self, frame: bytes, reset_frame: bytes) -> None:
+        with self._cond:
+            if len(self._frames) >= self.max_pending:
+                self._frames.clear()
+                frame = reset_frame
+            self._frames.append(frame)
+            self._cond.notify()
+
+    def _pop(self) -> Optional[bytes]:
+        with self._cond:
+            return self._frames.popleft() if self._frames else None
+
+    def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Next frame, or None if none arrived within timeout."""
+        with self._cond:
+            if not self._frames:
+                self._cond.wait(timeout)
+            return self._frames.popleft() if self._frames else None
+
+
+class AsyncSubscription(Subscription):
+    """Subscription awaited from an event loop; delivery wakes the loop thread-safely."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int = 64):
+        super().__init__(max_pending)
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def deliver(self, frame: bytes, reset_frame: bytes) -> None:
+        super().deliver(frame, reset_frame)
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        frame = self._pop()
+        if frame is None:
+            self._ready.clear()
+            frame = self._pop()  # delivered between the first pop and clear()
+        if frame is None:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            frame = self._pop()
+        return frame
+
+
+class DeltaBroadcaster:
+    """Coalesces published snapshots into deltas and fans them out to subscribers."""
+
+    def __init__(self, snapshot: "StandingsSnapshot", min_interval: float = 0.25, max_changes: int = 500):
+        self.min_interval = float(min_interval)
+        # deltas touching more players than this are sent as a reset
+        self.max_changes = int(max_changes)
+        self._base = self._latest = snapshot
+        # names touched since the last emitted delta; None means unknown
+        self._touched: Optional[Set[str]] = set()
+        self._subscribers: List[Subscription] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self.frames_sent = 0
+        self._thread = threading.Thread(target=self._run, name="leaderboard-broadcaster", daemon=True)
+        self._thread.start()
+
+    # ----- subscribers -----
+
+    def subscribe(self, sub: Optional[Subscription] = None) -> Subscription:
+        sub = sub if sub is not None else Subscription()
+        with self._cond:
+            self._subscribers = self._subscribers + [sub]  # copy-on-write for the sender
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._cond:
+            self._subscribers = [s for s in self._subscribers if s is not sub]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def snapshot(self) -> "StandingsSnapshot":
+        """The last snapshot sent to subscribers; the next delta applies on top of it."""
+        return self._base
+
+    def reset_frame(self) -> bytes:
+        """A reset to the last sent snapshot (also the first frame of every stream)."""
+        base = self._base
+        return sse_frame("reset", {"version": base.version}, base.version)
+
+    def events(self, keepalive: float = 15.0) -> Iterator[bytes]:
+        """Subscribe and yield SSE frames forever (a streaming response body).
+
+        The first frame is a reset carrying the current version; closing the
+        generator unsubscribes.
+        """
+        sub = self.subscribe()
+        try:
+            yield self.reset_frame()
+            while True:
+                yield sub.get(keepalive) or KEEPALIVE_FRAME
+        finally:
+            self.unsubscribe(sub)
+
+    # ----- producer -----
+
+    def publish(self, snapshot: "StandingsSnapshot", touched: Optional[Iterable[str]]) -> None:
+        """Record a newly published snapshot and the players changed since the previous one."""
+        with self._cond:
+            self._latest = snapshot
+            if touched is None or self._touched is None:
+                self._touched = None
+            else:
+                self._touched.update(touched)
+            self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        last_emit = 0.0
+        while True:
+            with self._cond:
+                while not self._closed and self._latest is self._base:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            # let a burst of publishes accumulate into one delta
+            wait = last_emit + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            with self._cond:
+                base, latest, touched = self._base, self._latest, self._touched
+                self._base, self._touched = latest, set()
+                subscribers = self._subscribers
+            last_emit = time.monotonic()
+            if not subscribers:
+                continue
+            reset = sse_frame("reset", {"version": latest.version}, latest.version)
+            if touched is None or len(touched) > self.max_changes:
+                frame = reset
+            else:
+                frame = sse_frame("delta", diff_snapshots(base, latest, touched), latest.version)
+            # encoded once, shared by every subscriber
+            for sub in subscribers:
+                sub.deliver(frame, reset)
+            self.frames_sent += 1
@@ -0,0 +1,179 @@
+"""Load-test harness comparing leaderboard API deployments.
+
+Opens `--concurrency` keep-alive HTTP/1.1 connections per target and
+issues requests for `--duration` seconds, then reports requests/sec and
+latency percentiles. A fraction of requests (`--write-ratio`) are
+POST /record_match between seeded players; the rest are paged
+GET /players reads.
+
+Compare the Flask server with the ASGI mode:
+
+    python server.py                                  # :5000
+    uvicorn asgi_server:app --port 8000               # :8000
+    python loadtest.py http://127.0.0.1:5000 http://127.0.0.1:8000 -c 200 -d 10
+
+Only the standard library is used.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[dict] = None) -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode() if body is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n"
+        )
+        self.writer.write(head.encode("latin-1") + payload)
+        status, data, keep_alive = await self._read_response()
+        if not keep_alive:
+            self.close()
+        return status, data
+
+    async def _read_response(self) -> Tuple[int, bytes, bool]:
+        reader = self.reader
+        status_line = await reader.readline()  # type: ignore[union-attr]
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        version, status = status_line.split()[:2]
+        headers = {}
+        while True:
+            line = await reader.readline()  # type: ignore[union-attr]
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)  # type: ignore[union-attr]
+                chunk = await reader.readexactly(size + 2)  # type: ignore[union-attr]
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))  # type: ignore[union-attr]
+        else:
+            data = await reader.read()  # type: ignore[union-attr]
+            return int(status), data, False
+
+        keep_alive = headers.get("connection", "").lower() != "close" and version != b"HTTP/1.0"
+        return int(status), data, keep_alive
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def _seed(host: str, port: int, players: int) -> List[str]:
+    conn = _Connection(host, port)
+    names = [f"load{i}" for i in range(players)]
+    for name in names:
+        await conn.request("POST", "/add_player", {"name": name})  # duplicates from earlier runs are fine
+    conn.close()
+    return names
+
+
+async def run_target(url: str, concurrency: int, duration: float, write_ratio: float,
+                     players: int, page_size: int) -> dict:
+    """Load one base URL and return its summary."""
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    names = await _seed(host, port, players)
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(seed: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed)
+        conn = _Connection(host, port)
+        while time.perf_counter() < deadline:
+            if rng.random() < write_ratio:
+                w, l = rng.sample(names, 2)
+                method, path, body = "POST", "/record_match", {"winner": w, "loser": l}
+            else:
+                offset = rng.randrange(0, max(1, players - page_size + 1))
+                method, path, body = "GET", f"/players?offset={offset}&limit={page_size}", None
+            start = time.perf_counter()
+            try:
+                status, _ = await conn.request(method, path, body)
+                if status >= 400:
+                    errors += 1
+            except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError):
+                errors += 1
+                conn.close()
+                continue
+            latencies.append(time.perf_counter() - start)
+        conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "url": url,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+", help="base URLs to compare, e.g. http://127.0.0.1:5000")
+    parser.add_argument("-c", "--concurrency", type=int, default=100)
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="seconds per target")
+    parser.add_argument("-w", "--write-ratio", type=float, default=0.1)
+    parser.add_argument("--players", type=int, default=200, help="players seeded before the run")
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [
+        asyncio.run(run_target(url, args.concurrency, args.duration, args.write_ratio, args.players, args.page_size))
+        for url in args.urls
+    ]
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'target':<32} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+        for r in results:
+            print(f"{r['url']:<32} {r['rps']:>10.1f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['max_ms']:>9.2f} {r['errors']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""Rating-proximity matchmaking over a queue of waiting players.
+
+Waiting players are kept in a ranking.RankIndex keyed by (rating, name),
+so the closest-rated opponents of a player are its neighbours in that
+order: each candidate inspected costs O(log n), instead of a scan of
+the whole queue per lookup.
+
+Each ticket has a rating window that starts at `base_window` and grows
+by `window_growth` points per second waited, up to `max_window`. Two
+players may be paired only if each one's rating lies inside the other's
+window, so a long wait widens the search without forcing a newcomer
+into a lopsided game.
+
+pair_all() pairs the whole queue closest gap first from a heap. In
+rating order a player's closest opponent is a neighbour, so neighbouring
+gaps seed the heap; where a neighbour's window refuses the pairing, the
+player's nearest acceptable opponent further out goes in instead, and a
+player whose partner was taken by a closer pair looks again.
+
+A match's quality is 2 * min(p, 1 - p) for the Elo win probability p of
+either side: 1.0 for an even game, approaching 0 for a foregone one.
+"""
+
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional
+
+from elo import Elo
+from ranking import RankIndex
+
+
+class Ticket:
+    """One waiting player; the rating is the one they had when they joined the queue."""
+
+    __slots__ = ("name", "rating", "enqueued_at")
+
+    def __init__(self, name: str, rating: float, enqueued_at: float):
+        self.name = name
+        self.rating = float(rating)
+        self.enqueued_at = enqueued_at
+
+    @property
+    def key(self) -> tuple:
+        return (self.rating, self.name)
+
+    def to_dict(self, now: float) -> dict:
+        return {"name": self.name, "rating": self.rating, "waited": round(max(0.0, now - self.enqueued_at), 3)}
+
+
+class Matchmaker:
+    """Thread-safe matchmaking queue with expanding rating windows.
+
+    `clock` supplies the current time in seconds (time.monotonic by
+    default); every method also accepts an explicit `now`.
+    """
+
+    def __init__(self, elo: Elo, base_window: float = 50, window_growth: float = 10, max_window: float = 400,
+                 clock=time.monotonic):
+        self.elo = elo
+        self.base_window = float(base_window)
+        self.window_growth = float(window_growth)
+        self.max_window = float(max_window)
+        self._clock = clock
+        self._tickets: Dict[str, Ticket] = {}
+        self._index = RankIndex()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tickets
+
+    def _now(self, now: Optional[float]) -> float:
+        return self._clock() if now is None else now
+
+    # ----- queue -----
+
+    def enqueue(self, name: str, rating: float, now: Optional[float] = None) -> dict:
+        """Add a player to the queue. Raises ValueError if they are already waiting."""
+        now = self._now(now)
+        with self._lock:
+            if name in self._tickets:
+                raise ValueError(f"player '{name}' is already queued")
+            ticket = Ticket(name, rating, now)
+            self._tickets[name] = ticket
+            self._index.insert(ticket.key, ticket)
+        return ticket.to_dict(now)
+
+    def dequeue(self, name: str) -> None:
+        """Take a player out of the queue. Raises KeyError if they are not waiting."""
+        with self._lock:
+            self._remove(name)
+
+    def _remove(self, name: str) -> Ticket:
+        ticket = self._tickets.pop(name, None)
+        if ticket is None:
+            raise KeyError(f"player '{name}' is not queued")
+        self._index.remove(ticket.key)
+        return ticket
+
+    def waiting(self, now: Optional[float] = None) -> List[dict]:
+        """Queued players, highest rating first, with their current windows."""
+        now = self._now(now)
+        with self._lock:
+            tickets = list(self._index)
+        return [dict(t.to_dict(now), window=round(self.window(t, now), 2)) for t in tickets]
+
+    # ----- pairing -----
+
+    def window(self, ticket: Ticket, now: float) -> float:
+        """Rating distance this ticket accepts after waiting until `now`."""
+        waited = max(0.0, now - ticket.enqueued_at)
+        return min(self.max_window, self.base_window + self.window_growth * waited)
+
+    def acceptable(self, a: Ticket, b: Ticket, now: float) -> bool:
+        gap = abs(a.rating - b.rating)
+        return gap <= self.window(a, now) and gap <= self.window(b, now)
+
+    def quality(self, rating_a: float, rating_b: float) -> float:
+        """1.0 for an even game, falling towards 0 as the result becomes certain."""
+        p = self.elo.expected_score(rating_a, rating_b)
+        return 2 * min(p, 1 - p)
+
+    def _match(self, a: Ticket, b: Ticket) -> dict:
+        return {
+            "players": [a.name, b.name],
+            "ratings": [a.rating, b.rating],
+            "ratingGap": round(abs(a.rating - b.rating), 2),
+            "winProbability": round(self.elo.expected_score(a.rating, b.rating), 6),
+            "quality": round(self.quality(a.rating, b.rating), 6),
+        }
+
+    def _nearest(self, ticket: Ticket, now: float) -> Optional[Ticket]:
+        # walk outwards from the ticket's rank while candidates are inside its window
+        limit = self.window(ticket, now)
+        rank = self._index.rank_of(ticket.key)
+        above, below = rank - 1, rank + 1
+        while True:
+            up = self._index.slice(above, above + 1) if above >= 0 else []
+            down = self._index.slice(below, below + 1)
+            gap_up = up[0].rating - ticket.rating if up else None
+            gap_down = ticket.rating - down[0].rating if down else None
+            if gap_up is not None and gap_up > limit:
+                up, gap_up = [], None
+            if gap_down is not None and gap_down > limit:
+                down, gap_down = [], None
+            if not up and not down:
+                return None
+            # look at the closer side first; ties go to the higher rating
+            if up and (not down or gap_up <= gap_down):  # type: ignore[operator]
+                candidate, above = up[0], above - 1
+            else:
+                candidate, below = down[0], below + 1
+            if self.acceptable(ticket, candidate, now):
+                return candidate
+
+    def find_opponent(self, name: str, now: Optional[float] = None) -> Optional[dict]:
+        """Pair a queued player with the closest-rated acceptable opponent.
+
+        Both players leave the queue and the match is returned, or None if no
+        waiting player is inside the windows yet. Raises KeyError if `name` is
+        not queued.
+        """
+        now = self._now(now)
+        with self._lock:
+            ticket = self._tickets.get(name)
+            if ticket is None:
+                raise KeyError(f"player '{name}' is not queued")
+            opponent = self._nearest(ticket, now)
+            if opponent is None:
+                return None
+            self._remove(ticket.name)
+            self._remove(opponent.name)
+        return self._match(ticket, opponent)
+
+    def pair_all(self, now: Optional[float] = None) -> List[dict]:
+        """Pair as much of the queue as the windows allow, closest ratings first.
+
+        Paired players leave the queue; the rest keep waiting. Matches are
+        returned in the order they were formed.
+        """
+        now = self._now(now)
+        with self._lock:
+            tickets: List[Ticket] = list(self._index)
+            position = {t.name: i for i, t in enumerate(tickets)}
+            paired = [False] * len(tickets)
+            heap = []
+
+            def push(i: int, j: int) -> bool:
+                if i > j:
+                    i, j = j, i
+                a, b = tickets[i], tickets[j]
+                if not self.acceptable(a, b, now):
+                    return False
+                # equal gaps: the pair containing the longest-waiting player first
+                heapq.heappush(heap, (a.rating - b.rating, min(a.enqueued_at, b.enqueued_at), i, j))
+                return True
+
+            def seek(i: int) -> None:
+                # closest acceptable partner still queued (paired players have left the index)
+                other = self._nearest(tickets[i], now)
+                if other is not None:
+                    push(i, position[other.name])
+
+            # in rating order a player's closest acceptable opponent is its
+            # neighbour unless that pairing is refused; then it lies further out
+            sought = set()
+            for i in range(len(tickets) - 1):
+                if not push(i, i + 1):
+                    for k in (i, i + 1):
+                        if k not in sought:
+                            sought.add(k)
+                            seek(k)
+            matches = []
+            while heap:
+                _, _, i, j = heapq.heappop(heap)
+                if paired[i] or paired[j]:
+                    # the partner went to a closer pair: look again from the one left
+                    if not (paired[i] and paired[j]):
+                        seek(j if paired[i] else i)
+                    continue
+                paired[i] = paired[j] = True
+                matches.append(self._match(tickets[i], tickets[j]))
+                self._remove(tickets[i].name)
+                self._remove(tickets[j].name)
+        return matches
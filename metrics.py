@@ -0,0 +1,186 @@
+"""In-process metrics with a Prometheus text exposition.
+
+Counter, Gauge and Histogram register themselves with a Registry (the
+module-level REGISTRY by default), optionally with label names:
+
+    REQUESTS = Counter("http_requests_total", "Requests served", ("route", "status"))
+    REQUESTS.labels("/players", "200").inc()
+
+Registry.render() produces the text format served by GET /metrics.
+Counter and Gauge updates are plain attribute writes so they are cheap
+enough for the rating and lookup hot paths; under heavy thread
+contention an occasional increment may be lost, which is acceptable for
+monitoring. Histograms lock per observation. A Gauge (or Counter) built
+with `fn` is evaluated only when the registry is rendered.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# seconds; tuned for request and snapshot latencies
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric '{metric.name}' already registered")
+            self._metrics[metric.name] = metric
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def get(self, name: str) -> Optional["_Metric"]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for suffix, labels, value in m.samples():
+                lines.append(f"{m.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str = "", labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def labels(self, *values) -> "_Metric":
+        """The child metric for these label values (created on first use)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _own_samples(self) -> Iterator[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """(name suffix, rendered labels, value) triples."""
+        if not self.labelnames:
+            yield from self._own_samples()
+            return
+        for key, child in sorted(self._children.items()):
+            for suffix, extra, value in child._own_samples():
+                yield suffix, _format_labels(self.labelnames, key, extra.strip("{}")), value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "", labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY, fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, help, labelnames, registry)
+        self.value = 0.0
+        self._fn = fn
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, registry=None)
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def _own_samples(self):
+        yield "", "", self._fn() if self._fn is not None else self.value
+
+
+class Gauge(Counter):
+    """A value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, registry=None)
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (cumulative buckets, plus sum and count)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", labelnames: Sequence[str] = (),
+                 registry: Optional[Registry] = REGISTRY, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, registry=None, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def _own_samples(self):
+        with self._lock:
+            counts, total, count = list(self._counts), self.sum, self.count
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            cumulative += n
+            yield "_bucket", '{le="%s"}' % _format_value(bound), cumulative
+        yield "_sum", "", total
+        yield "_count", "", count
@@ -0,0 +1,291 @@
+"""Durable storage for a Leaderboard: write-ahead mutation log plus snapshots.
+
+Every mutation is appended as one JSON line to the current log segment.
+Lines are buffered and fsync'ed in groups (every `sync_every` entries or
+`sync_interval` seconds, whichever comes first), so a write costs O(1).
+
+Every `snapshot_every` entries the store captures the board, starts a new
+log segment and writes the snapshot from a background thread. Once the
+snapshot is on disk the older segments are deleted, so recovery only has
+to load the latest snapshot and replay the entries logged after it.
+
+A store holds an exclusive lock on its directory (store.lock) from
+load() until close(), so two processes can never log into the same
+directory; the second one fails to load instead of truncating the
+other's segments.
+
+Directory layout:
+    store.lock                    held (flock) by the process using the directory
+    snapshot.json                 {"seq": N, "k_factor": k, "leaderboard": {...}}
+    log-000000000001.ndjson       {"seq": 1, "op": "add", ...} per line
+"""
+
+import json
+import os
+import threading
+import time
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from elo import Elo
+from leaderboard import Leaderboard, Player
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE = "store.lock"
+SNAPSHOT_FILE = "snapshot.json"
+LOG_PREFIX = "log-"
+LOG_SUFFIX = ".ndjson"
+
+
+def apply_entry(lb: Leaderboard, entry: dict) -> None:
+    """Apply one logged mutation to a leaderboard."""
+    op = entry["op"]
+    if op == "add":
+        p = lb.add_player(entry["name"], entry["wins"], entry["losses"])
+        p.rating = entry["rating"]
+    elif op == "update":
+        lb.get_player(entry["name"]).update_records(entry["wins"], entry["losses"], entry["rating"])  # type: ignore[union-attr]
+    elif op == "remove":
+        lb.remove_player(entry["name"])
+    elif op == "match":
+        lb.record_match(entry["winner"], entry["loser"])
+    elif op == "matches":
+        lb.record_matches(entry["matches"])
+    elif op == "queue":
+        lb.queue_matches(entry["matches"])
+    elif op == "period":
+        lb.close_period()
+    else:
+        raise ValueError(f"unknown log operation '{op}'")
+
+
+class LeaderboardStore:
+    """Append-only mutation log with periodic background snapshots."""
+
+    def __init__(self, directory: str, sync_every: int = 64, sync_interval: float = 0.05, snapshot_every: int = 10000):
+        self.directory = str(directory)
+        self.sync_every = int(sync_every)
+        self.sync_interval = float(sync_interval)
+        self.snapshot_every = int(snapshot_every)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._dir_lock: Optional[IO[str]] = None
+        self._lb: Optional[Leaderboard] = None
+        self._file: Optional[IO[str]] = None
+        self._seq = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._since_snapshot = 0
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    # ----- directory lock -----
+
+    def _lock_directory(self) -> None:
+        """Take the exclusive directory lock; RuntimeError if another store holds it."""
+        if self._dir_lock is not None:
+            return
+        f = open(os.path.join(self.directory, LOCK_FILE), "a+", encoding="utf-8")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            f.close()
+            raise RuntimeError(f"data directory '{self.directory}' is in use by another leaderboard store")
+        f.seek(0)
+        f.truncate()
+        f.write(f"{os.getpid()}\n")
+        f.flush()
+        self._dir_lock = f
+
+    def _unlock_directory(self) -> None:
+        # closing the file releases the lock
+        if self._dir_lock is not None:
+            self._dir_lock.close()
+            self._dir_lock = None
+
+    # ----- recovery -----
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        out = []
+        for fname in os.listdir(self.directory):
+            if fname.startswith(LOG_PREFIX) and fname.endswith(LOG_SUFFIX):
+                start = int(fname[len(LOG_PREFIX):-len(LOG_SUFFIX)])
+                out.append((start, os.path.join(self.directory, fname)))
+        out.sort()
+        return out
+
+    def _read_segment(self, path: str) -> Iterator[dict]:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # torn write from a crash: nothing after it was acknowledged
+                    return
+
+    def load(self, name: str = "Main", k_factor: float = 32) -> Leaderboard:
+        """Load the latest snapshot, replay the log tail and start logging.
+
+        Raises RuntimeError if another store has the directory open.
+        """
+        self._lock_directory()
+        snapshot_seq = 0
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                snap = json.load(f)
+            snapshot_seq = int(snap["seq"])
+            k_factor = snap.get("k_factor", k_factor)
+            lb = Leaderboard.from_dict(snap["leaderboard"])
+            lb.elo = Elo(k_factor)
+        else:
+            lb = Leaderboard(name, k_factor=k_factor)
+
+        seq = snapshot_seq
+        for _, segment in self._segments():
+            for entry in self._read_segment(segment):
+                if entry["seq"] <= seq:
+                    continue
+                apply_entry(lb, entry)
+                seq = entry["seq"]
+
+        with self._lock:
+            self._lb = lb
+            self._seq = seq
+            self._since_snapshot = seq - snapshot_seq
+            self._open_segment()
+        self._start_flusher()
+        return lb
+
+    # ----- logging -----
+
+    def _open_segment(self) -> None:
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+        path = os.path.join(self.directory, f"{LOG_PREFIX}{self._seq + 1:012d}{LOG_SUFFIX}")
+        try:
+            self._file = open(path, "x", encoding="utf-8")
+        except FileExistsError:
+            # we hold the directory lock, so this is a leftover of a crashed run
+            # whose first line was torn (load() replayed everything readable);
+            # starting it fresh loses nothing
+            os.remove(path)
+            self._file = open(path, "x", encoding="utf-8")
+
+    def _sync(self) -> None:
+        if self._unsynced and self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _start_flusher(self) -> None:
+        # syncs the tail of a burst that never reached sync_every entries
+        def run():
+            while not self._closed.wait(self.sync_interval):
+                with self._lock:
+                    if self._file is not None:
+                        self._sync()
+
+        self._flusher = threading.Thread(target=run, name="leaderboard-log-flusher", daemon=True)
+        self._flusher.start()
+
+    def append(self, op: str, **fields) -> int:
+        """Log one mutation and return its sequence number."""
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("store is not open; call load() first")
+            self._seq += 1
+            fields["seq"] = self._seq
+            fields["op"] = op
+            self._file.write(json.dumps(fields, separators=(",", ":")) + "\n")
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+            self._since_snapshot += 1
+            if self._since_snapshot >= self.snapshot_every:
+                self._start_snapshot()
+            return self._seq
+
+    def log_add(self, p: Player) -> int:
+        return self.append("add", name=p.name, wins=p.wins, losses=p.losses, rating=p.rating)
+
+    def log_update(self, p: Player) -> int:
+        return self.append("update", name=p.name, wins=p.wins, losses=p.losses, rating=p.rating)
+
+    def log_remove(self, name: str) -> int:
+        return self.append("remove", name=name)
+
+    def log_match(self, winner: str, loser: str) -> int:
+        return self.append("match", winner=winner, loser=loser)
+
+    def log_matches(self, matches: Iterable[Tuple[str, str]]) -> int:
+        return self.append("matches", matches=[list(m) for m in matches])
+
+    def log_queue(self, matches: Iterable[Tuple[str, str]]) -> int:
+        return self.append("queue", matches=[list(m) for m in matches])
+
+    def log_period(self) -> int:
+        return self.append("period")
+
+    # ----- snapshots -----
+
+    def _start_snapshot(self) -> None:
+        """Capture the board and write it in the background (lock held)."""
+        if self._lb is None or (self._snapshot_thread is not None and self._snapshot_thread.is_alive()):
+            return
+        data = {"seq": self._seq, "k_factor": self._lb.elo.k_factor, "leaderboard": self._lb.to_dict()}
+        self._since_snapshot = 0
+        # entries after this point go to a fresh segment, so every older
+        # segment is covered by the snapshot once it is written
+        self._open_segment()
+        keep_from = self._seq + 1
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot, args=(data, keep_from), name="leaderboard-snapshot", daemon=True
+        )
+        self._snapshot_thread.start()
+
+    def _write_snapshot(self, data: dict, keep_from: int) -> None:
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        for start, segment in self._segments():
+            if start < keep_from:
+                os.remove(segment)
+
+    def snapshot(self) -> None:
+        """Take a snapshot now and wait for it to reach disk."""
+        running = self._snapshot_thread
+        if running is not None:
+            running.join()
+        with self._lock:
+            self._start_snapshot()
+            thread = self._snapshot_thread
+        if thread is not None:
+            thread.join()
+
+    def close(self) -> None:
+        """Sync outstanding entries and stop background threads."""
+        self._closed.set()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+        self._unlock_directory()
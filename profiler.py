@@ -0,0 +1,119 @@
+"""Opt-in sampling profiler for a running process.
+
+SamplingProfiler wakes every `interval` seconds, takes the current stack
+of every thread it is told to watch (sys._current_frames) and counts
+identical stacks. Nothing is traced between samples, so the profiled
+code runs at full speed and the overhead is bounded by the sampling rate.
+
+The result is a list of "folded" stacks (root first, frames separated by
+';'), the input format of flamegraph.pl and speedscope:
+
+    server.py:get_players;service.py:page;... 42
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from typing import Callable, Dict, List, Optional
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Samples thread stacks periodically for a fixed duration.
+
+    `thread_filter(thread_id)` selects the threads sampled on each tick
+    (default: every thread but the profiler's own).
+    """
+
+    def __init__(self, interval: float = 0.005, thread_filter: Optional[Callable[[int], bool]] = None,
+                 max_depth: int = 64):
+        self.interval = max(0.0005, float(interval))
+        self.thread_filter = thread_filter
+        self.max_depth = int(max_depth)
+        # written by the sampler thread, read by report(); both under _lock
+        self._lock = threading.Lock()
+        self._stacks: _Tally = _Tally()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float) -> None:
+        """Sample in the background for `duration` seconds (or until stop())."""
+        if self.running:
+            raise RuntimeError("profiler already running")
+        self._stop.clear()
+        self.started_at, self.stopped_at = time.time(), None
+        self._thread = threading.Thread(target=self._run, args=(float(duration),), name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, duration: float) -> None:
+        me = threading.get_ident()
+        deadline = time.monotonic() + duration
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            self.sample(exclude=me)
+        self.stopped_at = time.time()
+
+    def sample(self, exclude: Optional[int] = None) -> None:
+        """Take one sample of the selected threads."""
+        stacks = []
+        for tid, frame in sys._current_frames().items():
+            if tid == exclude or (self.thread_filter is not None and not self.thread_filter(tid)):
+                continue
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            stacks.append(";".join(reversed(labels)))
+        with self._lock:
+            self._stacks.update(stacks)
+            self.samples += len(stacks)
+
+    def _counts(self) -> _Tally:
+        """Copy of the stack counts taken under the lock."""
+        with self._lock:
+            return _Tally(self._stacks)
+
+    def folded(self, limit: Optional[int] = None) -> List[tuple]:
+        """(stack, count) pairs, most frequent first."""
+        return self._counts().most_common(limit)
+
+    @staticmethod
+    def _leaves(stacks: _Tally, limit: int) -> List[tuple]:
+        leaves: _Tally = _Tally()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+    def hot_frames(self, limit: int = 20) -> List[tuple]:
+        """(frame, count) for the innermost frame of each sample, most frequent first."""
+        return self._leaves(self._counts(), limit)
+
+    def report(self, limit: int = 50) -> Dict:
+        with self._lock:
+            stacks, samples = _Tally(self._stacks), self.samples
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": samples,
+            "startedAt": self.started_at,
+            "stoppedAt": self.stopped_at,
+            "hotFrames": [{"frame": f, "count": c} for f, c in self._leaves(stacks, limit)],
+            "stacks": [{"stack": s, "count": c} for s, c in stacks.most_common(limit)],
+        }
@@ -0,0 +1,389 @@
+"""Ordered ranking index used by the leaderboard.
+
+RankIndex is an indexable skip list. Every node stores, per level, how
+many bottom-level steps it skips, so insert/remove, "what rank is this
+key" and "give me the entry at rank i" all run in O(log n), and reading
+k consecutive entries from a rank costs O(log n + k).
+
+Keys are kept in ascending order internally; the public API speaks in
+descending ranks (rank 0 is the largest key) because that is how
+standings are read.
+
+PositionIndex tracks where each key sits in an append-only list that
+also has removals (Leaderboard.players), in O(log n) per operation.
+"""
+
+import random
+from array import array
+from operator import itemgetter
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+# enough levels for far more entries than will ever fit in memory
+_MAX_LEVELS = 32
+
+# update() relinks the whole list once a batch changes at least
+# 1/RELINK_FRACTION of the entries (measured break-even, 1e3-1e5 entries)
+RELINK_FRACTION = 8
+
+
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key: Any, value: Any, levels: int):
+        self.key = key
+        self.value = value
+        self.next: List[Optional["_Node"]] = [None] * levels
+        self.width: List[int] = [1] * levels
+
+
+class RankIndex:
+    """Indexable skip list keyed by unique, comparable keys.
+
+    The values stored alongside each key are returned by the read methods.
+    """
+
+    def __init__(self):
+        self._head = _Node(None, None, _MAX_LEVELS)
+        self._size = 0
+        self._random = random.Random()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _levels(self) -> int:
+        # geometric distribution with p = 1/2
+        levels = 1
+        bits = self._random.getrandbits(_MAX_LEVELS - 1)
+        while bits & 1 and levels < _MAX_LEVELS:
+            levels += 1
+            bits >>= 1
+        return levels
+
+    def insert(self, key: Hashable, value: Any) -> None:
+        """Insert key (which must not already be present) with its value."""
+        chain: List[_Node] = [self._head] * _MAX_LEVELS
+        steps_at_level = [0] * _MAX_LEVELS
+        node = self._head
+        for level in range(_MAX_LEVELS - 1, -1, -1):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                steps_at_level[level] += node.width[level]
+                node = nxt
+                nxt = node.next[level]
+            chain[level] = node
+
+        levels = self._levels()
+        new = _Node(key, value, levels)
+        steps = 0
+        for level in range(levels):
+            prev = chain[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, _MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def load(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Replace the contents with (key, value) pairs given in ascending key order.
+
+        Builds the list in one O(n) pass instead of n O(log n) inserts.
+        Keys must be unique and sorted; this is not checked.
+        """
+        levels_of = self._levels
+        self._link(_Node(key, value, levels_of()) for key, value in items)
+
+    def update(self, removed: Iterable[Hashable], added: Iterable[Tuple[Hashable, Any]]) -> None:
+        """Remove the `removed` keys and insert the `added` (key, value) pairs.
+
+        Both are applied in key order. A small batch walks the list once per
+        key, starting each search from where the previous one ended, so keys
+        close together share most of the path (O(k log(n / k)) for k keys).
+        A batch touching at least 1/RELINK_FRACTION of the entries relinks
+        the whole list in one O(n + k log k) pass instead. Removed keys must
+        be present and added keys must not be (after the removals); this is
+        not checked.
+        """
+        drop = sorted(removed)
+        fresh = sorted(added, key=itemgetter(0))
+        if max(len(drop), len(fresh)) * RELINK_FRACTION >= self._size:
+            self._relink(set(drop), fresh)
+        else:
+            self._remove_sorted(drop)
+            self._insert_sorted(fresh)
+
+    def _top(self) -> int:
+        """Highest level with any node on it (0 when empty)."""
+        head = self._head
+        level = _MAX_LEVELS - 1
+        while level and head.next[level] is None:
+            level -= 1
+        return level
+
+    def _finger(self, key: Hashable, top: int, chain: List[_Node], chain_pos: List[int]) -> None:
+        """Move chain/chain_pos to the last node before key on each level.
+
+        chain[level] must already be before key (e.g. the previous, smaller
+        key's predecessors); each level resumes from it or from the node
+        reached on the level above, whichever is further along.
+        """
+        node, pos = self._head, 0
+        for level in range(top, -1, -1):
+            if chain_pos[level] > pos:
+                node, pos = chain[level], chain_pos[level]
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                pos += node.width[level]
+                node = nxt
+                nxt = node.next[level]
+            chain[level] = node
+            chain_pos[level] = pos
+
+    def _insert_sorted(self, items: List[Tuple[Hashable, Any]]) -> None:
+        if not items:
+            return
+        top = self._top()
+        chain: List[_Node] = [self._head] * _MAX_LEVELS
+        chain_pos = [0] * _MAX_LEVELS
+        levels_of = self._levels
+        for key, value in items:
+            self._finger(key, top, chain, chain_pos)
+            levels = levels_of()
+            if levels - 1 > top:
+                # the head's widths above `top` are only settled at the end
+                for level in range(top + 1, levels):
+                    self._head.width[level] = self._size + 1
+                top = levels - 1
+            new = _Node(key, value, levels)
+            before = chain_pos[0]
+            for level in range(levels):
+                prev = chain[level]
+                steps = before - chain_pos[level]
+                new.next[level] = prev.next[level]
+                prev.next[level] = new
+                new.width[level] = prev.width[level] - steps
+                prev.width[level] = steps + 1
+                chain[level] = new
+                chain_pos[level] = before + 1
+            for level in range(levels, top + 1):
+                chain[level].width[level] += 1
+            self._size += 1
+        # above `top` only the head remains, spanning the whole list
+        for level in range(top + 1, _MAX_LEVELS):
+            self._head.width[level] = self._size + 1
+
+    def _remove_sorted(self, keys: List[Hashable]) -> None:
+        if not keys:
+            return
+        top = self._top()
+        chain: List[_Node] = [self._head] * _MAX_LEVELS
+        chain_pos = [0] * _MAX_LEVELS
+        for key in keys:
+            self._finger(key, top, chain, chain_pos)
+            target = chain[0].next[0]
+            if target is None or target.key != key:
+                raise KeyError(key)
+            levels = len(target.next)
+            for level in range(levels):
+                prev = chain[level]
+                prev.width[level] += target.width[level] - 1
+                prev.next[level] = target.next[level]
+            for level in range(levels, top + 1):
+                chain[level].width[level] -= 1
+            self._size -= 1
+        for level in range(top + 1, _MAX_LEVELS):
+            self._head.width[level] = self._size + 1
+
+    def _relink(self, drop: Set[Hashable], fresh: List[Tuple[Hashable, Any]]) -> None:
+        """update() for large batches: merge the surviving nodes with the new pairs and relink."""
+        levels_of = self._levels
+
+        def merged() -> Iterator[_Node]:
+            i, count = 0, len(fresh)
+            node = self._head.next[0]
+            while node is not None:
+                following = node.next[0]  # read before _link relinks node
+                if node.key not in drop:
+                    while i < count and fresh[i][0] < node.key:
+                        yield _Node(fresh[i][0], fresh[i][1], levels_of())
+                        i += 1
+                    yield node
+                node = following
+            for key, value in fresh[i:]:
+                yield _Node(key, value, levels_of())
+
+        self._link(merged())
+
+    def _link(self, nodes: Iterable[_Node]) -> None:
+        """Rebuild the list from nodes in ascending key order, keeping each node's height."""
+        head = _Node(None, None, _MAX_LEVELS)
+        # last node linked at each level and its position (head is 0)
+        last: List[_Node] = [head] * _MAX_LEVELS
+        last_pos = [0] * _MAX_LEVELS
+        pos = 0
+        for node in nodes:
+            pos += 1
+            for level in range(len(node.next)):
+                prev = last[level]
+                prev.next[level] = node
+                prev.width[level] = pos - last_pos[level]
+                last[level] = node
+                last_pos[level] = pos
+        # the last node of each level ends it and spans to one past the end, as insert() leaves it
+        for level in range(_MAX_LEVELS):
+            last[level].next[level] = None
+            last[level].width[level] = pos + 1 - last_pos[level]
+        self._head = head
+        self._size = pos
+
+    def remove(self, key: Hashable) -> None:
+        """Remove key. Raises KeyError if it is not present."""
+        chain: List[_Node] = [self._head] * _MAX_LEVELS
+        node = self._head
+        for level in range(_MAX_LEVELS - 1, -1, -1):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                node = nxt
+                nxt = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        levels = len(target.next)
+        for level in range(levels):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(levels, _MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def _position(self, key: Hashable) -> int:
+        """Number of keys strictly smaller than key (ascending position)."""
+        node = self._head
+        pos = 0
+        for level in range(_MAX_LEVELS - 1, -1, -1):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                pos += node.width[level]
+                node = nxt
+                nxt = node.next[level]
+        return pos
+
+    def _node_at(self, pos: int) -> _Node:
+        """Node at ascending position pos (0-based, must be in range)."""
+        node = self._head
+        remaining = pos + 1
+        for level in range(_MAX_LEVELS - 1, -1, -1):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]  # type: ignore[assignment]
+        return node
+
+    def rank_of(self, key: Hashable) -> int:
+        """Descending 0-based rank of key. Raises KeyError if not present."""
+        pos = self._position(key)
+        node = self._node_at(pos) if pos < self._size else None
+        if node is None or node.key != key:
+            raise KeyError(key)
+        return self._size - 1 - pos
+
+    def count_above(self, key: Hashable) -> int:
+        """Number of keys strictly larger than key (which need not be present)."""
+        pos = self._position(key)
+        if pos < self._size and self._node_at(pos).key == key:
+            pos += 1
+        return self._size - pos
+
+    def slice(self, start: int = 0, stop: Optional[int] = None) -> List[Any]:
+        """Values with descending rank in [start, stop)."""
+        size = self._size
+        start = max(0, start)
+        stop = size if stop is None else min(size, stop)
+        if start >= stop:
+            return []
+        # descending [start, stop) is ascending [size - stop, size - start)
+        node: Optional[_Node] = self._node_at(size - stop)
+        out = []
+        for _ in range(stop - start):
+            out.append(node.value)  # type: ignore[union-attr]
+            node = node.next[0]  # type: ignore[union-attr]
+        out.reverse()
+        return out
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.slice(0, self._size))
+
+
+class PositionIndex:
+    """Positions of keys in a list that grows by appending and shrinks by removal.
+
+    Every appended key gets the next sequence number, and its position is
+    the number of live sequence numbers before it. Until the first removal
+    that is the sequence number itself; after it a Fenwick tree over the
+    sequence numbers counts the live ones, so lookups, appends and removals
+    are O(log n). Once dead sequence numbers outnumber live ones the index
+    is renumbered in one O(n) pass.
+    """
+
+    def __init__(self, keys: Iterable[Hashable] = ()):
+        self._seq: Dict[Hashable, int] = {key: i for i, key in enumerate(keys)}
+        self._next = len(self._seq)
+        # 1-based Fenwick tree of live flags per sequence number; None while none are dead
+        self._tree: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self._seq)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._seq
+
+    def _prefix(self, i: int) -> int:
+        """Live sequence numbers below i."""
+        tree, total = self._tree, 0
+        while i > 0:
+            total += tree[i]  # type: ignore[index]
+            i &= i - 1
+        return total
+
+    def get(self, key: Hashable, default: int = -1) -> int:
+        seq = self._seq.get(key)
+        if seq is None:
+            return default
+        return seq if self._tree is None else self._prefix(seq)
+
+    def append(self, key: Hashable) -> int:
+        """Add key at the end and return its position. key must not be present."""
+        seq = self._next
+        self._next += 1
+        self._seq[key] = seq
+        tree = self._tree
+        if tree is not None:
+            # node seq + 1 covers (seq + 1 - lowbit, seq + 1]: the new key plus the live ones below it
+            i = seq + 1
+            tree.append(1 + self._prefix(seq) - self._prefix(i - (i & -i)))
+        return len(self._seq) - 1
+
+    def remove(self, key: Hashable) -> int:
+        """Drop key and return the position it had. Raises KeyError if not present."""
+        pos = self.get(key)
+        seq = self._seq.pop(key)
+        if self._tree is None:
+            tree = self._tree = array("q", [0]) + array("q", [1]) * self._next
+            for i in range(1, self._next + 1):
+                parent = i + (i & -i)
+                if parent <= self._next:
+                    tree[parent] += tree[i]
+        tree, i = self._tree, seq + 1
+        while i <= self._next:
+            tree[i] -= 1
+            i += i & -i
+        if self._next > 2 * len(self._seq):
+            # the dict holds keys in sequence order, so this is the list order
+            self._seq = {k: i for i, k in enumerate(self._seq)}
+            self._next = len(self._seq)
+            self._tree = None
+        return pos
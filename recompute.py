@@ -0,0 +1,213 @@
+"""Parallel recomputation of season standings and k-factor sweeps.
+
+Every (season, k-factor) configuration is an independent replay of a
+match list from scratch, so configurations are spread over a process
+pool. A season is shipped to the workers once per configuration as an
+EncodedSeason: its player names plus the matches packed as little-endian
+uint32 (winner id, loser id) pairs, 8 bytes a match, so no Player or
+match dict is ever pickled. Workers replay with Elo.exchange on flat
+arrays and send back the final standings (optionally only the top N) and
+how well the ratings predicted each result before it was applied:
+
+    accuracy   share of matches won by the higher-rated player (ties count 1/2)
+    brier      mean squared error of the winner's expected score
+    logLoss    mean -ln(expected score of the winner)
+
+Lower brier/logLoss is better; summarize() aggregates them per k-factor
+across seasons (weighted by match count) and picks the k with the lowest
+log loss. The replays are CPU-bound and share nothing, so throughput
+grows with the number of worker processes up to the number of cores.
+
+    python recompute.py --seasons web/sample_season.json --k 16 24 32 40 48 --workers 4
+    python recompute.py --seasons data/seasons --k 32 --top 10 --json standings.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from elo import BASE_RATING, Elo
+from seasons import CATALOG_FILE
+
+_PAIR = "I"  # array typecode for player ids (4 bytes)
+
+
+class EncodedSeason:
+    """A season's ordered match list in the compact worker format."""
+
+    __slots__ = ("label", "names", "payload")
+
+    def __init__(self, label: str, names: Sequence[str], payload: bytes):
+        self.label = label
+        self.names = tuple(names)
+        self.payload = payload
+
+    @classmethod
+    def encode(cls, label: str, matches: Iterable[Tuple[str, str]], names: Iterable[str] = ()) -> "EncodedSeason":
+        """Encode (winner, loser) pairs in the order given; `names` pre-registers players without matches."""
+        ids: Dict[str, int] = {}
+        for name in names:
+            ids.setdefault(str(name), len(ids))
+        ids_of = array(_PAIR)
+        for winner, loser in matches:
+            ids_of.append(ids.setdefault(str(winner), len(ids)))
+            ids_of.append(ids.setdefault(str(loser), len(ids)))
+        if sys.byteorder != "little":
+            ids_of.byteswap()
+        return cls(label, list(ids), ids_of.tobytes())
+
+    @classmethod
+    def from_season(cls, season: dict) -> "EncodedSeason":
+        """Encode a season dict (web/sample_season.json format), matches ordered by (date, matchId)."""
+        matches = sorted(season.get("matches", []), key=lambda m: (m.get("date", ""), m.get("matchId", 0)))
+        return cls.encode(season["seasonId"], ((m["winner"], m["loser"]) for m in matches),
+                          (p["name"] for p in season.get("players", [])))
+
+    def decode(self) -> array:
+        """Flat ids: winner of match i at 2*i, loser at 2*i + 1."""
+        ids = array(_PAIR)
+        ids.frombytes(self.payload)
+        if sys.byteorder != "little":
+            ids.byteswap()
+        return ids
+
+    def __len__(self) -> int:
+        return len(self.payload) // (2 * array(_PAIR).itemsize)
+
+
+def replay(season: EncodedSeason, k_factor: float, top: Optional[int] = None) -> dict:
+    """Replay one season at one k-factor; the unit of work run in each worker."""
+    ids = season.decode()
+    n = len(season.names)
+    ratings = array("d", [BASE_RATING]) * n
+    wins = array("l", [0]) * n
+    losses = array("l", [0]) * n
+    exchange = Elo(k_factor).exchange
+    correct = brier = log_loss = 0.0
+    for i in range(0, len(ids), 2):
+        w, l = ids[i], ids[i + 1]
+        rw, rl = ratings[w], ratings[l]
+        # winner's expected score before the result is applied
+        expected = 1 / (1 + 10 ** ((rl - rw) / 400))
+        correct += 1.0 if expected > 0.5 else 0.5 if expected == 0.5 else 0.0
+        brier += (1 - expected) ** 2
+        log_loss -= math.log(expected)
+        wins[w] += 1
+        losses[l] += 1
+        ratings[w], ratings[l] = exchange(rw, rl)
+
+    names = season.names
+
+    def rank_key(pid: int) -> tuple:
+        # same order as Player.rank_key
+        total = wins[pid] + losses[pid]
+        return (ratings[pid], wins[pid] / total if total else 0.0, wins[pid], -losses[pid], names[pid])
+
+    order = sorted(range(n), key=rank_key, reverse=True)[:top]
+    matches = len(ids) // 2
+    return {
+        "season": season.label,
+        "kFactor": k_factor,
+        "matches": matches,
+        "accuracy": correct / matches if matches else None,
+        "brier": brier / matches if matches else None,
+        "logLoss": log_loss / matches if matches else None,
+        "standings": [{"rank": r + 1, "name": names[pid], "winRecord": wins[pid], "lossRecord": losses[pid],
+                       "rating": ratings[pid]} for r, pid in enumerate(order)],
+    }
+
+
+def _replay_job(job: Tuple[EncodedSeason, float, Optional[int]]) -> dict:
+    return replay(*job)
+
+
+def recompute(seasons: Sequence[EncodedSeason], k_factors: Sequence[float], workers: Optional[int] = None,
+              top: Optional[int] = None) -> List[dict]:
+    """Replay every season at every k-factor and return one result per configuration.
+
+    Results come back in (season, k-factor) order. workers=None uses one
+    process per core; workers <= 1 replays in the calling process.
+    """
+    jobs = [(season, float(k), top) for season in seasons for k in k_factors]
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if workers <= 1 or len(jobs) <= 1:
+        return [_replay_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        # longest replays first so a big season does not start last
+        order = sorted(range(len(jobs)), key=lambda i: len(jobs[i][0]), reverse=True)
+        futures = {i: pool.submit(_replay_job, jobs[i]) for i in order}
+        return [futures[i].result() for i in range(len(jobs))]
+
+
+def summarize(results: Iterable[dict]) -> dict:
+    """Per-k-factor scores across seasons, weighted by match count, plus the best k by log loss."""
+    totals: Dict[float, List[float]] = {}
+    for r in results:
+        if not r["matches"]:
+            continue
+        t = totals.setdefault(r["kFactor"], [0, 0.0, 0.0, 0.0])
+        n = r["matches"]
+        t[0] += n
+        t[1] += r["accuracy"] * n
+        t[2] += r["brier"] * n
+        t[3] += r["logLoss"] * n
+    by_k = [{"kFactor": k, "matches": n, "accuracy": acc / n, "brier": brier / n, "logLoss": ll / n}
+            for k, (n, acc, brier, ll) in sorted(totals.items())]
+    best = min(by_k, key=lambda row: row["logLoss"])["kFactor"] if by_k else None
+    return {"byK": by_k, "bestK": best}
+
+
+def load_seasons(path: str, season_ids: Optional[Sequence[str]] = None) -> List[EncodedSeason]:
+    """Encode seasons from a combined seasons file (sample_season.json format) or a season store directory."""
+    if os.path.isdir(path):
+        with open(os.path.join(path, CATALOG_FILE), "r", encoding="utf-8") as f:
+            ids = [s["seasonId"] for s in json.load(f)["seasons"]]
+        docs = []
+        for sid in ids:
+            if season_ids and sid not in season_ids:
+                continue
+            with open(os.path.join(path, f"{sid}.json"), "r", encoding="utf-8") as f:
+                docs.append(json.load(f))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            docs = [s for s in json.load(f).get("seasons", []) if not season_ids or s["seasonId"] in season_ids]
+    return [EncodedSeason.from_season(d) for d in docs]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", required=True, metavar="PATH",
+                        help="combined seasons JSON file or a season store directory")
+    parser.add_argument("--season", action="append", help="only these season ids")
+    parser.add_argument("--k", type=float, nargs="+", default=[32.0], help="k-factors to replay with")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--top", type=int, default=10, help="standings rows kept per configuration (0 for all)")
+    parser.add_argument("--json", metavar="PATH", help="write every result and the summary to PATH")
+    args = parser.parse_args(argv)
+
+    seasons = load_seasons(args.seasons, args.season)
+    results = recompute(seasons, args.k, args.workers, args.top or None)
+    summary = summarize(results)
+    print(f"{'season':<20} {'k':>6} {'matches':>8} {'accuracy':>9} {'brier':>8} {'logloss':>8}  leader")
+    for r in results:
+        leader = r["standings"][0]["name"] if r["standings"] else "-"
+        if r["matches"]:
+            print(f"{r['season']:<20} {r['kFactor']:>6g} {r['matches']:>8} {r['accuracy']:>9.3f} "
+                  f"{r['brier']:>8.4f} {r['logLoss']:>8.4f}  {leader}")
+        else:
+            print(f"{r['season']:<20} {r['kFactor']:>6g} {0:>8} {'-':>9} {'-':>8} {'-':>8}  {leader}")
+    if summary["bestK"] is not None:
+        print(f"best k by log loss: {summary['bestK']:g}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "summary": summary}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Event-sourced replay of an ordered match history.
+
+Sequential Elo means a corrected or deleted match changes every rating
+after it. ReplayEngine keeps the match history as compact integer columns
+and stores a checkpoint of every player's (rating, wins, losses) every
+`checkpoint_every` matches. Editing match i only replays from the nearest
+checkpoint at or before i, so a correction costs time proportional to the
+affected suffix rather than the whole season.
+
+Usage example:
+
+>>> engine = ReplayEngine.from_season(season)   # a season from web/sample_season.json
+>>> changed = engine.replace(engine.find(2), winner="dave", loser="carol")
+>>> engine.ratings()["dave"]
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from elo import BASE_RATING, Elo
+from leaderboard import Leaderboard, Player
+
+# (ratings, wins, losses) columns indexed by player id
+_State = Tuple[array, array, array]
+
+
+class ReplayEngine:
+    """Ordered match history with checkpointed incremental recompute."""
+
+    def __init__(self, matches: Iterable[dict] = (), k_factor: float = 32, checkpoint_every: int = 256,
+                 initial_rating: float = BASE_RATING):
+        self.elo = Elo(k_factor)
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self.initial_rating = float(initial_rating)
+
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.matches: List[dict] = []
+        self._winners = array("l")
+        self._losers = array("l")
+
+        # checkpoints[j] is the state before match j * checkpoint_every
+        self._checkpoints: List[_State] = [self._empty_state()]
+        self._state: _State = self._empty_state()
+        for m in matches:
+            self.append(m)
+
+    @classmethod
+    def from_season(cls, season: dict, **kwargs) -> "ReplayEngine":
+        """Build an engine from a season dict, ordering matches by (date, matchId)."""
+        matches = sorted(season.get("matches", []), key=lambda m: (m.get("date", ""), m.get("matchId", 0)))
+        engine = cls(**kwargs)
+        for p in season.get("players", []):
+            engine._player_id(p["name"])
+        for m in matches:
+            engine.append(m)
+        return engine
+
+    # ----- state helpers -----
+
+    def _empty_state(self) -> _State:
+        return (array("d"), array("l"), array("l"))
+
+    def _pad(self, state: _State) -> None:
+        ratings, wins, losses = state
+        missing = len(self.names) - len(ratings)
+        if missing > 0:
+            ratings.extend([self.initial_rating] * missing)
+            wins.extend([0] * missing)
+            losses.extend([0] * missing)
+
+    def _copy(self, state: _State) -> _State:
+        return (array("d", state[0]), array("l", state[1]), array("l", state[2]))
+
+    def _player_id(self, name: str) -> int:
+        pid = self.ids.get(name)
+        if pid is None:
+            pid = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self._pad(self._state)
+        return pid
+
+    def _apply(self, state: _State, start: int, stop: int) -> None:
+        """Apply matches[start:stop] to state in place."""
+        ratings, wins, losses = state
+        exchange = self.elo.exchange
+        winners, losers = self._winners, self._losers
+        for i in range(start, stop):
+            w = winners[i]
+            l = losers[i]
+            wins[w] += 1
+            losses[l] += 1
+            ratings[w], ratings[l] = exchange(ratings[w], ratings[l])
+
+    def _recompute(self, index: int, old_checkpoints: Optional[List[_State]] = None) -> Set[str]:
+        """Replay from the checkpoint at or before index and return changed players.
+
+        When old_checkpoints is given the match positions after index did not
+        shift, so replay stops early if the state converges back to a stored
+        checkpoint; everything after it is then unchanged.
+        """
+        every = self.checkpoint_every
+        first = index // every
+        old_final = self._copy(self._state)
+        self._pad(old_final)
+
+        state = self._copy(self._checkpoints[first])
+        self._pad(state)
+        del self._checkpoints[first + 1:]
+        total = len(self.matches)
+        pos = first * every
+        while pos < total:
+            stop = min(total, pos + every)
+            self._apply(state, pos, stop)
+            pos = stop
+            if pos % every == 0:
+                j = pos // every
+                if old_checkpoints is not None and j < len(old_checkpoints):
+                    old = self._copy(old_checkpoints[j])
+                    self._pad(old)
+                    if old == state:
+                        self._checkpoints.extend(old_checkpoints[j:])
+                        self._state = old_final
+                        return set()
+                self._checkpoints.append(self._copy(state))
+        self._state = state
+        return self._changed(old_final, state)
+
+    def _changed(self, before: _State, after: _State) -> Set[str]:
+        changed = set()
+        for pid, name in enumerate(self.names):
+            if (before[0][pid] != after[0][pid] or before[1][pid] != after[1][pid]
+                    or before[2][pid] != after[2][pid]):
+                changed.add(name)
+        return changed
+
+    # ----- history edits -----
+
+    def _check_index(self, index: int, allow_end: bool) -> None:
+        """Raise ValueError unless index names a match (or, with allow_end, the end of the history)."""
+        stop = len(self.matches) + 1 if allow_end else len(self.matches)
+        if not 0 <= index < stop:
+            raise ValueError(f"match index {index} out of range for {len(self.matches)} matches")
+
+    def append(self, match: dict) -> Set[str]:
+        """Add a match at the end of the history. Costs O(1)."""
+        w = self._player_id(match["winner"])
+        l = self._player_id(match["loser"])
+        self.matches.append(dict(match))
+        self._winners.append(w)
+        self._losers.append(l)
+        i = len(self.matches) - 1
+        self._apply(self._state, i, i + 1)
+        if len(self.matches) % self.checkpoint_every == 0:
+            self._checkpoints.append(self._copy(self._state))
+        return {match["winner"], match["loser"]}
+
+    def replace(self, index: int, winner: str, loser: str) -> Set[str]:
+        """Correct the result of match `index`; returns players whose state changed.
+
+        Raises ValueError if index is not a position in the history.
+        """
+        self._check_index(index, allow_end=False)
+        old_checkpoints = list(self._checkpoints)
+        m = self.matches[index]
+        m["winner"], m["loser"] = winner, loser
+        self._winners[index] = self._player_id(winner)
+        self._losers[index] = self._player_id(loser)
+        return self._recompute(index, old_checkpoints)
+
+    def delete(self, index: int) -> Set[str]:
+        """Delete match `index`; returns players whose state changed.
+
+        Raises ValueError if index is not a position in the history.
+        """
+        self._check_index(index, allow_end=False)
+        del self.matches[index]
+        del self._winners[index]
+        del self._losers[index]
+        return self._recompute(index)
+
+    def insert(self, index: int, match: dict) -> Set[str]:
+        """Insert a match before position `index`; returns players whose state changed.
+
+        Raises ValueError unless 0 <= index <= len(matches).
+        """
+        self._check_index(index, allow_end=True)
+        w = self._player_id(match["winner"])
+        l = self._player_id(match["loser"])
+        self.matches.insert(index, dict(match))
+        self._winners.insert(index, w)
+        self._losers.insert(index, l)
+        return self._recompute(index)
+
+    def find(self, match_id) -> int:
+        """Position of the match with the given matchId. Raises KeyError if missing."""
+        for i, m in enumerate(self.matches):
+            if m.get("matchId") == match_id:
+                return i
+        raise KeyError(f"match '{match_id}' not found")
+
+    # ----- queries -----
+
+    def ratings(self) -> Dict[str, float]:
+        """Current rating of every player."""
+        ratings = self._state[0]
+        return {name: ratings[pid] for pid, name in enumerate(self.names)}
+
+    def state_at(self, index: int) -> Dict[str, float]:
+        """Ratings before match `index` (index == len(matches) gives the current ratings).
+
+        Raises ValueError unless 0 <= index <= len(matches).
+        """
+        self._check_index(index, allow_end=True)
+        every = self.checkpoint_every
+        state = self._copy(self._checkpoints[index // every])
+        self._pad(state)
+        self._apply(state, (index // every) * every, index)
+        return {name: state[0][pid] for pid, name in enumerate(self.names)}
+
+    def to_leaderboard(self, name: str = "Replay") -> Leaderboard:
+        """Leaderboard holding the current replayed state."""
+        ratings, wins, losses = self._state
+        players = [Player(n, wins[pid], losses[pid], ratings[pid]) for pid, n in enumerate(self.names)]
+        return Leaderboard(name, players=players, k_factor=self.elo.k_factor)
@@ -0,0 +1,74 @@
+"""Versioned cache of serialized read responses with ETag support.
+
+Read endpoints are pure functions of a board's version (Leaderboard.version
+or a published snapshot's version), so their serialized bytes can be reused
+until the next mutation. Each entry also carries an ETag; clients that send
+it back in If-None-Match get a 304 with no body.
+
+The ETag combines the version with a CRC of the body, so it stays correct
+across restarts (when versions start again from zero).
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+
+def make_etag(version: int, body: bytes) -> str:
+    return f'"{version:x}-{zlib.crc32(body):08x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """LRU map of resource key -> (version, body, etag)."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = int(max_entries)
+        self._entries: "OrderedDict[str, Tuple[int, bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str, version: int) -> Optional[Tuple[bytes, str]]:
+        """Cached (body, etag) for key at this version, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def store(self, key: str, version: int, body: bytes) -> str:
+        """Cache body for key at this version and return its ETag."""
+        etag = make_etag(version, body)
+        with self._lock:
+            self._entries[key] = (version, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def get(self, key: str, version: int, build: Callable[[], bytes]) -> Tuple[bytes, str]:
+        """Cached (body, etag), calling build() to serialize on a miss."""
+        cached = self.lookup(key, version)
+        if cached is not None:
+            return cached
+        body = build()
+        return body, self.store(key, version, body)
@@ -0,0 +1,170 @@
+"""Per-season aggregates kept up to date as results are recorded.
+
+SeasonStats watches a season's Leaderboard (Leaderboard.watch) and folds
+every player change into running aggregates, and is told about each
+individual match for the head-to-head counts:
+
+    totals        players, matches, games played, mean rating
+    ratings       lowest/highest (read off the standings) and a histogram
+                  of fixed-width rating buckets
+    win rates     percentiles over players with at least one game
+    most active   players by games played (a ranking.RankIndex)
+    head-to-head  wins of each side per pairing, busiest pairings first
+                  (another RankIndex)
+
+A changed player costs O(log n) plus the shift of one sorted list, a
+match O(log p) for p pairings, and to_dict() reads the aggregates
+without visiting every player or match. `version` changes whenever a
+figure may have changed, so callers can cache the serialized result.
+"""
+
+import math
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from leaderboard import Leaderboard, Player
+from ranking import RankIndex
+
+BUCKET_SIZE = 50
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class SeasonStats:
+    """Incrementally maintained statistics for one season's Leaderboard.
+
+    `matches` are the season's (winner, loser) results so far; later ones
+    are added with add_match. Player figures follow the board itself.
+    """
+
+    def __init__(self, lb: Leaderboard, matches: Iterable[Tuple[str, str]] = (), bucket_size: int = BUCKET_SIZE):
+        self.lb = lb
+        self.bucket_size = int(bucket_size)
+        self.version = 0
+        self.match_count = 0
+        # what each player currently contributes to the aggregates
+        self._counted: Dict[str, Tuple[float, int, int]] = {}
+        self._rating_sum = 0.0
+        self._games = 0
+        self._histogram: Dict[int, int] = {}
+        self._win_rates: List[float] = []
+        self._activity = RankIndex()
+        # (a, b) with a < b -> [wins of a, wins of b]
+        self._pairs: Dict[Tuple[str, str], List[int]] = {}
+        self._pair_ranking = RankIndex()
+        for p in lb.players:
+            self.player_changed(p)
+        for winner, loser in matches:
+            self.add_match(winner, loser)
+        lb.watch(self)
+
+    def close(self) -> None:
+        """Stop following the leaderboard."""
+        self.lb.unwatch(self)
+
+    # ----- updates -----
+
+    def _bucket(self, rating: float) -> int:
+        return int(math.floor(rating / self.bucket_size))
+
+    def _uncount(self, name: str) -> None:
+        old = self._counted.pop(name, None)
+        if old is None:
+            return
+        rating, wins, losses = old
+        self._rating_sum -= rating
+        self._games -= wins + losses
+        bucket = self._bucket(rating)
+        self._histogram[bucket] -= 1
+        if not self._histogram[bucket]:
+            del self._histogram[bucket]
+        if wins + losses:
+            del self._win_rates[bisect_left(self._win_rates, wins / (wins + losses))]
+        self._activity.remove((wins + losses, name))
+
+    def player_changed(self, p: Player) -> None:
+        """Leaderboard watcher hook: replace p's contribution."""
+        state = (p.rating, p.wins, p.losses)
+        if self._counted.get(p.name) == state:
+            return
+        self._uncount(p.name)
+        rating, wins, losses = state
+        self._counted[p.name] = state
+        self._rating_sum += rating
+        self._games += wins + losses
+        bucket = self._bucket(rating)
+        self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+        if wins + losses:
+            insort(self._win_rates, wins / (wins + losses))
+        self._activity.insert((wins + losses, p.name), p.name)
+        self.version += 1
+
+    def player_removed(self, p: Player) -> None:
+        """Leaderboard watcher hook: p no longer counts (its head-to-head history stays)."""
+        if p.name in self._counted:
+            self._uncount(p.name)
+            self.version += 1
+
+    def add_match(self, winner: str, loser: str) -> None:
+        """Count one individual result towards the match total and head-to-head records."""
+        pair = (winner, loser) if winner < loser else (loser, winner)
+        wins = self._pairs.get(pair)
+        if wins is None:
+            wins = self._pairs[pair] = [0, 0]
+        else:
+            self._pair_ranking.remove((wins[0] + wins[1], pair))
+        wins[0 if winner == pair[0] else 1] += 1
+        self._pair_ranking.insert((wins[0] + wins[1], pair), pair)
+        self.match_count += 1
+        self.version += 1
+
+    # ----- reads -----
+
+    def head_to_head(self, a: str, b: str) -> dict:
+        """Results between two players: {"players": [a, b], "wins": [wins of a, wins of b]}."""
+        pair = (a, b) if a < b else (b, a)
+        wins = self._pairs.get(pair, [0, 0])
+        return {"players": [a, b], "wins": list(wins) if pair[0] == a else wins[::-1]}
+
+    def win_rate_percentiles(self) -> Dict[str, Optional[float]]:
+        """Nearest-rank win-rate percentiles of players with at least one game."""
+        rates = self._win_rates
+        out: Dict[str, Optional[float]] = {}
+        for pct in PERCENTILES:
+            out[f"p{pct}"] = round(rates[max(0, math.ceil(pct / 100 * len(rates)) - 1)], 4) if rates else None
+        return out
+
+    def most_active(self, limit: int = 10) -> List[dict]:
+        out = []
+        for name in self._activity.slice(0, limit):
+            _, wins, losses = self._counted[name]
+            out.append({"name": name, "games": wins + losses, "winRecord": wins, "lossRecord": losses})
+        return out
+
+    def rivalries(self, limit: int = 10) -> List[dict]:
+        """Pairings with the most results between them."""
+        out = []
+        for pair in self._pair_ranking.slice(0, limit):
+            wins = self._pairs[pair]
+            out.append({"players": list(pair), "wins": list(wins), "games": wins[0] + wins[1]})
+        return out
+
+    def to_dict(self, limit: int = 10) -> dict:
+        players = len(self._counted)
+        best = self.lb.top_n(1)
+        worst = self.lb.page(players - 1, 1) if players else []
+        return {
+            "players": players,
+            "matches": self.match_count,
+            "games": self._games,
+            "ratings": {
+                "mean": round(self._rating_sum / players, 2) if players else None,
+                "min": worst[0].rating if worst else None,
+                "max": best[0].rating if best else None,
+                "bucketSize": self.bucket_size,
+                "histogram": [{"from": b * self.bucket_size, "to": (b + 1) * self.bucket_size, "count": n}
+                              for b, n in sorted(self._histogram.items())],
+            },
+            "winRates": dict(self.win_rate_percentiles(), players=len(self._win_rates)),
+            "mostActive": self.most_active(limit),
+            "headToHead": self.rivalries(limit),
+        }
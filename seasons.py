@@ -0,0 +1,342 @@
+"""Server-side registry of per-season leaderboards.
+
+Seasons are stored one file per season next to a small catalog:
+
+    <directory>/catalog.json         {"currentSeasonId": ..., "seasons": [metadata, ...]}
+    <directory>/<seasonId>.json      one season from web/sample_season.json plus its "teams"
+
+import_seasons() converts the combined format of web/sample_season.json
+into that layout. SeasonRegistry reads only the catalog up front; a
+season's Leaderboard is built the first time it is requested and kept in
+an LRU cache bounded by season count and by total size (players plus
+matches), so a page view only ever touches the season it shows. A season
+changed in memory (matches, team matches) is written back to its file
+when it is evicted and on flush(); seasons checked out by a request are
+never evicted.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from leaderboard import Leaderboard, Player
+from season_stats import SeasonStats
+from teams import TeamBoard
+
+CATALOG_FILE = "catalog.json"
+# season ids double as file names
+_SEASON_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+_META_FIELDS = ("seasonId", "seasonName", "startDate", "endDate", "status", "sport")
+
+
+def _season_meta(season: dict) -> dict:
+    meta = {k: season.get(k) for k in _META_FIELDS}
+    meta["playerCount"] = len(season.get("players", []))
+    meta["matchCount"] = len(season.get("matches", []))
+    return meta
+
+
+def import_seasons(path: str, directory: str) -> List[str]:
+    """Split a combined seasons document (sample_season.json format) into per-season files.
+
+    Returns the imported season ids.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    os.makedirs(directory, exist_ok=True)
+    teams = {t["seasonId"]: t.get("teams", []) for t in doc.get("teams", [])}
+    ids = []
+    for season in doc.get("seasons", []):
+        sid = season["seasonId"]
+        if not _SEASON_ID.match(sid):
+            raise ValueError(f"invalid season id '{sid}'")
+        data = dict(season, teams=teams.get(sid, []))
+        with open(os.path.join(directory, f"{sid}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        ids.append(sid)
+    catalog = {
+        "currentSeasonId": doc.get("metadata", {}).get("currentSeasonId"),
+        "seasons": [_season_meta(s) for s in doc.get("seasons", [])],
+    }
+    with open(os.path.join(directory, CATALOG_FILE), "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2)
+    return ids
+
+
+class Season:
+    """One loaded season: metadata, ordered matches, its Leaderboard, TeamBoard and SeasonStats.
+
+    Team ratings are derived from the season's player ratings. Writers
+    (matches, team matches) hold `lock`.
+    """
+
+    def __init__(self, data: dict, k_factor: float = 32):
+        self.meta = _season_meta(data)
+        self.season_id: str = data["seasonId"]
+        # oldest first, the order ratings are applied in
+        self.matches: List[dict] = sorted(data.get("matches", []), key=lambda m: (m.get("date", ""), m.get("matchId", 0)))
+        self._next_match_id = max((m.get("matchId", 0) for m in self.matches), default=0) + 1
+
+        stored = data.get("players", [])
+        if stored:
+            # stored standings are the season's snapshot
+            players = [Player.from_dict(p) for p in stored]
+            self.leaderboard = Leaderboard(data.get("seasonName", self.season_id), players=players, k_factor=k_factor)
+        else:
+            # no snapshot: rebuild standings by replaying the matches
+            self.leaderboard = Leaderboard(data.get("seasonName", self.season_id), k_factor=k_factor)
+            for m in self.matches:
+                for name in (m["winner"], m["loser"]):
+                    if self.leaderboard.get_player(name) is None:
+                        self.leaderboard.add_player(name)
+            self.leaderboard.record_matches((m["winner"], m["loser"]) for m in self.matches)
+        self.team_board = TeamBoard.from_dicts(self.leaderboard, data.get("teams", []))
+        self.stats = SeasonStats(self.leaderboard, ((m["winner"], m["loser"]) for m in self.matches))
+        self.lock = threading.Lock()
+        # set by SeasonRegistry: tells a reloaded season apart from the copy it
+        # replaced, and counts the checkouts keeping it in memory
+        self.generation = 0
+        self.pins = 0
+        self._saved = self._state()
+
+    def _state(self) -> tuple:
+        return (self.leaderboard.version, self.team_board.version, len(self.matches))
+
+    @property
+    def modified(self) -> bool:
+        """True if the season changed since it was loaded or last saved."""
+        return self._state() != self._saved
+
+    def mark_saved(self) -> None:
+        self._saved = self._state()
+
+    def record_match(self, winner: str, loser: str, day: Optional[str] = None) -> dict:
+        """Rate an individual result and append it to the season's matches.
+
+        `day` is the ISO match date (default today). Raises KeyError if a
+        player is not in the season. Returns the new match entry.
+        """
+        self.leaderboard.record_match(winner, loser)
+        match = {
+            "matchId": self._next_match_id,
+            "winner": winner,
+            "loser": loser,
+            "date": day or date.today().isoformat(),
+        }
+        self._next_match_id += 1
+        self.matches.append(match)
+        self.stats.add_match(winner, loser)
+        self.meta["matchCount"] = len(self.matches)
+        return match
+
+    def to_dict(self) -> dict:
+        """The season in its file format, with the current standings as its snapshot."""
+        data = {k: self.meta[k] for k in _META_FIELDS}
+        data["players"] = [p.to_dict() for p in self.leaderboard.standings()]
+        data["matches"] = list(self.matches)
+        data["teams"] = self.team_board.to_dicts()
+        return data
+
+    @property
+    def teams(self) -> List[dict]:
+        """Team dicts in team standings order, with ratings derived from the members."""
+        return self.team_board.to_dicts()
+
+    @property
+    def size(self) -> int:
+        """Rough memory weight used by the registry's budget."""
+        return len(self.leaderboard.players) + len(self.matches)
+
+    def recent_matches(self, offset: int = 0, limit: int = 20) -> List[dict]:
+        """Matches newest first."""
+        offset = max(0, int(offset))
+        stop = len(self.matches) - offset
+        start = max(0, stop - max(0, int(limit)))
+        return self.matches[start:stop][::-1] if stop > 0 else []
+
+
+class SeasonRegistry:
+    """Lazily loaded, LRU-evicted per-season leaderboards.
+
+    A season is only evicted while nobody has it checked out (checkout()),
+    so writes made through a checked-out season are never lost with an
+    evicted copy. An evicted season is saved after it leaves the cache; a
+    request for it before the save finishes gets the same object back
+    instead of reading the file being replaced. Season files are read and
+    written outside the registry lock, so other seasons stay available
+    meanwhile.
+    """
+
+    def __init__(self, directory: str, max_seasons: int = 8, max_size: int = 2_000_000, k_factor: float = 32):
+        self.directory = str(directory)
+        self.max_seasons = max(1, int(max_seasons))
+        self.max_size = int(max_size)
+        self.k_factor = k_factor
+        # guards the cache below; never held across file I/O
+        self._lock = threading.Lock()
+        self._loaded: "OrderedDict[str, Season]" = OrderedDict()
+        # evicted seasons whose save has not finished yet, with their eviction ticket
+        self._saving: Dict[str, Tuple[Season, int]] = {}
+        self._evictions = 0
+        # one lock per season id, held while that season is read from disk
+        self._loading: Dict[str, threading.Lock] = {}
+        # serializes season and catalog file writes
+        self._io_lock = threading.Lock()
+        self._size = 0
+        self._loads = 0
+        catalog_path = os.path.join(self.directory, CATALOG_FILE)
+        if os.path.exists(catalog_path):
+            with open(catalog_path, "r", encoding="utf-8") as f:
+                self.catalog = json.load(f)
+        else:
+            self.catalog = {"currentSeasonId": None, "seasons": []}
+
+    def season_ids(self) -> List[str]:
+        return [s["seasonId"] for s in self.catalog["seasons"]]
+
+    def has_season(self, season_id: str) -> bool:
+        return bool(_SEASON_ID.match(season_id)) and season_id in self.season_ids()
+
+    def loaded(self) -> List[str]:
+        """Ids of seasons currently in memory, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+    def _read(self, season_id: str) -> Season:
+        with open(os.path.join(self.directory, f"{season_id}.json"), "r", encoding="utf-8") as f:
+            return Season(json.load(f), k_factor=self.k_factor)
+
+    def _save(self, season: Season) -> None:
+        """Write a modified season back to its file and refresh its catalog entry."""
+        with self._io_lock:
+            with season.lock:
+                if not season.modified:
+                    return
+                data = season.to_dict()
+                meta = dict(season.meta)
+                season.mark_saved()
+            path = os.path.join(self.directory, f"{season.season_id}.json")
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(path + ".tmp", path)
+            self.catalog["seasons"] = [meta if s["seasonId"] == season.season_id else s
+                                       for s in self.catalog["seasons"]]
+            catalog_path = os.path.join(self.directory, CATALOG_FILE)
+            with open(catalog_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self.catalog, f, indent=2)
+            os.replace(catalog_path + ".tmp", catalog_path)
+
+    def _cached(self, season_id: str) -> Optional[Season]:
+        """The in-memory season, taken back from a pending save if need be (lock held)."""
+        season = self._loaded.get(season_id)
+        if season is not None:
+            self._loaded.move_to_end(season_id)
+            return season
+        pending = self._saving.pop(season_id, None)
+        if pending is None:
+            return None
+        season = pending[0]
+        self._loaded[season_id] = season
+        self._size += season.size
+        return season
+
+    def _evict(self, season: Season) -> Tuple[Season, int]:
+        """Move an idle season from the cache to the pending saves (lock held)."""
+        del self._loaded[season.season_id]
+        self._size -= season.size
+        self._evictions += 1
+        self._saving[season.season_id] = (season, self._evictions)
+        return season, self._evictions
+
+    def _evict_over_budget(self) -> List[Tuple[Season, int]]:
+        """Drop least recently used idle seasons until within budget (lock held); returns them.
+
+        The most recently used season always stays.
+        """
+        evicted = []
+        for season_id in list(self._loaded)[:-1]:
+            if len(self._loaded) <= self.max_seasons and self._size <= self.max_size:
+                break
+            season = self._loaded[season_id]
+            if not season.pins:
+                evicted.append(self._evict(season))
+        return evicted
+
+    def _save_evicted(self, evicted: List[Tuple[Season, int]]) -> None:
+        for season, ticket in evicted:
+            self._save(season)
+            with self._lock:
+                # a season taken back and evicted again is left to its later save
+                if self._saving.get(season.season_id) == (season, ticket):
+                    del self._saving[season.season_id]
+
+    def _pin(self, season_id: str) -> Season:
+        if not self.has_season(season_id):
+            raise KeyError(f"season '{season_id}' not found")
+        with self._lock:
+            season = self._cached(season_id)
+            if season is not None:
+                season.pins += 1
+                return season
+            loading = self._loading.setdefault(season_id, threading.Lock())
+        with loading:
+            with self._lock:
+                season = self._cached(season_id)
+                if season is not None:
+                    season.pins += 1
+                    return season
+            fresh = self._read(season_id)
+            with self._lock:
+                self._loads += 1
+                fresh.generation = self._loads
+                fresh.pins = 1
+                self._loaded[season_id] = fresh
+                self._size += fresh.size
+                return fresh
+
+    @contextmanager
+    def checkout(self, season_id: str) -> Iterator[Season]:
+        """Keep a season in memory for the duration of a with block.
+
+        Loads it on first access; raises KeyError if the season is unknown.
+        Writers use this (and the season's lock), so the season they change
+        is the one saved when it is evicted later.
+        """
+        season = self._pin(season_id)
+        try:
+            yield season
+        finally:
+            with self._lock:
+                season.pins -= 1
+                evicted = self._evict_over_budget()
+            self._save_evicted(evicted)
+
+    def get(self, season_id: str) -> Season:
+        """Return a season, loading it on first access. Raises KeyError if unknown.
+
+        The season is not held: it may be evicted as soon as other seasons
+        are requested, so code that changes it uses checkout() instead.
+        """
+        with self.checkout(season_id) as season:
+            return season
+
+    def evict(self, season_id: str) -> None:
+        """Drop a season from memory unless it is checked out (it is reloaded on next access)."""
+        with self._lock:
+            season = self._loaded.get(season_id)
+            if season is None or season.pins:
+                return
+            evicted = self._evict(season)
+        self._save_evicted([evicted])
+
+    def flush(self) -> None:
+        """Write every modified season in memory back to disk."""
+        with self._lock:
+            seasons = list(self._loaded.values()) + [season for season, _ in self._saving.values()]
+        for season in seasons:
+            self._save(season)
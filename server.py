@@ -1,11 +1,23 @@
 #AI was used to create this file
 # Prompt: create a python backend server to run python functions in script.js
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, g, request, jsonify, render_template
 from flask_cors import CORS
-from leaderboard import Leaderboard, Player
-from elo import Elo
+from datetime import datetime, timezone
+from history import RatingHistory
+from matchmaking import Matchmaker
+from metrics import REGISTRY, Counter, Gauge, Histogram
+from persistence import LeaderboardStore
+from profiler import SamplingProfiler
+from response_cache import ResponseCache, etag_matches
+from seasons import CATALOG_FILE, SeasonRegistry, import_seasons
+from service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, LeaderboardService
+from streaming import FORMATS, iter_json, iter_ndjson, read_players
+from typing import Dict, Optional
+import atexit
 import os
+import threading
+import time
 
 app = Flask(__name__, static_folder="web", template_folder="templates")
 CORS(app)  # optional if frontend is served by Flask itself
@@ -13,7 +25,168 @@ CORS(app)  # optional if frontend is served by Flask itself
 # --------------------------------------------
 # GLOBAL LEADERBOARD INSTANCE
 # --------------------------------------------
-lb = Leaderboard("Main", k_factor=32)
+# State is recovered from the latest snapshot plus the mutation log tail.
+# All mutations go through the service's single writer thread (which also
+# appends them to the log); reads use its published snapshots and never
+# touch `lb` directly, so request threads never race on it.
+DATA_DIR = os.environ.get("LEADERBOARD_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+SEASONS_DIR = os.path.join(DATA_DIR, "seasons")
+
+# Rating periods (LEADERBOARD_RATING_PERIOD seconds, off by default): results
+# are queued and every period is applied at once against the ratings players
+# had when it opened, so the outcome does not depend on arrival order.
+RATING_PERIOD = float(os.environ.get("LEADERBOARD_RATING_PERIOD") or 0)
+period_stop = threading.Event()
+
+# Serialized read responses, reused until the board's version changes.
+response_cache = ResponseCache()
+
+# Set by load_state() in the process that serves requests.
+store = lb = history = service = broadcaster = season_registry = matchmaker = None
+
+
+def load_state():
+    """Open the data directory and build the global state served by the routes."""
+    global store, lb, history, service, broadcaster, season_registry, matchmaker
+    store = LeaderboardStore(DATA_DIR)
+    lb = store.load("Main", k_factor=32)
+    # Rating time series, appended on the writer thread as ratings change
+    # (history starts at the ratings loaded here).
+    history = RatingHistory(lb)
+    service = LeaderboardService(lb, store)
+    # Pushes standings deltas to /events subscribers.
+    broadcaster = service.attach_broadcaster()
+
+    # Per-season leaderboards, loaded on first request and evicted LRU.
+    # The first run seeds the season store from the bundled sample data.
+    if not os.path.exists(os.path.join(SEASONS_DIR, CATALOG_FILE)):
+        import_seasons(os.path.join(app.static_folder, "sample_season.json"), SEASONS_DIR)
+    season_registry = SeasonRegistry(SEASONS_DIR)
+
+    # Players waiting for an opponent; queued with their current rating.
+    matchmaker = Matchmaker(lb.elo)
+
+    if RATING_PERIOD > 0:
+        threading.Thread(target=close_periods, name="rating-periods", daemon=True).start()
+
+
+def close_periods():
+    while not period_stop.wait(RATING_PERIOD):
+        if lb.period_matches:
+            service.close_period()
+
+
+@atexit.register
+def shutdown():
+    period_stop.set()
+    if store is None:
+        return
+    service.close()
+    store.close()
+    season_registry.flush()
+
+
+# `python server.py` runs under the Werkzeug reloader, which executes this
+# file in a watcher process that never serves and again in the serving child
+# (WERKZEUG_RUN_MAIN set). Only the serving process may lock the data directory.
+if __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN"):
+    load_state()
+
+
+def cached_json(version, build, generation=0):
+    """Serve build()'s JSON for this URL from the response cache.
+
+    The body is serialized once per board version, and requests whose
+    If-None-Match matches the ETag get an empty 304. `generation` tells
+    apart boards whose versions restart, such as a reloaded season.
+    """
+    key = f"{request.full_path}#{generation}" if generation else request.full_path
+    body, etag = response_cache.get(key, version, lambda: app.json.dumps(build()).encode("utf-8"))
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status=304, headers={"ETag": etag})
+    return Response(body, mimetype="application/json", headers={"ETag": etag})
+
+# --------------------------------------------
+# METRICS AND PROFILING
+# --------------------------------------------
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency", ("method", "route", "status"))
+RESPONSE_BYTES = Gauge("http_response_size_bytes", "Body size of the last non-streamed response", ("route",))
+Gauge("leaderboard_players", "Players in the published standings", fn=lambda: service.snapshot().total)
+Gauge("leaderboard_version", "Version of the published standings", fn=lambda: service.snapshot().version)
+Gauge("service_queue_depth", "Mutations waiting for the writer thread", fn=lambda: service.pending)
+Gauge("sse_subscribers", "Open /events streams", fn=lambda: broadcaster.subscriber_count)
+Gauge("matchmaking_queue_size", "Players waiting for an opponent", fn=lambda: len(matchmaker))
+Gauge("rating_history_bytes", "Bytes held by rating history points", fn=lambda: history.nbytes())
+Gauge("seasons_loaded", "Season leaderboards held in memory", fn=lambda: len(season_registry.loaded()))
+Counter("response_cache_hits_total", "Read responses served from the cache", fn=lambda: response_cache.hits)
+Counter("response_cache_misses_total", "Read responses serialized", fn=lambda: response_cache.misses)
+
+# The sampling profiler is opt-in (LEADERBOARD_PROFILING=1). It can follow
+# one route because every request thread records the route it is serving.
+PROFILING = os.environ.get("LEADERBOARD_PROFILING") == "1"
+profiler: Optional[SamplingProfiler] = None
+profiled_route: Optional[str] = None
+active_routes: Dict[int, str] = {}
+
+
+def route_label():
+    # the URL rule, not the path, so /player/<name> is one label
+    return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    active_routes[threading.get_ident()] = route_label()
+
+
+@app.after_request
+def record_request_metrics(response):
+    route = route_label()
+    REQUEST_SECONDS.labels(request.method, route, response.status_code).observe(time.perf_counter() - g.request_started)
+    if not response.is_streamed:
+        RESPONSE_BYTES.labels(route).set(response.calculate_content_length() or 0)
+    return response
+
+
+@app.teardown_request
+def clear_active_route(exc):
+    active_routes.pop(threading.get_ident(), None)
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/debug/profile", methods=["POST"])
+def start_profile():
+    # ?route=/players&seconds=10&interval=0.005; without route every thread is sampled
+    global profiler, profiled_route
+    if not PROFILING:
+        return jsonify({"error": "profiling is disabled; set LEADERBOARD_PROFILING=1"}), 404
+    if profiler is not None and profiler.running:
+        return jsonify({"error": "a profile is already running"}), 409
+    route = request.args.get("route")
+    seconds = min(300.0, max(0.1, request.args.get("seconds", 10.0, type=float)))
+    interval = request.args.get("interval", 0.005, type=float)
+    thread_filter = None if route is None else (lambda tid: active_routes.get(tid) == route)
+    profiler, profiled_route = SamplingProfiler(interval, thread_filter), route
+    profiler.start(seconds)
+    return jsonify({"route": route, "seconds": seconds, "interval": profiler.interval})
+
+
+@app.route("/debug/profile", methods=["GET"])
+def get_profile():
+    # ?format=folded returns flamegraph input instead of JSON
+    if not PROFILING:
+        return jsonify({"error": "profiling is disabled; set LEADERBOARD_PROFILING=1"}), 404
+    if profiler is None:
+        return jsonify({"error": "no profile has been started"}), 404
+    limit = request.args.get("limit", 50, type=int)
+    if request.args.get("format") == "folded":
+        return Response("".join(f"{stack} {count}\n" for stack, count in profiler.folded(limit)), mimetype="text/plain")
+    return jsonify(dict(profiler.report(limit), route=profiled_route))
 
 # --------------------------------------------
 # FRONTEND ROUTE
@@ -30,9 +203,135 @@ def index():
 def seasons():
     return render_template("seasons.html")
     
+@app.route("/seasons/catalog", methods=["GET"])
+def get_season_catalog():
+    return jsonify(season_registry.catalog)
+
+
+@app.route("/seasons/<season_id>", methods=["GET"])
+def get_season(season_id):
+    if not season_registry.has_season(season_id):
+        return jsonify({"error": "Season not found"}), 404
+    with season_registry.checkout(season_id) as season, season.lock:
+        teams = [dict(t, winRate=round(t["winRecord"] / max(1, t["winRecord"] + t["lossRecord"]), 4))
+                 for t in season.teams]
+        return jsonify(dict(season.meta, teams=teams))
+
+
+@app.route("/seasons/<season_id>/players", methods=["GET"])
+def get_season_players(season_id):
+    if not season_registry.has_season(season_id):
+        return jsonify({"error": "Season not found"}), 404
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = min(MAX_PAGE_SIZE, max(0, request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)))
+    with season_registry.checkout(season_id) as season:
+        board = season.leaderboard
+
+        def build():
+            with season.lock:
+                return {
+                    "seasonId": season_id,
+                    "total": len(board.players),
+                    "offset": offset,
+                    "limit": limit,
+                    "players": [dict(p.to_dict(), rank=offset + i + 1, winRate=round(p.win_rate, 4))
+                                for i, p in enumerate(board.page(offset, limit))],
+                }
+
+        return cached_json(board.version, build, season.generation)
+
+
+@app.route("/seasons/<season_id>/teams", methods=["GET"])
+def get_season_teams(season_id):
+    if not season_registry.has_season(season_id):
+        return jsonify({"error": "Season not found"}), 404
+    with season_registry.checkout(season_id) as season:
+        teams = season.team_board
+
+        def build():
+            with season.lock:
+                return {"seasonId": season_id, "total": len(teams), "teams": teams.to_dicts()}
+
+        return cached_json(teams.version, build, season.generation)
+
+
+@app.route("/seasons/<season_id>/stats", methods=["GET"])
+def get_season_stats(season_id):
+    # aggregates are maintained as results arrive; this only serializes them once per change
+    if not season_registry.has_season(season_id):
+        return jsonify({"error": "Season not found"}), 404
+    limit = min(MAX_PAGE_SIZE, max(0, request.args.get("limit", 10, type=int)))
+    with season_registry.checkout(season_id) as season:
+        stats = season.stats
+
+        def build():
+            with season.lock:
+                return dict(stats.to_dict(limit), seasonId=season_id)
+
+        return cached_json(stats.version, build, season.generation)
+
+
+@app.route("/seasons/<season_id>/record_match", methods=["POST"])
+def record_season_match(season_id):
+    # body: {"winner": "alice", "loser": "bob", "date": "2025-03-01"}; date defaults to today
+    if not season_registry.has_season(season_id):
+        return jsonify({"error": "Season not found"}), 404
+    data = request.json
+    try:
+        with season_registry.checkout(season_id) as season, season.lock:
+            return jsonify(season.record_match(data["winner"], data["loser"], data.get("date")))
+    except KeyError as exc:
+        return jsonify({"error": exc.args[0]}), 404
+
+
+@app.route("/seasons/<season_id>/record_team_match", methods=["POST"])
+def record_team_match(season_id):
+    # body: {"winner": "Thunder", "loser": "Lightning"}; members' ratings move by the team exchange
+    if not season_registry.has_season(season_id):
+        return jsonify({"error": "Season not found"}), 404
+    data = request.json
+    winner, loser = data["winner"], data["loser"]
+    try:
+        with season_registry.checkout(season_id) as season, season.lock:
+            return jsonify(season.team_board.record_team_match(winner, loser))
+    except KeyError as exc:
+        return jsonify({"error": exc.args[0]}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+
+@app.route("/seasons/<season_id>/matches", methods=["GET"])
+def get_season_matches(season_id):
+    if not season_registry.has_season(season_id):
+        return jsonify({"error": "Season not found"}), 404
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = min(MAX_PAGE_SIZE, max(0, request.args.get("limit", 20, type=int)))
+    with season_registry.checkout(season_id) as season, season.lock:
+        return jsonify({
+            "seasonId": season_id,
+            "total": len(season.matches),
+            "offset": offset,
+            "matches": season.recent_matches(offset, limit),
+        })
+
+
 @app.route("/players", methods=["GET"])
 def get_players():
-    return jsonify([p.to_dict() for p in lb.standings()])
+    # live=1 reads the standings last pushed to /events, which the next delta applies to
+    snap = broadcaster.snapshot() if request.args.get("live") else service.snapshot()
+    # without paging parameters keep returning the full standings array
+    if "offset" not in request.args and "limit" not in request.args:
+        return cached_json(snap.version, lambda: list(snap.players))
+
+    offset = max(0, request.args.get("offset", 0, type=int))
+    limit = min(MAX_PAGE_SIZE, max(0, request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)))
+    return cached_json(snap.version, lambda: {
+        "version": snap.version,
+        "total": snap.total,
+        "offset": offset,
+        "limit": limit,
+        "players": snap.page(offset, limit),
+    })
 
 
 @app.route("/add_player", methods=["POST"])
@@ -42,19 +341,8 @@ def add_player():
     wins = int(data.get("wins", 0))
     losses = int(data.get("losses", 0))
 
-    # Add player
-    p = lb.add_player(name, wins, losses)
-
-    # Recalculate Elo based on W/L record
-    elo_calc = Elo(lb.elo.k_factor)
-    opponent = Player("baseline", rating=1500)
-
-    for _ in range(wins):
-        elo_calc.update_ratings(p, opponent)
-    for _ in range(losses):
-        elo_calc.update_ratings(opponent, p)
-
-    return jsonify(p.to_dict())
+    # Add player with an Elo rating calculated from the W/L record
+    return jsonify(service.add_player(name, wins, losses))
 
 
 @app.route("/record_match", methods=["POST"])
@@ -62,24 +350,197 @@ def record_match():
     data = request.json
     winner = data["winner"]
     loser = data["loser"]
-    lb.record_match(winner, loser)
+    if RATING_PERIOD > 0:
+        summary = service.queue_matches([(winner, loser)])
+        if summary["failed"]:
+            return jsonify({"error": summary["failed"][0]["error"]}), 404
+        return jsonify({"message": f"{winner} defeated {loser}", "queued": True})
+    service.record_match(winner, loser)
     return jsonify({"message": f"{winner} defeated {loser}"})
 
 
+@app.route("/record_matches", methods=["POST"])
+def record_matches():
+    # body: {"matches": [{"winner": "a", "loser": "b"}, ["c", "d"], ...]}
+    data = request.json
+    matches = data.get("matches", [])
+    pairs = [(m.get("winner"), m.get("loser")) if isinstance(m, dict) else m for m in matches]
+    if RATING_PERIOD > 0:
+        return jsonify(service.queue_matches(pairs))
+    return jsonify(service.record_matches(pairs))
+
+
+@app.route("/period", methods=["GET"])
+def get_period():
+    return jsonify({"seconds": RATING_PERIOD, "queued": lb.period_matches})
+
+
+@app.route("/period/close", methods=["POST"])
+def close_period():
+    # apply the queued results now instead of waiting for the timer
+    return jsonify(service.close_period())
+
+
 @app.route("/remove_player", methods=["POST"])
 def remove_player():
     data = request.json
     name = data["name"]
-    lb.remove_player(name)
+    service.remove_player(name)
     return jsonify({"message": f"removed {name}"})
 
 
+@app.route("/events", methods=["GET"])
+def standings_events():
+    # server-sent events: "delta" frames with changed players, "reset" when a refetch is needed
+    return Response(broadcaster.events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/export", methods=["GET"])
+def export_players():
+    # streamed in chunks from one snapshot, in standings order
+    fmt = request.args.get("format", "json")
+    if fmt not in FORMATS:
+        return jsonify({"error": f"unknown format '{fmt}'"}), 400
+    snap = service.snapshot()
+    if fmt == "ndjson":
+        body, mimetype = iter_ndjson(snap.players), "application/x-ndjson"
+    else:
+        body, mimetype = iter_json(lb.name, snap.players, snap.total), "application/json"
+    return Response(body, mimetype=mimetype, headers={"Content-Disposition": f"attachment; filename=players.{fmt}"})
+
+
+@app.route("/import", methods=["POST"])
+def import_players():
+    # body: an /export document (format=json) or NDJSON (format=ndjson), parsed as it streams in;
+    # batches applied before a malformed row stay applied
+    fmt = request.args.get("format", "ndjson" if request.mimetype == "application/x-ndjson" else "json")
+    if fmt not in FORMATS:
+        return jsonify({"error": f"unknown format '{fmt}'"}), 400
+    try:
+        return jsonify(service.import_players(read_players(request.stream, fmt)))
+    except (KeyError, TypeError, ValueError) as exc:
+        return jsonify({"error": f"invalid import: {exc}"}), 400
+
+
 @app.route("/player/<name>", methods=["GET"])
 def get_player(name):
-    p = lb.get_player(name)
+    snap = service.snapshot()
+    p = snap.get(name)
     if not p:
         return jsonify({"error": "Player not found"}), 404
-    return jsonify(p.to_dict())
+    return cached_json(snap.version, lambda: p)
+
+@app.route("/player/<name>/rank", methods=["GET"])
+def get_player_rank(name):
+    snap = service.snapshot()
+    rank = snap.rank(name)
+    if rank is None:
+        return jsonify({"error": "Player not found"}), 404
+    return cached_json(snap.version, lambda: {"name": name, "rank": rank, "total": snap.total})
+
+
+@app.route("/player/<name>/around", methods=["GET"])
+def get_players_around(name):
+    snap = service.snapshot()
+    if snap.get(name) is None:
+        return jsonify({"error": "Player not found"}), 404
+    radius = min(MAX_PAGE_SIZE // 2, max(0, request.args.get("radius", 5, type=int)))
+    def build():
+        offset, players = snap.around(name, radius)
+        return {"name": name, "rank": snap.rank(name), "total": snap.total, "offset": offset, "players": players}
+
+    return cached_json(snap.version, build)
+
+def parse_time(value):
+    """Epoch seconds, or an ISO date/datetime (UTC unless it has an offset)."""
+    try:
+        return float(value)
+    except ValueError:
+        t = datetime.fromisoformat(value)
+        return (t if t.tzinfo else t.replace(tzinfo=timezone.utc)).timestamp()
+
+
+@app.route("/player/<name>/history", methods=["GET"])
+def get_player_history(name):
+    # ?at=2024-10-01 returns one rating; otherwise ?from=&to=&points= returns [time, rating] points
+    if name not in history:
+        return jsonify({"error": "Player not found"}), 404
+    try:
+        at, start, end = (parse_time(request.args[k]) if k in request.args else None for k in ("at", "from", "to"))
+    except ValueError as exc:
+        return jsonify({"error": f"invalid time: {exc}"}), 400
+    if at is not None:
+        return jsonify({"name": name, "at": at, "rating": history.rating_at(name, at)})
+    points = request.args.get("points", type=int)
+    if points is not None:
+        points = min(MAX_PAGE_SIZE * 2, max(2, points))
+    return cached_json(service.snapshot().version, lambda: {
+        "name": name,
+        "total": history.count(name, start, end),
+        "points": history.series(name, start, end, points),
+    })
+
+
+@app.route("/win_probabilities", methods=["GET"])
+def get_win_probabilities():
+    # ?names=a,b,c -> matrix[i][j] is the chance that names[i] beats names[j]
+    names = [n for n in request.args.get("names", "").split(",") if n]
+    if not names or len(names) > MAX_PAGE_SIZE:
+        return jsonify({"error": f"pass between 1 and {MAX_PAGE_SIZE} comma-separated names"}), 400
+    snap = service.snapshot()
+    missing = [n for n in names if snap.get(n) is None]
+    if missing:
+        return jsonify({"error": f"Player '{missing[0]}' not found"}), 404
+    ratings = [snap.get(n)["rating"] for n in names]
+
+    def build():
+        matrix = lb.elo.probability_matrix(ratings)
+        return {"names": names, "ratings": ratings, "matrix": [[round(float(x), 6) for x in row] for row in matrix]}
+
+    return cached_json(snap.version, build)
+
+
+@app.route("/matchmaking/queue", methods=["GET"])
+def get_matchmaking_queue():
+    return jsonify({"waiting": matchmaker.waiting()})
+
+
+@app.route("/matchmaking/enqueue", methods=["POST"])
+def enqueue_player():
+    name = request.json["name"]
+    p = service.snapshot().get(name)
+    if p is None:
+        return jsonify({"error": f"Player '{name}' not found"}), 404
+    try:
+        return jsonify(matchmaker.enqueue(name, p["rating"]))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 409
+
+
+@app.route("/matchmaking/dequeue", methods=["POST"])
+def dequeue_player():
+    name = request.json["name"]
+    try:
+        matchmaker.dequeue(name)
+    except KeyError:
+        return jsonify({"error": f"Player '{name}' is not queued"}), 404
+    return jsonify({"message": f"{name} left the queue"})
+
+
+@app.route("/matchmaking/pair", methods=["POST"])
+def pair_players():
+    # body {"name": "a"} pairs one queued player, an empty body pairs the whole queue;
+    # paired players leave the queue and report the result through /record_match
+    name = (request.get_json(silent=True) or {}).get("name")
+    if name is None:
+        return jsonify({"matches": matchmaker.pair_all()})
+    try:
+        match = matchmaker.find_opponent(name)
+    except KeyError:
+        return jsonify({"error": f"Player '{name}' is not queued"}), 404
+    return jsonify({"matches": [match] if match is not None else []})
+
 
 @app.route("/update_player", methods=["POST"])
 def update_player():
@@ -88,28 +549,14 @@ def update_player():
     wins = int(data.get("wins", 0))
     losses = int(data.get("losses", 0))
 
-    p = lb.get_player(name)
-    if p is None:
+    # Update the player's win/loss records and recalculate Elo based on
+    # the new W/L record against a baseline
+    try:
+        p = service.update_player(name, wins, losses)
+    except KeyError:
         return jsonify({"error": f"Player '{name}' not found"}), 404
 
-    # 1. Update the player's win/loss records
-    # Reset rating to default (1500) before recalculation
-    p.update_records(wins, losses, 1500.0) 
-
-    # 2. Recalculate Elo based on the new W/L record against a baseline
-    elo_calc = Elo(lb.elo.k_factor)
-    opponent = Player("baseline", rating=1500)
-
-    for _ in range(wins):
-        elo_calc.update_ratings(p, opponent)
-    for _ in range(losses):
-        elo_calc.update_ratings(opponent, p)
-
-    # 3. Save the updated state to file
-    # This assumes you implemented the save_leaderboard function from the previous suggestion
-    # save_leaderboard(lb) 
-
-    return jsonify(p.to_dict())
+    return jsonify(p)
 
 # --------------------------------------------
 # RUN SERVER
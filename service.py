@@ -0,0 +1,501 @@
+"""Thread-safe access to a shared Leaderboard.
+
+The Leaderboard itself is not thread-safe: record_match does a
+read-modify-write on two players. LeaderboardService gives it a single
+writer: every mutation is queued and applied in submission order by one
+background thread, which also appends it to the mutation log. After
+applying a batch the writer publishes an immutable StandingsSnapshot,
+derived from the previous one by copying only the parts holding the
+players that changed, so publishing does not grow with the board.
+
+Readers only ever look at the latest published snapshot (a single
+attribute read), so they never take a lock and never wait behind writes.
+A mutation's result is handed back only after a snapshot containing it
+has been published, so a client always sees its own writes. Each
+published snapshot is also handed to an optional live.DeltaBroadcaster
+along with the names of the players changed since the last one.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from leaderboard import Leaderboard, Player
+from live import DeltaBroadcaster
+from metrics import Counter, Histogram
+from persistence import LeaderboardStore
+
+SNAPSHOT_BUILD_SECONDS = Histogram("service_snapshot_build_seconds", "Time to derive a published standings snapshot")
+MUTATIONS = Counter("service_mutations_total", "Mutations applied by the writer thread")
+
+# paging defaults for the /players endpoints
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class StandingsSnapshot:
+    """Immutable standings at one point in time.
+
+    version is the Leaderboard.version the standings were taken at. The
+    rows (Player.to_dict()) are kept in ascending rank-key order in blocks
+    of about BLOCK_SIZE, with a name index split into NAME_SHARDS dicts.
+    derive() makes the next snapshot by copying only the blocks and shards
+    holding changed players, so publishing after k changes costs about
+    O(k * BLOCK_SIZE + n / BLOCK_SIZE) instead of a full O(n) rebuild.
+    Snapshots share everything else and are never modified once built.
+    """
+
+    __slots__ = ("version", "total", "_blocks", "_firsts", "_offsets", "_names", "_players")
+
+    BLOCK_SIZE = 512
+    NAME_SHARDS = 1024
+
+    def __init__(self, version: int, blocks: List[List[Tuple[tuple, dict]]], names: Tuple[Dict[str, tuple], ...]):
+        self.version = version
+        # each block holds (rank key, row) entries in ascending key order
+        self._blocks = blocks
+        self._firsts = [block[0][0] for block in blocks]
+        # rows before each block, then the total
+        self._offsets = list(accumulate(map(len, blocks), initial=0))
+        self.total = self._offsets[-1]
+        # name -> rank key, sharded by hash(name) so a change copies one small dict
+        self._names = names
+        self._players: Optional[Tuple[dict, ...]] = None
+
+    @classmethod
+    def build(cls, lb: Leaderboard) -> "StandingsSnapshot":
+        """Full O(n) snapshot of the board."""
+        entries = [(p.rank_key(), p.to_dict()) for p in reversed(lb.standings())]
+        size = cls.BLOCK_SIZE
+        names: Tuple[Dict[str, tuple], ...] = tuple({} for _ in range(cls.NAME_SHARDS))
+        for key, row in entries:
+            names[hash(row["name"]) % cls.NAME_SHARDS][row["name"]] = key
+        return cls(lb.version, [entries[i:i + size] for i in range(0, len(entries), size)], names)
+
+    def derive(self, version: int, changed: Dict[str, Optional[Player]]) -> "StandingsSnapshot":
+        """The snapshot after `changed` (name -> current Player, or None if removed).
+
+        Must run on the thread that owns the Leaderboard the players belong to.
+        """
+        shard_count = self.NAME_SHARDS
+        names = list(self._names)
+        copied: Set[int] = set()
+        removed: List[tuple] = []
+        added: List[Tuple[tuple, dict]] = []
+        for name, p in changed.items():
+            shard = hash(name) % shard_count
+            if shard not in copied:
+                names[shard] = dict(names[shard])
+                copied.add(shard)
+            old = names[shard].pop(name, None)
+            if old is not None:
+                removed.append(old)
+            if p is not None:
+                key = p.rank_key()
+                names[shard][name] = key
+                added.append((key, p.to_dict()))
+
+        # group the edits by the block they land in, then rewrite only those blocks
+        firsts = self._firsts
+        edits: Dict[int, Tuple[List[tuple], List[Tuple[tuple, dict]]]] = {}
+        for key in removed:
+            edits.setdefault(bisect_right(firsts, key) - 1, ([], []))[0].append(key)
+        for entry in added:
+            edits.setdefault(max(0, bisect_right(firsts, entry[0]) - 1), ([], []))[1].append(entry)
+        blocks = list(self._blocks)
+        size = self.BLOCK_SIZE
+        for i in sorted(edits, reverse=True):
+            drop, fresh = edits[i]
+            block = list(blocks[i]) if i < len(blocks) else []
+            for key in drop:
+                del block[bisect_left(block, (key,))]
+            for entry in fresh:
+                block.insert(bisect_left(block, (entry[0],)), entry)
+            blocks[i:i + 1] = [block[j:j + size] for j in range(0, len(block), size)] if len(block) > 2 * size \
+                else ([block] if block else [])
+        return StandingsSnapshot(version, blocks, tuple(names))
+
+    @property
+    def players(self) -> Tuple[dict, ...]:
+        """All rows in rank order (built on first use)."""
+        if self._players is None:
+            self._players = tuple(row for block in reversed(self._blocks) for _, row in reversed(block))
+        return self._players
+
+    def _locate(self, name: str) -> Optional[Tuple[int, int]]:
+        """(block, index in block) of a player's entry, or None if not found."""
+        key = self._names[hash(name) % self.NAME_SHARDS].get(name)
+        if key is None:
+            return None
+        i = bisect_right(self._firsts, key) - 1
+        return i, bisect_left(self._blocks[i], (key,))
+
+    def get(self, name: str) -> Optional[dict]:
+        found = self._locate(name)
+        return None if found is None else self._blocks[found[0]][found[1]][1]
+
+    def rank(self, name: str) -> Optional[int]:
+        """1-based rank of a player, or None if not found."""
+        found = self._locate(name)
+        return None if found is None else self.total - self._offsets[found[0]] - found[1]
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[dict]:
+        """Players in standings[offset:offset + limit], each with its rank added."""
+        offset = max(0, int(offset))
+        stop = min(self.total, offset + max(0, int(limit)))
+        if offset >= stop:
+            return []
+        # descending [offset, stop) is ascending [total - stop, total - offset)
+        pos = self.total - stop
+        i = bisect_right(self._offsets, pos) - 1
+        j = pos - self._offsets[i]
+        rows: List[dict] = []
+        while len(rows) < stop - offset:
+            block = self._blocks[i]
+            rows.extend(row for _, row in block[j:j + stop - offset - len(rows)])
+            i, j = i + 1, 0
+        rows.reverse()
+        return [dict(p, rank=offset + n + 1) for n, p in enumerate(rows)]
+
+    def around(self, name: str, radius: int = 5) -> Tuple[int, List[dict]]:
+        """Same contract as Leaderboard.around, on the snapshot."""
+        rank = self.rank(name)
+        if rank is None:
+            raise KeyError(f"player '{name}' not found")
+        pos = rank - 1
+        start = max(0, pos - max(0, int(radius)))
+        return start, self.page(start, pos + max(0, int(radius)) + 1 - start)
+
+
+def _match_pairs(matches: List[Any]) -> Tuple[List[Tuple[str, str]], List[int], List[dict]]:
+    """Split request entries into (winner, loser) name pairs and rejected entries.
+
+    Returns the pairs, the position of each pair in `matches`, and a
+    record_matches-style failure for every entry that is not a pair of
+    non-empty names.
+    """
+    pairs: List[Tuple[str, str]] = []
+    positions: List[int] = []
+    failed: List[dict] = []
+    for i, match in enumerate(matches):
+        if not isinstance(match, (list, tuple)) or len(match) != 2:
+            failed.append({"index": i, "winner": None, "loser": None, "error": "expected a (winner, loser) pair"})
+            continue
+        winner, loser = match
+        for role, name in (("winner", winner), ("loser", loser)):
+            if not isinstance(name, str) or not name:
+                failed.append({"index": i, "winner": winner, "loser": loser, "error": f"missing {role}"})
+                break
+        else:
+            pairs.append((winner, loser))
+            positions.append(i)
+    return pairs, positions, failed
+
+
+def _merge_failures(pairs: List[Tuple[str, str]], positions: List[int], failed: List[dict],
+                    summary: dict) -> List[Tuple[str, str]]:
+    """Fold summary's failures (indexed into pairs) into failed by request position; return the accepted pairs."""
+    rejected = set()
+    for error in summary["failed"]:
+        rejected.add(error["index"])
+        failed.append(dict(error, index=positions[error["index"]]))
+    failed.sort(key=lambda error: error["index"])
+    summary["failed"] = failed
+    return [pair for i, pair in enumerate(pairs) if i not in rejected]
+
+
+class LeaderboardService:
+    """Single-writer mutation queue with lock-free snapshot reads."""
+
+    def __init__(self, lb: Leaderboard, store: Optional[LeaderboardStore] = None,
+                 publish_interval: float = 0.05, max_batch: int = 1024,
+                 broadcaster: Optional[DeltaBroadcaster] = None):
+        self.lb = lb
+        self.store = store
+        # under sustained writes, publish at most this often
+        self.publish_interval = float(publish_interval)
+        self.max_batch = int(max_batch)
+
+        self._snapshot = StandingsSnapshot.build(lb)
+        # players changed since the last publish (None = removed), fed by Leaderboard.watch
+        self._changed: Dict[str, Optional[Player]] = {}
+        lb.watch(self)
+        self.broadcaster = broadcaster
+        # players changed since the last publish; None once an arbitrary submit() ran
+        self._touched: Optional[Set[str]] = set()
+        self._queue: "queue.Queue[Optional[Tuple[Callable, tuple, Future]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="leaderboard-writer", daemon=True)
+        self._thread.start()
+
+    # ----- writer -----
+
+    def _run(self) -> None:
+        waiting: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        last_publish = time.monotonic()
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            for entry in batch:
+                if entry is None:
+                    stop = True
+                    continue
+                fn, args, fut = entry
+                if getattr(fn, "__self__", None) is not self:
+                    self._touched = None
+                try:
+                    waiting.append((fut, fn(*args), None))
+                except Exception as exc:  # handed to the caller through the future
+                    waiting.append((fut, None, exc))
+
+            MUTATIONS.inc(len(batch) - stop)
+            if stop or self._queue.empty() or time.monotonic() - last_publish >= self.publish_interval:
+                self._publish()
+                last_publish = time.monotonic()
+                for fut, result, exc in waiting:
+                    if exc is not None:
+                        fut.set_exception(exc)
+                    else:
+                        fut.set_result(result)
+                waiting = []
+            if stop:
+                return
+
+    def player_changed(self, p: Player) -> None:
+        """Leaderboard watcher hook (writer thread)."""
+        self._changed[p.name] = p
+
+    def player_removed(self, p: Player) -> None:
+        self._changed[p.name] = None
+
+    def _publish(self) -> None:
+        if self.lb.version != self._snapshot.version:
+            start = time.perf_counter()
+            changed, self._changed = self._changed, {}
+            self._snapshot = self._snapshot.derive(self.lb.version, changed)
+            SNAPSHOT_BUILD_SECONDS.observe(time.perf_counter() - start)
+            if self.broadcaster is not None:
+                self.broadcaster.publish(self._snapshot, self._touched)
+        self._touched = set()
+
+    def _touch(self, *names: str) -> None:
+        if self._touched is not None:
+            self._touched.update(names)
+
+    def attach_broadcaster(self, min_interval: float = 0.25) -> DeltaBroadcaster:
+        """Create the broadcaster fed by this service (once) and return it."""
+        if self.broadcaster is None:
+            self.broadcaster = DeltaBroadcaster(self._snapshot, min_interval=min_interval)
+        return self.broadcaster
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue fn(*args) to run on the writer thread; returns its Future."""
+        fut: Future = Future()
+        self._queue.put((fn, args, fut))
+        return fut
+
+    def close(self) -> None:
+        """Apply everything already queued, then stop the writer and broadcaster."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+            self.lb.unwatch(self)
+        if self.broadcaster is not None:
+            self.broadcaster.close()
+
+    @property
+    def pending(self) -> int:
+        """Mutations queued but not yet applied."""
+        return self._queue.qsize()
+
+    # ----- reads -----
+
+    def snapshot(self) -> StandingsSnapshot:
+        """Latest published standings; never blocks."""
+        return self._snapshot
+
+    # ----- mutations (run on the writer thread) -----
+
+    def _add_player(self, name: str, wins: int, losses: int) -> dict:
+        self._touch(name)
+        p = self.lb.add_player(name, wins, losses)
+        # Calculate Elo based on W/L record against a baseline player
+        p.rating = self.lb.elo.rating_from_record(wins, losses)
+        if self.store is not None:
+            self.store.log_add(p)
+        return p.to_dict()
+
+    def _update_player(self, name: str, wins: int, losses: int) -> dict:
+        self._touch(name)
+        p = self.lb.get_player(name)
+        if p is None:
+            raise KeyError(f"player '{name}' not found")
+        p.update_records(wins, losses, self.lb.elo.rating_from_record(wins, losses))
+        if self.store is not None:
+            self.store.log_update(p)
+        return p.to_dict()
+
+    def _remove_player(self, name: str) -> None:
+        self._touch(name)
+        self.lb.remove_player(name)
+        if self.store is not None:
+            self.store.log_remove(name)
+
+    def _record_match(self, winner: str, loser: str) -> None:
+        self._touch(winner, loser)
+        self.lb.record_match(winner, loser)
+        if self.store is not None:
+            self.store.log_match(winner, loser)
+
+    def _record_matches(self, matches: List[Any]) -> dict:
+        # entries are checked up front so the board and the log see the same pairs
+        pairs, positions, failed = _match_pairs(matches)
+        for pair in pairs:
+            self._touch(*pair)
+        summary = self.lb.record_matches(pairs)
+        accepted = _merge_failures(pairs, positions, failed, summary)
+        if self.store is not None and accepted:
+            self.store.log_matches(accepted)
+        return summary
+
+    def _queue_matches(self, matches: List[Any]) -> dict:
+        # queued results change nothing visible until the period closes
+        pairs, positions, failed = _match_pairs(matches)
+        summary = self.lb.queue_matches(pairs)
+        accepted = _merge_failures(pairs, positions, failed, summary)
+        if self.store is not None and accepted:
+            self.store.log_queue(accepted)
+        return summary
+
+    def _close_period(self) -> dict:
+        self._touch(*{name for pair in self.lb._period for name in pair})
+        summary = self.lb.close_period()
+        if self.store is not None and (summary["recorded"] or summary["failed"]):
+            self.store.log_period()
+        return summary
+
+    def _import_players(self, rows: List[dict]) -> dict:
+        # rows use the Player.to_dict() schema; existing players are overwritten
+        self._touch(*(str(row["name"]) for row in rows))
+        # (player, newly added) per row, logged once the ratings are final
+        applied: List[Tuple[Player, bool]] = []
+        # players whose latest row has no rating, rated in one bulk pass
+        unrated: Dict[str, None] = {}
+        with self.lb._batch():
+            for row in rows:
+                name = str(row["name"])
+                wins, losses = int(row.get("winRecord", 0)), int(row.get("lossRecord", 0))
+                rating = row.get("rating")
+                p = self.lb.get_player(name)
+                new = p is None
+                if new:
+                    p = self.lb.add_player(name, wins, losses)
+                if rating is None:
+                    p.update_records(wins, losses, p.rating)
+                    unrated[name] = None
+                else:
+                    p.update_records(wins, losses, float(rating))
+                    unrated.pop(name, None)
+                applied.append((p, new))
+            if unrated:
+                self.lb.rate_from_records(list(unrated))
+        if self.store is not None:
+            for p, new in applied:
+                if new:
+                    self.store.log_add(p)
+                else:
+                    self.store.log_update(p)
+        added = sum(new for _, new in applied)
+        return {"added": added, "updated": len(applied) - added}
+
+    def add_player(self, name: str, wins: int = 0, losses: int = 0) -> dict:
+        """Add a player with a record-based rating. Raises ValueError on duplicates."""
+        return self.submit(self._add_player, name, int(wins), int(losses)).result()
+
+    def update_player(self, name: str, wins: int, losses: int) -> dict:
+        """Replace a player's record and rebuild the rating. Raises KeyError if missing."""
+        return self.submit(self._update_player, name, int(wins), int(losses)).result()
+
+    def import_players(self, rows: Iterable[dict], batch_size: int = 1000) -> dict:
+        """Add or overwrite players from Player.to_dict()-style rows.
+
+        Rows are consumed and applied batch_size at a time, so a streamed
+        import never holds more than one batch. Returns the added/updated counts.
+        """
+        totals = {"added": 0, "updated": 0}
+        batch: List[dict] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                for key, n in self.submit(self._import_players, batch).result().items():
+                    totals[key] += n
+                batch = []
+        if batch:
+            for key, n in self.submit(self._import_players, batch).result().items():
+                totals[key] += n
+        return totals
+
+    def remove_player(self, name: str) -> None:
+        self.submit(self._remove_player, name).result()
+
+    def record_match(self, winner: str, loser: str) -> None:
+        self.submit(self._record_match, winner, loser).result()
+
+    def record_matches(self, pairs: Iterable[Tuple[str, str]]) -> dict:
+        """Record results in order (Leaderboard.record_matches).
+
+        Entries that are not a pair of names are skipped and reported by
+        position like results naming an unknown player.
+        """
+        return self.submit(self._record_matches, list(pairs)).result()
+
+    def queue_matches(self, pairs: Iterable[Tuple[str, str]]) -> dict:
+        """Queue results for the open rating period (Leaderboard.queue_matches)."""
+        return self.submit(self._queue_matches, list(pairs)).result()
+
+    def close_period(self) -> dict:
+        """Apply the queued results at once (Leaderboard.close_period)."""
+        return self.submit(self._close_period).result()
+
+
+class AsyncLeaderboard:
+    """asyncio facade over LeaderboardService.
+
+    Mutations are queued to the service's writer thread and awaited without
+    blocking the event loop; reads are plain snapshot lookups.
+    """
+
+    def __init__(self, service: LeaderboardService):
+        self.service = service
+
+    async def _call(self, fn: Callable, *args) -> Any:
+        return await asyncio.wrap_future(self.service.submit(fn, *args))
+
+    def snapshot(self) -> StandingsSnapshot:
+        return self.service.snapshot()
+
+    async def add_player(self, name: str, wins: int = 0, losses: int = 0) -> dict:
+        return await self._call(self.service._add_player, name, int(wins), int(losses))
+
+    async def update_player(self, name: str, wins: int, losses: int) -> dict:
+        return await self._call(self.service._update_player, name, int(wins), int(losses))
+
+    async def remove_player(self, name: str) -> None:
+        await self._call(self.service._remove_player, name)
+
+    async def record_match(self, winner: str, loser: str) -> None:
+        await self._call(self.service._record_match, winner, loser)
+
+    async def record_matches(self, pairs: Iterable[Tuple[str, str]]) -> dict:
+        return await self._call(self.service._record_matches, list(pairs))
@@ -0,0 +1,349 @@
+"""Leaderboard partitioned by player name across worker processes.
+
+ShardedLeaderboard starts one worker process per shard. Each worker owns
+an ordinary Leaderboard holding the players whose name hashes (CRC-32,
+so the mapping is the same in every process and run) to it, and
+optionally its own LeaderboardStore under data_dir/shard-<i>. Ranking
+and storage work is spread over the workers and their cores; the
+coordinator only routes requests and merges replies.
+
+A match result is applied in three steps, whichever shards own the two
+players:
+
+    1. read the current ratings from the owning shards
+    2. run Elo.exchange in match order, in the coordinator
+    3. send each shard the new records and ratings of its players
+
+Batches (record_matches) do this once per batch, so every shard sees
+one read and one write per batch no matter how many results it has.
+Mutations are serialized by the coordinator, so a batch gives exactly
+what Leaderboard.record_matches would give on a single board.
+
+Reads that span shards are merged: top_n(n) asks every shard for its own
+top n and takes the first n of a k-way merge by rank key, and rank(name)
+adds up how many players each shard has above the player. Players come
+back as Player.to_dict() dicts.
+
+    with ShardedLeaderboard(shards=4) as board:
+        board.add_player("alice")
+        board.add_player("bob")
+        board.record_match("alice", "bob")
+        board.top_n(10)
+
+The shard count of a data directory is fixed when it is first used.
+"""
+
+import heapq
+import json
+import multiprocessing
+import os
+import threading
+import zlib
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from elo import Elo
+from leaderboard import Leaderboard
+from metrics import Counter
+from persistence import LeaderboardStore
+
+SHARDS_FILE = "shards.json"
+
+CROSS_SHARD_MATCHES = Counter("shard_cross_matches_total", "Match results whose players live on different shards")
+
+
+def shard_of(name: str, shards: int) -> int:
+    """Shard that owns a player name."""
+    return zlib.crc32(name.encode("utf-8")) % shards
+
+
+class _Partition:
+    """Worker-side state: one shard's Leaderboard (and its store)."""
+
+    def __init__(self, name: str, k_factor: float, directory: Optional[str]):
+        self.store = LeaderboardStore(directory) if directory else None
+        self.lb = self.store.load(name, k_factor=k_factor) if self.store else Leaderboard(name, k_factor=k_factor)
+
+    def add_player(self, name: str, wins: int, losses: int, rating: Optional[float]) -> dict:
+        p = self.lb.add_player(name, wins, losses)
+        p.rating = self.lb.elo.rating_from_record(wins, losses) if rating is None else rating
+        if self.store is not None:
+            self.store.log_add(p)
+        return p.to_dict()
+
+    def remove_player(self, name: str) -> None:
+        self.lb.remove_player(name)
+        if self.store is not None:
+            self.store.log_remove(name)
+
+    def get_player(self, name: str) -> Optional[dict]:
+        p = self.lb.get_player(name)
+        return p.to_dict() if p is not None else None
+
+    def ratings(self, names: List[str]) -> Dict[str, float]:
+        """Current ratings of the named players that are on this shard."""
+        out = {}
+        for name in names:
+            p = self.lb.get_player(name)
+            if p is not None:
+                out[name] = p.rating
+        return out
+
+    def apply(self, results: List[Tuple[str, int, int, float]]) -> None:
+        """Add (wins, losses) to each player's record and set the new rating."""
+        with self.lb._batch():
+            for name, wins, losses, rating in results:
+                p = self.lb.get_player(name)
+                p.update_records(p.wins + wins, p.losses + losses, rating)  # type: ignore[union-attr]
+                if self.store is not None:
+                    self.store.log_update(p)  # type: ignore[arg-type]
+
+    def top(self, n: Optional[int]) -> List[Tuple[tuple, dict]]:
+        players = self.lb.standings() if n is None else self.lb.top_n(n)
+        return [(p.rank_key(), p.to_dict()) for p in players]
+
+    def rank_key(self, name: str) -> Optional[tuple]:
+        p = self.lb.get_player(name)
+        return p.rank_key() if p is not None else None
+
+    def count_above(self, key: tuple) -> int:
+        return self.lb._ranking.count_above(key)
+
+    def size(self) -> int:
+        return len(self.lb.players)
+
+    def snapshot(self) -> None:
+        if self.store is not None:
+            self.store.snapshot()
+
+    def close(self) -> None:
+        if self.store is not None:
+            self.store.close()
+
+
+def _serve(conn, name: str, k_factor: float, directory: Optional[str]) -> None:
+    """Worker loop: answer (op, args) requests until a None arrives."""
+    partition = _Partition(name, k_factor, directory)
+    try:
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            op, args = request
+            try:
+                conn.send((True, getattr(partition, op)(*args)))
+            except Exception as exc:  # handed back to the coordinator
+                conn.send((False, exc))
+    finally:
+        partition.close()
+        conn.close()
+
+
+class ShardedLeaderboard:
+    """A Leaderboard split over `shards` worker processes (default: one per core).
+
+    Methods take and return plain names and Player.to_dict() dicts and
+    raise the same errors as Leaderboard. Calls may come from any thread;
+    they are serialized by the coordinator. close() stops the workers.
+    """
+
+    def __init__(self, shards: Optional[int] = None, name: str = "Main", k_factor: float = 32,
+                 data_dir: Optional[str] = None):
+        self.shards = int(shards or os.cpu_count() or 1)
+        if self.shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.name = name
+        self.elo = Elo(k_factor)
+        if data_dir is not None:
+            _check_layout(data_dir, self.shards)
+        # spawn rather than fork: the coordinator may already be running threads
+        ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._conns = []
+        self._procs = []
+        for i in range(self.shards):
+            parent, child = ctx.Pipe()
+            directory = os.path.join(data_dir, f"shard-{i}") if data_dir is not None else None
+            proc = ctx.Process(target=_serve, args=(child, f"{name}-{i}", k_factor, directory),
+                               name=f"leaderboard-shard-{i}", daemon=True)
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    def __enter__(self) -> "ShardedLeaderboard":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the workers; each syncs its store first."""
+        with self._lock:
+            for conn in self._conns:
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+            for proc, conn in zip(self._procs, self._conns):
+                proc.join()
+                conn.close()
+            self._conns = []
+            self._procs = []
+
+    # ----- transport -----
+
+    def shard_of(self, name: str) -> int:
+        return shard_of(name, self.shards)
+
+    def _gather(self, requests: Dict[int, Tuple[str, tuple]]) -> Dict[int, Any]:
+        """Send each shard its (op, args) request, then collect the replies.
+
+        All requests go out before any reply is read, so the shards work in
+        parallel. The first error is raised once every reply is in.
+        """
+        for shard, request in requests.items():
+            self._conns[shard].send(request)
+        replies: Dict[int, Any] = {}
+        error: Optional[BaseException] = None
+        for shard in requests:
+            ok, value = self._conns[shard].recv()
+            if ok:
+                replies[shard] = value
+            elif error is None:
+                error = value
+        if error is not None:
+            raise error
+        return replies
+
+    def _call(self, name: str, op: str, *args) -> Any:
+        """Run op on the shard that owns `name`."""
+        shard = self.shard_of(name)
+        with self._lock:
+            return self._gather({shard: (op, args)})[shard]
+
+    def _broadcast(self, op: str, *args) -> List[Any]:
+        with self._lock:
+            replies = self._gather({shard: (op, args) for shard in range(self.shards)})
+        return [replies[shard] for shard in range(self.shards)]
+
+    # ----- players -----
+
+    def add_player(self, name: str, wins: int = 0, losses: int = 0, rating: Optional[float] = None) -> dict:
+        """Add a player (rated from the record unless `rating` is given). Raises ValueError on duplicates."""
+        return self._call(name, "add_player", name, int(wins), int(losses), rating)
+
+    def remove_player(self, name: str) -> None:
+        self._call(name, "remove_player", name)
+
+    def get_player(self, name: str) -> Optional[dict]:
+        return self._call(name, "get_player", name)
+
+    def __len__(self) -> int:
+        return sum(self._broadcast("size"))
+
+    # ----- matches -----
+
+    def record_match(self, winner: str, loser: str) -> None:
+        """Record a single match result. Raises KeyError if a player is missing."""
+        summary = self.record_matches([(winner, loser)])
+        if summary["failed"]:
+            raise KeyError(summary["failed"][0]["error"])
+
+    def record_matches(self, matches: Iterable[Tuple[str, str]]) -> dict:
+        """Record many (winner, loser) results in order; see Leaderboard.record_matches.
+
+        Returns {"recorded": int, "failed": [{"index", "winner", "loser", "error"}]}.
+        """
+        pairs: List[Tuple[int, Optional[Tuple[str, str]]]] = []
+        names: Dict[int, set] = {}
+        for i, match in enumerate(matches):
+            try:
+                winner, loser = match
+            except (TypeError, ValueError):
+                pairs.append((i, None))
+                continue
+            pairs.append((i, (winner, loser)))
+            for player in (winner, loser):
+                if isinstance(player, str):  # anything else is reported as not found
+                    names.setdefault(self.shard_of(player), set()).add(player)
+
+        exchange = self.elo.exchange
+        recorded = cross = 0
+        failed: List[dict] = []
+        with self._lock:
+            ratings: Dict[str, float] = {}
+            for found in self._gather({s: ("ratings", (sorted(n),)) for s, n in names.items()}).values():
+                ratings.update(found)
+            wins: Dict[str, int] = {}
+            losses: Dict[str, int] = {}
+            for i, pair in pairs:
+                if pair is None:
+                    failed.append({"index": i, "winner": None, "loser": None, "error": "expected a (winner, loser) pair"})
+                    continue
+                winner, loser = pair
+                if winner not in ratings or loser not in ratings:
+                    missing = f"winner '{winner}' not found" if winner not in ratings else f"loser '{loser}' not found"
+                    failed.append({"index": i, "winner": winner, "loser": loser, "error": missing})
+                    continue
+                ratings[winner], ratings[loser] = exchange(ratings[winner], ratings[loser])
+                wins[winner] = wins.get(winner, 0) + 1
+                losses[loser] = losses.get(loser, 0) + 1
+                recorded += 1
+                cross += self.shard_of(winner) != self.shard_of(loser)
+
+            results: Dict[int, List[Tuple[str, int, int, float]]] = {}
+            for player in wins.keys() | losses.keys():
+                row = (player, wins.get(player, 0), losses.get(player, 0), ratings[player])
+                results.setdefault(self.shard_of(player), []).append(row)
+            if results:
+                self._gather({s: ("apply", (rows,)) for s, rows in results.items()})
+        CROSS_SHARD_MATCHES.inc(cross)
+        return {"recorded": recorded, "failed": failed}
+
+    # ----- merged reads -----
+
+    def _merged(self, n: Optional[int]) -> Iterable[dict]:
+        tops = self._broadcast("top", n)
+        return (d for _, d in heapq.merge(*tops, key=lambda item: item[0], reverse=True))
+
+    def standings(self) -> List[dict]:
+        """Every player in rank order."""
+        return list(self._merged(None))
+
+    def top_n(self, n: int = 10) -> List[dict]:
+        n = max(0, int(n))
+        return list(islice(self._merged(n), n))
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[dict]:
+        """standings()[offset:offset + limit], merged from each shard's top offset + limit."""
+        offset, limit = max(0, int(offset)), max(0, int(limit))
+        return list(islice(self._merged(offset + limit), offset, offset + limit))
+
+    def rank(self, name: str) -> int:
+        """Return the 1-based standings position of a player. Raises KeyError if not found."""
+        shard = self.shard_of(name)
+        with self._lock:
+            key = self._gather({shard: ("rank_key", (name,))})[shard]
+            if key is None:
+                raise KeyError(f"player '{name}' not found")
+            above = self._gather({s: ("count_above", (key,)) for s in range(self.shards)})
+        return sum(above.values()) + 1
+
+    def snapshot(self) -> None:
+        """Snapshot every shard's store (no-op without data_dir)."""
+        self._broadcast("snapshot")
+
+
+def _check_layout(data_dir: str, shards: int) -> None:
+    """Record the shard count of a new data directory, or check it matches."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, SHARDS_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            existing = json.load(f)["shards"]
+        if existing != shards:
+            raise ValueError(f"{data_dir} is partitioned into {existing} shards, not {shards}")
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"shards": shards}, f)
@@ -0,0 +1,223 @@
+"""Streaming export and import of leaderboards.
+
+Leaderboard.to_dict() / from_dict() hold every player dict in memory at
+once, and serializing that list makes another full copy. The functions
+here work one player at a time instead, so the memory used on top of the
+board itself stays constant however many players it has.
+
+Two formats are supported:
+
+    json     the Leaderboard.to_dict() document
+             {"name": ..., "playerCount": ..., "players": [{...}, ...]}
+             (a bare top-level players array is also accepted on import)
+    ndjson   one Player.to_dict() object per line
+
+Export yields text chunks (usable as a chunked HTTP response body or
+written to a file); import parses a text or binary file object
+incrementally, a READ_SIZE block at a time.
+"""
+
+import codecs
+import json
+import re
+from typing import IO, TYPE_CHECKING, Any, Iterable, Iterator, Optional, Union
+
+from leaderboard import Leaderboard, Player
+if TYPE_CHECKING:
+    from columnar import PlayerTable
+
+# players serialized per yielded chunk
+CHUNK_PLAYERS = 512
+# bytes read from the input per refill
+READ_SIZE = 64 * 1024
+
+FORMATS = ("json", "ndjson")
+
+_DECODER = json.JSONDecoder()
+_NON_WS = re.compile(r"\S")
+
+
+def _row(p: Union[Player, dict]) -> dict:
+    return p if isinstance(p, dict) else p.to_dict()
+
+
+def format_for_path(path: str) -> str:
+    """Pick the format from a file name (.ndjson/.jsonl are NDJSON, anything else JSON)."""
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "json"
+
+
+# ----- export -----
+
+def iter_json(name: str, players: Iterable[Union[Player, dict]], player_count: int = 0) -> Iterator[str]:
+    """Yield a Leaderboard.to_dict()-compatible JSON document in chunks."""
+    yield '{"name": %s, "playerCount": %d, "players": [' % (json.dumps(name), int(player_count))
+    chunk, sep = [], ""
+    for p in players:
+        chunk.append(sep + json.dumps(_row(p)))
+        sep = ", "
+        if len(chunk) >= CHUNK_PLAYERS:
+            yield "".join(chunk)
+            chunk = []
+    chunk.append("]}")
+    yield "".join(chunk)
+
+
+def iter_ndjson(players: Iterable[Union[Player, dict]]) -> Iterator[str]:
+    """Yield one JSON object per player, newline-terminated, in chunks."""
+    chunk = []
+    for p in players:
+        chunk.append(json.dumps(_row(p)) + "\n")
+        if len(chunk) >= CHUNK_PLAYERS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def iter_leaderboard(lb: Leaderboard, fmt: str = "json") -> Iterator[str]:
+    """Stream a leaderboard's players (in lb.players order) in the given format."""
+    if fmt == "json":
+        return iter_json(lb.name, lb.players, lb.playerCount)
+    if fmt == "ndjson":
+        return iter_ndjson(lb.players)
+    raise ValueError(f"unknown format '{fmt}'")
+
+
+def export_leaderboard(lb: Leaderboard, path: str, fmt: Optional[str] = None) -> None:
+    """Write a leaderboard to path; the format defaults to one based on the extension."""
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in iter_leaderboard(lb, fmt or format_for_path(path)):
+            f.write(chunk)
+
+
+# ----- import -----
+
+class _Scanner:
+    """Pull-based tokenizer over a file object, holding about one READ_SIZE block."""
+
+    def __init__(self, f: IO):
+        self._f = f
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(READ_SIZE)
+        if not chunk:
+            self._eof = True
+        text = self._decode(chunk, final=not chunk) if isinstance(chunk, bytes) else chunk
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ("" at end of input)."""
+        while True:
+            m = _NON_WS.search(self._buf, self._pos)
+            if m:
+                self._pos = m.start()
+                return self._buf[self._pos]
+            self._pos = len(self._buf)
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        found = self.peek()
+        if found != ch:
+            raise ValueError(f"expected '{ch}' but found {found or 'end of input'!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+                # a value ending at the buffer's edge may continue (e.g. a number)
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+
+def _read_array(sc: _Scanner) -> Iterator[Any]:
+    sc.expect("[")
+    if sc.peek() == "]":
+        sc.expect("]")
+        return
+    while True:
+        yield sc.value()
+        if sc.peek() != ",":
+            sc.expect("]")
+            return
+        sc.expect(",")
+
+
+def _read_object(sc: _Scanner, meta: dict) -> Iterator[dict]:
+    sc.expect("{")
+    if sc.peek() == "}":
+        sc.expect("}")
+        return
+    while True:
+        key = sc.value()
+        sc.expect(":")
+        if key == "players":
+            yield from _read_array(sc)
+        else:
+            meta[key] = sc.value()
+        if sc.peek() != ",":
+            sc.expect("}")
+            return
+        sc.expect(",")
+
+
+def _read_json(f: IO, meta: dict) -> Iterator[dict]:
+    sc = _Scanner(f)
+    yield from _read_array(sc) if sc.peek() == "[" else _read_object(sc, meta)
+    if sc.peek():
+        raise ValueError("unexpected data after the JSON document")
+
+
+def _read_ndjson(f: IO) -> Iterator[dict]:
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_players(f: IO, fmt: str = "json", meta: Optional[dict] = None) -> Iterator[dict]:
+    """Yield player dicts from a JSON or NDJSON file object, one at a time.
+
+    For JSON documents, top-level fields other than "players" (name,
+    playerCount) are stored in `meta` as they are parsed. Malformed input
+    raises ValueError.
+    """
+    if fmt == "json":
+        return _read_json(f, {} if meta is None else meta)
+    if fmt == "ndjson":
+        return _read_ndjson(f)
+    raise ValueError(f"unknown format '{fmt}'")
+
+
+def load_leaderboard(path: str, fmt: Optional[str] = None, name: Optional[str] = None,
+                     k_factor: float = 32) -> Leaderboard:
+    """Build a Leaderboard from an exported file without materializing its player dicts."""
+    meta: dict = {}
+    with open(path, "rb") as f:
+        rows = read_players(f, fmt or format_for_path(path), meta)
+        lb = Leaderboard("", players=(Player.from_dict(d) for d in rows), k_factor=k_factor)  # type: ignore[arg-type]
+    lb.name = str(name if name is not None else meta.get("name", ""))
+    lb.playerCount = int(meta.get("playerCount", len(lb.players)))
+    return lb
+
+
+def load_table(path: str, fmt: Optional[str] = None) -> "PlayerTable":
+    """Read an exported file straight into a columnar.PlayerTable (no Player objects)."""
+    from columnar import PlayerTable
+    with open(path, "rb") as f:
+        return PlayerTable.from_dicts(read_players(f, fmt or format_for_path(path)))
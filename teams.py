@@ -0,0 +1,222 @@
+"""Team ratings derived from member ratings, with team-vs-team matches.
+
+A team's rating is the mean rating of its members that are on the
+underlying Leaderboard. TeamBoard watches that board (Leaderboard.watch)
+and keeps each team's member-rating sum up to date as individual
+ratings change: a changed player costs O(t log T) for the t teams it
+belongs to, instead of recomputing every team. Team standings live in a
+ranking.RankIndex, like player standings.
+
+A team match is rated like a single Elo game between the two team
+ratings; every member of the winning team gains the rating exchange and
+every member of the losing team loses it, so the team ratings move by
+the same amount and stay derived from their members.
+
+Teams use the format of web/sample_season.json:
+
+    {"teamName": "Thunder", "members": ["alice", "bob"], "winRecord": 6, "lossRecord": 2, "rating": 1550}
+
+(the stored rating is ignored on load and recomputed from the members).
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from elo import BASE_RATING
+from leaderboard import Leaderboard, Player
+from ranking import RankIndex
+
+
+class Team:
+    """A named group of players with its own win/loss record."""
+
+    __slots__ = ("name", "members", "winRecord", "lossRecord", "_sum", "_count", "_rank_key")
+
+    def __init__(self, name: str, members: Iterable[str], winRecord: int = 0, lossRecord: int = 0):
+        self.name = str(name)
+        self.members: List[str] = list(dict.fromkeys(str(m) for m in members))
+        self.winRecord = int(winRecord)
+        self.lossRecord = int(lossRecord)
+        # sum and count of the ratings of members present on the board
+        self._sum = 0.0
+        self._count = 0
+        self._rank_key: Optional[tuple] = None
+
+    @property
+    def rating(self) -> float:
+        """Mean member rating (BASE_RATING while no member is on the board)."""
+        return self._sum / self._count if self._count else BASE_RATING
+
+    @property
+    def win_rate(self) -> float:
+        total = self.winRecord + self.lossRecord
+        return self.winRecord / total if total else 0.0
+
+    def rank_key(self) -> tuple:
+        """Sort key used for team standings (larger key = higher rank), as for players."""
+        return (self.rating, self.win_rate, self.winRecord, -self.lossRecord, self.name)
+
+    def to_dict(self) -> dict:
+        return {"teamName": self.name, "members": list(self.members), "winRecord": self.winRecord,
+                "lossRecord": self.lossRecord, "rating": round(self.rating, 2)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Team":
+        return cls(d["teamName"], d.get("members", []), d.get("winRecord", 0), d.get("lossRecord", 0))
+
+    def __repr__(self) -> str:
+        return f"Team(name={self.name!r}, members={self.members!r}, rating={self.rating:.2f})"
+
+
+class TeamBoard:
+    """Teams over one Leaderboard, ranked by their aggregate rating."""
+
+    def __init__(self, lb: Leaderboard, teams: Iterable[Team] = ()):
+        self.lb = lb
+        self._teams: Dict[str, Team] = {}
+        # player name -> the teams they belong to
+        self._member_of: Dict[str, List[Team]] = {}
+        # player name -> the rating currently counted in their teams' sums
+        self._counted: Dict[str, float] = {}
+        self._ranking = RankIndex()
+        # bumped by every change to a team's record or rating
+        self.version = 0
+        for team in teams:
+            self.add_team(team)
+        lb.watch(self)
+
+    def close(self) -> None:
+        """Stop following the leaderboard."""
+        self.lb.unwatch(self)
+
+    # ----- ranking maintenance -----
+
+    def _rerank(self, team: Team) -> None:
+        self.version += 1
+        if team._rank_key is not None:
+            self._ranking.remove(team._rank_key)
+        team._rank_key = team.rank_key()
+        self._ranking.insert(team._rank_key, team)
+
+    def player_changed(self, p: Player) -> None:
+        """Leaderboard watcher hook: fold p's new rating into its teams."""
+        teams = self._member_of.get(p.name)
+        if not teams:
+            return
+        old = self._counted.get(p.name)
+        if old == p.rating:
+            return
+        self._counted[p.name] = p.rating
+        for team in teams:
+            if old is None:
+                team._sum += p.rating
+                team._count += 1
+            else:
+                team._sum += p.rating - old
+            self._rerank(team)
+
+    def player_removed(self, p: Player) -> None:
+        """Leaderboard watcher hook: p no longer counts towards its teams."""
+        old = self._counted.pop(p.name, None)
+        if old is None:
+            return
+        for team in self._member_of.get(p.name, ()):
+            team._sum -= old
+            team._count -= 1
+            if not team._count:
+                team._sum = 0.0  # drop accumulated rounding error
+            self._rerank(team)
+
+    # ----- public API -----
+
+    def add_team(self, team: Team) -> Team:
+        """Add a team. Raises ValueError if a team with the same name exists."""
+        if team.name in self._teams:
+            raise ValueError(f"team '{team.name}' already exists")
+        self._teams[team.name] = team
+        for name in team.members:
+            self._member_of.setdefault(name, []).append(team)
+            if name not in self._counted:
+                p = self.lb.get_player(name)
+                if p is not None:
+                    self._counted[name] = p.rating
+            if name in self._counted:
+                team._sum += self._counted[name]
+                team._count += 1
+        self._rerank(team)
+        return team
+
+    def remove_team(self, name: str) -> None:
+        """Remove a team by name. Raises KeyError if not found."""
+        team = self._teams.pop(name, None)
+        if team is None:
+            raise KeyError(f"team '{name}' not found")
+        self._ranking.remove(team._rank_key)
+        team._rank_key = None
+        self.version += 1
+        for member in team.members:
+            teams = self._member_of[member]
+            teams.remove(team)
+            if not teams:
+                del self._member_of[member]
+                self._counted.pop(member, None)
+
+    def get_team(self, name: str) -> Optional[Team]:
+        return self._teams.get(name)
+
+    def teams_of(self, player: str) -> List[Team]:
+        return list(self._member_of.get(player, ()))
+
+    def record_team_match(self, winner: str, loser: str) -> dict:
+        """Record a win of team `winner` over team `loser`.
+
+        The Elo exchange between the two team ratings is added to every
+        winning member present on the board and taken from every losing one.
+        Raises KeyError for an unknown team and ValueError if the teams share
+        a member. Returns the rating exchange and both teams' new state.
+        """
+        w, l = self._teams.get(winner), self._teams.get(loser)
+        if w is None:
+            raise KeyError(f"team '{winner}' not found")
+        if l is None:
+            raise KeyError(f"team '{loser}' not found")
+        if w is l or set(w.members) & set(l.members):
+            raise ValueError("a player cannot be on both sides of a match")
+        elo = self.lb.elo
+        delta = elo.k_factor * (1 - elo.expected_score(w.rating, l.rating))
+        w.winRecord += 1
+        l.lossRecord += 1
+        with self.lb._batch():
+            for team, sign in ((w, 1), (l, -1)):
+                for name in team.members:
+                    p = self.lb.get_player(name)
+                    if p is not None:
+                        p.rating = round(p.rating + sign * delta, 2)
+        # records changed even if no member rating did
+        self._rerank(w)
+        self._rerank(l)
+        return {"delta": round(delta, 2), "winner": w.to_dict(), "loser": l.to_dict()}
+
+    def standings(self) -> List[Team]:
+        return self._ranking.slice(0, len(self._ranking))
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[Team]:
+        offset = max(0, int(offset))
+        return self._ranking.slice(offset, offset + max(0, int(limit)))
+
+    def rank(self, name: str) -> int:
+        """1-based position of a team in the standings. Raises KeyError if not found."""
+        team = self._teams.get(name)
+        if team is None:
+            raise KeyError(f"team '{name}' not found")
+        return self._ranking.rank_of(team._rank_key) + 1
+
+    def __len__(self) -> int:
+        return len(self._teams)
+
+    def to_dicts(self) -> List[dict]:
+        """Teams in standings order, each with its rank."""
+        return [dict(t.to_dict(), rank=i + 1) for i, t in enumerate(self.standings())]
+
+    @classmethod
+    def from_dicts(cls, lb: Leaderboard, teams: Iterable[dict]) -> "TeamBoard":
+        return cls(lb, (Team.from_dict(d) for d in teams))
@@ -0,0 +1,68 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from benchmark import League, check_batch_vs_loop, check_table_memory, check_write_latency, compare, main, run_suite
+
+
+class TestBenchmark(unittest.TestCase):
+    """Smoke tests for the benchmark harness (tiny sizes only)."""
+
+    def test_league_is_reproducible(self):
+        a, b = League(50, seed=3), League(50, seed=3)
+        self.assertEqual(a.rows, b.rows)
+        self.assertEqual(a.matches(20), b.matches(20))
+        self.assertTrue(all(w != l for w, l in a.matches(200)))
+
+    def test_run_and_compare(self):
+        results = run_suite([30], groups=("micro",), repeat=1, max_ops=20)
+        names = {r["name"] for r in results["results"]}
+        self.assertIn("leaderboard.record_match", names)
+        self.assertTrue(all(r["size"] == 30 and r["per_op_us"] > 0 for r in results["results"]))
+
+        baseline = {"results": [dict(r, per_op_us=r["per_op_us"] * 2) for r in results["results"]]}
+        rows = compare(results, baseline, threshold=0.25)
+        self.assertEqual(len(rows), len(results["results"]))
+        self.assertTrue(all(r["status"] == "improvement" for r in rows))
+        slower = {"results": [dict(r, per_op_us=r["per_op_us"] / 2) for r in results["results"]]}
+        self.assertTrue(all(r["status"] == "regression" for r in compare(results, slower)))
+
+    def test_compare_divides_out_calibration(self):
+        results = {"meta": {"calibration_us": 200.0}, "results": [{"name": "a", "size": 1, "per_op_us": 2.0}]}
+        baseline = {"meta": {"calibration_us": 100.0}, "results": [{"name": "a", "size": 1, "per_op_us": 1.0}]}
+        self.assertEqual([(r["ratio"], r["status"]) for r in compare(results, baseline)], [(1.0, "ok")])
+        del baseline["meta"]["calibration_us"]
+        self.assertEqual(compare(results, baseline)[0]["status"], "regression")
+
+    def test_compare_mode_fails_on_regression(self):
+        """--compare reruns at the baseline's sizes and exits 1 only on a regression."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            run = ["--group", "micro", "--only", "leaderboard.", "--repeat", "1", "--max-ops", "20"]
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(main(["--sizes", "30", "--json", path] + run), 0)
+                with open(path, "r", encoding="utf-8") as f:
+                    results = json.load(f)
+                self.assertEqual(results["meta"]["sizes"], [30])
+                for factor, status in ((0.25, 1), (4, 0)):
+                    rows = [dict(r, per_op_us=r["per_op_us"] * factor) for r in results["results"]]
+                    with open(path, "w", encoding="utf-8") as f:
+                        json.dump(dict(results, results=rows), f)
+                    self.assertEqual(main(["--compare", path] + run), status)
+
+    def test_batch_check(self):
+        result = check_batch_vs_loop(size=2_000, counts=(500,), repeat=1)
+        self.assertEqual([r["matches"] for r in result["runs"]], [500])
+        self.assertTrue(result["passed"], result)
+
+    def test_write_latency_check(self):
+        result = check_write_latency(sizes=(200, 5_000), ops=50, repeat=2)
+        self.assertEqual([r["size"] for r in result["runs"]], [200, 5_000])
+        self.assertTrue(result["passed"], result)
+
+    def test_table_memory_check(self):
+        result = check_table_memory(size=5_000)
+        self.assertLess(result["table_bytes"], 64)
+        self.assertTrue(result["passed"], result)
@@ -0,0 +1,48 @@
+import random
+import unittest
+import columnar
+from columnar import PlayerTable
+from leaderboard import Leaderboard, Player
+
+
+class TestPlayerTable(unittest.TestCase):
+    """Unit tests for columnar player storage."""
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.rows = [
+            {"name": f"p{i}", "winRecord": rng.randint(0, 4), "lossRecord": rng.randint(0, 4),
+             "rating": rng.choice([1500.0, 1510.5, 1490.0])}
+            for i in range(200)
+        ]
+
+    def test_leaderboard_to_table(self):
+        """Leaderboard.to_table copies the board; plain players have no table form."""
+        lb = Leaderboard.from_dict({"players": self.rows})
+        table = lb.to_table()
+        self.assertEqual(table.to_dicts(), lb.to_dict()["players"])
+        self.assertEqual(table.standings(3), [p.to_dict() for p in lb.top_n(3)])
+        self.assertFalse(hasattr(Player("solo"), "to_table"))
+
+    def test_order_matches_standings(self):
+        """Vectorized and pure-Python ordering follow the leaderboard tie-breaks."""
+        table = PlayerTable.from_dicts(self.rows)
+        expected = [p.to_dict() for p in Leaderboard.from_dict({"players": self.rows}).standings()]
+        self.assertEqual(table.standings(), expected)
+        saved, columnar.np = columnar.np, None
+        try:
+            self.assertEqual(table.standings(), expected)
+            fallback_stats = table.stats()
+        finally:
+            columnar.np = saved
+        self.assertEqual(table.standings(5), expected[:5])
+        self.assertEqual(table.stats()["players"], 200)
+        self.assertAlmostEqual(table.stats()["rating_mean"], fallback_stats["rating_mean"])
+
+    def test_compact_columns(self):
+        """Columns stay far smaller than the equivalent Player objects."""
+        table = PlayerTable.from_dicts(self.rows)
+        self.assertLess(table.nbytes() / len(table), 48)
+        with self.assertRaises(ValueError):
+            table.find("p0")
+            table.add("p0")
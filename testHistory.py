@@ -0,0 +1,62 @@
+import unittest
+from history import RatingHistory
+from leaderboard import Leaderboard
+
+
+class TestRatingHistory(unittest.TestCase):
+    """Unit tests for compact rating time series."""
+
+    def setUp(self):
+        self.now = 1000.0
+        self.lb = Leaderboard("History")
+        for name in ["alice", "bob", "carol"]:
+            self.lb.add_player(name)
+        self.history = RatingHistory(self.lb, clock=lambda: self.now)
+
+    def play(self, *pairs):
+        self.now += 10
+        for w, l in pairs:
+            self.lb.record_match(w, l)
+
+    def test_point_in_time_lookup(self):
+        self.play(("alice", "bob"))
+        after_first = self.lb.get_player("alice").rating
+        self.play(("alice", "carol"))
+        self.assertEqual(self.history.rating_at("alice", 999), None)
+        self.assertEqual(self.history.rating_at("alice", 1000), 1500.0)
+        self.assertEqual(self.history.rating_at("alice", 1015), after_first)
+        self.assertEqual(self.history.rating_at("alice", 10 ** 6), self.lb.get_player("alice").rating)
+        with self.assertRaises(KeyError):
+            self.history.rating_at("zed", 1000)
+
+    def test_batches_and_other_changes_are_recorded(self):
+        """record_matches, record updates and new players all reach the history."""
+        self.now += 10
+        self.lb.record_matches([("bob", "alice"), ("bob", "carol")])
+        self.assertEqual(self.history.series("bob"), [(1000, 1500.0), (1010, self.lb.get_player("bob").rating)])
+        self.now += 10
+        self.lb.get_player("carol").update_records(1, 5, 1420.5)
+        self.assertEqual(self.history.rating_at("carol", 1020), 1420.5)
+        self.lb.add_player("dave")
+        self.assertEqual(self.history.series("dave"), [(1020, 1500.0)])
+        # same-second changes keep only the latest rating; unchanged ratings add nothing
+        self.lb.get_player("dave").rating = 1510
+        self.lb.get_player("dave").record_win()
+        self.assertEqual(self.history.series("dave"), [(1020, 1510.0)])
+        self.assertEqual(self.history.nbytes(), 8 * len(self.history))
+
+    def test_range_and_downsampling(self):
+        for i in range(200):
+            self.play(("alice", "bob") if i % 3 else ("bob", "alice"))
+        full = self.history.series("alice")
+        self.assertEqual(len(full), 201)
+        self.assertEqual(self.history.count("alice", 1500, 1600), 11)
+        self.assertEqual([t for t, _ in self.history.series("alice", 1500, 1520)], [1500, 1510, 1520])
+        sampled = self.history.series("alice", points=20)
+        self.assertLessEqual(len(sampled), 20)
+        self.assertEqual([t for t, _ in sampled], sorted(t for t, _ in sampled))
+        ratings = [r for _, r in full]
+        self.assertIn(max(ratings), [r for _, r in sampled])
+        self.assertIn(min(ratings), [r for _, r in sampled])
+        with self.assertRaises(ValueError):
+            self.history.record("alice", 1600, at=5)
@@ -0,0 +1,93 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from ingest import ingest_file, main
+from leaderboard import Leaderboard
+from persistence import LeaderboardStore
+
+
+class TestIngest(unittest.TestCase):
+    """Unit tests for the bulk CSV/NDJSON importer."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.roster = self.write("roster.csv", "name,wins,losses,rating\nalice,3,1,1550\nbob,1,3,\ncarol,0,0,\n")
+        self.matches = [("alice", "bob"), ("carol", "alice"), ("bob", "dave"), ("carol", "bob")]
+        self.match_file = self.write("matches.ndjson", "".join(
+            json.dumps({"matchId": i, "winner": w, "loser": l}) + "\n" for i, (w, l) in enumerate(self.matches)))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def expected(self, auto_add):
+        lb = Leaderboard("Expected")
+        lb.add_player("alice", 3, 1).rating = 1550
+        lb.add_player("bob", 1, 3).rating = lb.elo.rating_from_record(1, 3)
+        lb.add_player("carol")
+        if auto_add:
+            lb.add_player("dave")
+        for w, l in self.matches:
+            if lb.get_player(w) and lb.get_player(l):
+                lb.record_match(w, l)
+        return [p.to_dict() for p in lb.standings()]
+
+    def test_batches_match_sequential_updates(self):
+        for auto_add in (False, True):
+            lb = Leaderboard("Ingest")
+            roster = ingest_file(lb, self.roster, "players", batch_size=2)
+            self.assertEqual((roster["added"], roster["updated"], roster["rows"]), (3, 0, 3))
+            summary = ingest_file(lb, self.match_file, "matches", batch_size=3, auto_add=auto_add)
+            self.assertEqual(summary["recorded"], 4 if auto_add else 3)
+            if not auto_add:
+                self.assertEqual(summary["errors"][0]["index"], 2)
+            self.assertEqual([p.to_dict() for p in lb.standings()], self.expected(auto_add))
+
+    def test_rows_missing_required_fields_are_reported(self):
+        lb = Leaderboard("Ingest")
+        roster = self.write("bad.csv", "name,wins,losses\nalice,1,0\n,2,2\nbob,x,1\n")
+        summary = ingest_file(lb, roster, "players")
+        self.assertEqual((summary["added"], summary["failed"]), (1, 2))
+        self.assertEqual([(e["index"], e["error"]) for e in summary["errors"]],
+                         [(1, "missing name"), (2, "invalid record or rating")])
+        rows = [{"winner": "alice", "loser": "zed"}, {"winner": "alice"}, {"winner": "", "loser": "alice"}]
+        match_file = self.write("bad.ndjson", "".join(json.dumps(r) + "\n" for r in rows))
+        summary = ingest_file(lb, match_file, "matches", auto_add=True)
+        self.assertEqual((summary["recorded"], summary["failed"]), (1, 2))
+        self.assertEqual([(e["index"], e["error"]) for e in summary["errors"]],
+                         [(1, "missing loser"), (2, "missing winner")])
+        self.assertEqual(sorted(p.name for p in lb.players), ["alice", "zed"])
+
+    def test_cli_writes_standings_and_snapshot(self):
+        out = os.path.join(self.dir, "standings.ndjson")
+        data_dir = os.path.join(self.dir, "store")
+        argv = ["--data-dir", data_dir, "--players", self.roster, "--matches", self.match_file,
+                "--auto-add", "--out", out, "--quiet"]
+        with redirect_stdout(io.StringIO()) as stdout:
+            self.assertEqual(main(argv), 0)
+        self.assertEqual(json.loads(stdout.getvalue())["players"], 4)
+        with open(out, "r", encoding="utf-8") as f:
+            self.assertEqual([json.loads(line) for line in f], self.expected(True))
+
+        store = LeaderboardStore(data_dir)
+        try:
+            self.assertEqual([p.to_dict() for p in store.load().standings()], self.expected(True))
+        finally:
+            store.close()
+
+    def test_import_does_not_load_flask(self):
+        here = os.path.dirname(os.path.abspath(__file__))
+        code = "import sys, ingest; print('flask' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "False")
@@ -172,6 +172,115 @@ class TestElo(unittest.TestCase):
         self.assertAlmostEqual(winner.rating, round(expected_new_winner_rating, 2))
         self.assertAlmostEqual(loser.rating, round(expected_new_loser_rating, 2))
 
+    def replay_record(self, elo, wins, losses):
+        player = Player("temp", rating=1500)
+        opponent = Player("baseline", rating=1500)
+        for _ in range(wins):
+            elo.update_ratings(player, opponent)
+        for _ in range(losses):
+            elo.update_ratings(opponent, player)
+        return player.rating
+
+    def test_rating_from_record_matches_replay(self):
+        """The cached record engine reproduces game-by-game replay exactly."""
+        elo = Elo(k_factor=32)
+        records = [(0, 0), (5, 3), (0, 12), (40, 7), (17, 17), (20000, 2)]
+        for wins, losses in records:
+            self.assertEqual(elo.rating_from_record(wins, losses), self.replay_record(elo, wins, losses))
+        self.assertEqual(elo.ratings_from_records(records), [elo.rating_from_record(w, l) for w, l in records])
+        self.assertEqual(Elo.calculate_rating_from_record(5, 3), elo.rating_from_record(5, 3))
+
+    def test_record_cache_is_bounded_by_steps(self):
+        """Loss trajectories are evicted by stored steps, and evicted records still replay exactly."""
+        from elo import _RecordTable
+        table = _RecordTable(32)
+        table.MAX_LOSS_STEPS = 300
+        records = [(w, 40) for w in range(20)] + [(3, 250), (3, 10), (7, 40)]
+        for wins, losses in records:
+            self.assertEqual(table.rating(wins, losses), self.replay_record(table.elo, wins, losses))
+            self.assertLessEqual(table.loss_steps, 300)
+        self.assertEqual(table.loss_steps, sum(len(t.player) for t in table.losses.values()))
+        self.assertEqual(list(table.losses)[-1], 7)
+
+    def test_negative_records_count_as_no_games(self):
+        """Negative wins or losses replay no games, on a fresh table and a warm one."""
+        from elo import _RecordTable
+        table = _RecordTable(32)
+        for warm in (False, True):
+            if warm:
+                table.rating(50, 0)
+            for wins, losses in [(-1, 0), (-3, 2), (-2, 1), (4, -2), (-5, -5)]:
+                self.assertEqual(table.rating(wins, losses), self.replay_record(table.elo, wins, losses))
+            self.assertEqual(table.ratings([(-1, 0), (-3, 2)]), [1500, self.replay_record(table.elo, 0, 2)])
+
+    def test_rate_from_records(self):
+        """Leaderboard bulk rebuild assigns record-based ratings and re-ranks."""
+        lb = Leaderboard("Import", players=[Player("a", 2, 8), Player("b", 9, 1)])
+        lb.rate_from_records()
+        self.assertEqual(lb.get_player("b").rating, lb.elo.rating_from_record(9, 1))
+        self.assertEqual([p.name for p in lb.standings()], ["b", "a"])
+
+    def test_exchange_matches_separate_expected_scores(self):
+        """The single-power exchange rounds exactly like the two-sided formula."""
+        import random
+        elo = Elo(k_factor=32)
+        rng = random.Random(11)
+        for _ in range(20000):
+            w, l = round(rng.gauss(1500, 250), 2), rng.gauss(1500, 250)
+            ew, el = elo.expected_score(w, l), elo.expected_score(l, w)
+            self.assertEqual(elo.exchange(w, l), (round(w + 32 * (1 - ew), 2), round(l + 32 * (0 - el), 2)))
+
+    def test_batched_expected_scores(self):
+        """Batched and matrix APIs agree with the scalar formula, with or without NumPy."""
+        import elo as elo_module
+        elo = Elo(k_factor=32)
+        ratings = [1500.0, 1725.5, 1312.25, 1900.0, 1500.0]
+        opponents = ratings[::-1]
+        for np_module in (elo_module.np, None):
+            old, elo_module.np = elo_module.np, np_module
+            try:
+                scores = elo.expected_scores(ratings, opponents)
+                matrix = elo.probability_matrix(ratings)
+            finally:
+                elo_module.np = old
+            for a, b, s in zip(ratings, opponents, scores):
+                self.assertLess(abs(s - elo.expected_score(a, b)), elo_module.BATCH_TOLERANCE)
+            for i, a in enumerate(ratings):
+                self.assertAlmostEqual(matrix[i][i], 0.5)
+                for j, b in enumerate(ratings):
+                    self.assertLess(abs(matrix[i][j] - elo.expected_score(a, b)), elo_module.BATCH_TOLERANCE)
+                    self.assertAlmostEqual(matrix[i][j] + matrix[j][i], 1.0)
+        with self.assertRaises(ValueError):
+            elo.expected_scores([1500.0], [])
+
+        lb = Leaderboard("Matrix", players=[Player("a", rating=1600), Player("b", rating=1400)])
+        self.assertAlmostEqual(lb.probability_matrix(["b", "a"])[0][1], elo.expected_score(1400, 1600))
+        with self.assertRaises(KeyError):
+            lb.probability_matrix(["a", "zed"])
+
+    def test_period_changes(self):
+        """Period changes sum each match scored on pre-period ratings, with or without NumPy."""
+        import elo as elo_module
+        elo = Elo(k_factor=32)
+        ratings = [1500.0, 1725.5, 1312.25, 1900.0]
+        winners, losers = [0, 2, 2, 3, 1], [1, 0, 3, 1, 2]
+        expected = [0.0] * len(ratings)
+        for w, l in zip(winners, losers):
+            delta = 32 * (1 - elo.expected_score(ratings[w], ratings[l]))
+            expected[w] += delta
+            expected[l] -= delta
+        for np_module in (elo_module.np, None):
+            old, elo_module.np = elo_module.np, np_module
+            try:
+                changes = elo.period_changes(ratings, winners, losers)
+            finally:
+                elo_module.np = old
+            for got, want in zip(changes, expected):
+                self.assertAlmostEqual(got, want, places=9)
+        with self.assertRaises(ValueError):
+            elo.period_changes(ratings, [0], [])
+
+
 class TestIntegrationPlayerLeaderboardElo(unittest.TestCase):
     """Integration tests verifying Player, Leaderboard, and Elo working together."""
 
@@ -283,4 +392,231 @@ class TestIntegrationPlayerLeaderboardElo(unittest.TestCase):
         self.assertEqual(
             [p.name for p in self.lb.standings()],
             [p.name for p in lb2.standings()]
-        )
\ No newline at end of file
+        )
+
+
+class TestIndexedRanking(unittest.TestCase):
+    """Tests for the name index and incrementally maintained ranking."""
+
+    def reference_order(self, lb):
+        return sorted(
+            lb.players,
+            key=lambda p: (p.rating, p.win_rate, p.wins, -p.losses, p.name),
+            reverse=True,
+        )
+
+    def test_standings_match_full_sort(self):
+        """Random matches keep standings identical to a full re-sort."""
+        import random
+        rng = random.Random(7)
+        lb = Leaderboard("Random")
+        names = [f"p{i}" for i in range(60)]
+        for name in names:
+            lb.add_player(name, rng.randint(0, 5), rng.randint(0, 5))
+        for _ in range(400):
+            w, l = rng.sample(names, 2)
+            lb.record_match(w, l)
+        lb.get_player("p3").update_records(10, 1, 1700)
+        lb.get_player("p4").rating = 1200
+
+        expected = self.reference_order(lb)
+        self.assertEqual(lb.standings(), expected)
+        self.assertEqual(lb.top_n(5), expected[:5])
+        for i, p in enumerate(expected):
+            self.assertEqual(lb.rank(p.name), i + 1)
+
+    def test_tie_break_order(self):
+        """Equal ratings fall back to win rate, wins, fewer losses, then name."""
+        lb = Leaderboard("Ties")
+        lb.add_player("a", 1, 1)
+        lb.add_player("b", 2, 2)
+        lb.add_player("c", 2, 1)
+        lb.add_player("d", 1, 1)
+        self.assertEqual([p.name for p in lb.standings()], ["c", "b", "d", "a"])
+
+    def test_record_matches_matches_sequential(self):
+        """Batch ingestion gives the same state as one record_match per result."""
+        import random
+        rng = random.Random(3)
+        names = [f"p{i}" for i in range(20)]
+        batch = Leaderboard("Batch")
+        single = Leaderboard("Single")
+        for name in names:
+            batch.add_player(name)
+            single.add_player(name)
+        matches = [tuple(rng.sample(names, 2)) for _ in range(300)]
+        summary = batch.record_matches(matches)
+        for w, l in matches:
+            single.record_match(w, l)
+
+        self.assertEqual(summary, {"recorded": 300, "failed": []})
+        self.assertEqual([p.to_dict() for p in batch.standings()], [p.to_dict() for p in single.standings()])
+
+    def test_large_batch_rebuilds_ranking(self):
+        """A batch touching most players re-sorts the board; later edits still rank correctly."""
+        import random
+        rng = random.Random(9)
+        names = [f"p{i}" for i in range(200)]
+        lb = Leaderboard("Rebuild", players=[Player(n, rng.randint(0, 9), rng.randint(0, 9), rng.gauss(1500, 100))
+                                             for n in names])
+        self.assertEqual(lb.standings(), self.reference_order(lb))
+        lb.record_matches([tuple(rng.sample(names, 2)) for _ in range(500)])
+        self.assertEqual(lb.standings(), self.reference_order(lb))
+        lb.record_match("p1", "p2")
+        lb.remove_player("p3")
+        lb.add_player("new", 4, 1)
+        expected = self.reference_order(lb)
+        self.assertEqual(lb.standings(), expected)
+        self.assertEqual([lb.rank(p.name) for p in expected], list(range(1, len(expected) + 1)))
+
+    def test_rank_index_update(self):
+        """RankIndex.update applies small (finger) and large (relink) batches like remove/insert."""
+        import random
+        from ranking import RankIndex
+        rng = random.Random(5)
+        index, keys = RankIndex(), set(rng.sample(range(10_000), 500))
+        index.load((k, str(k)) for k in sorted(keys))
+        for count in (1, 3, 20, 200, 500):
+            removed = rng.sample(sorted(keys), count)
+            added = rng.sample(sorted(set(range(10_000)) - keys), count + 5)
+            index.update(removed, [(k, str(k)) for k in added])
+            keys = keys.difference(removed).union(added)
+            expected = sorted(keys, reverse=True)
+            self.assertEqual(len(index), len(expected))
+            self.assertEqual(list(index), [str(k) for k in expected])
+            for k in rng.sample(expected, 20):
+                self.assertEqual(index.rank_of(k), expected.index(k))
+            self.assertEqual(index.slice(100, 110), [str(k) for k in expected[100:110]])
+        with self.assertRaises(KeyError):
+            index.update([-1], [])
+
+    def test_rating_period_is_order_independent(self):
+        """A closed period gives the same board for any arrival order of its results."""
+        import random
+        rng = random.Random(5)
+        names = [f"p{i}" for i in range(30)]
+        players = [(n, rng.randint(0, 9), rng.randint(0, 9), round(rng.gauss(1500, 150), 2)) for n in names]
+        matches = [tuple(rng.sample(names, 2)) for _ in range(200)]
+        boards = []
+        for order in (matches, matches[::-1], rng.sample(matches, len(matches))):
+            lb = Leaderboard("Period", players=[Player(*row) for row in players])
+            self.assertEqual(lb.queue_matches(order), {"queued": 200, "failed": []})
+            self.assertEqual(lb.get_player("p0").rating, players[0][3])
+            self.assertEqual(lb.close_period(), {"recorded": 200, "players": 30, "failed": []})
+            self.assertEqual(lb.period_matches, 0)
+            self.assertEqual(lb.standings(), self.reference_order(lb))
+            boards.append([p.to_dict() for p in lb.standings()])
+        self.assertEqual(boards[0], boards[1])
+        self.assertEqual(boards[0], boards[2])
+
+        start = {n: r for n, _, _, r in players}
+        elo = Elo(32)
+        a = next(p for p in boards[0] if p["name"] == "p0")
+        change = sum(32 * (1 - elo.expected_score(start[w], start[l])) for w, l in matches if w == "p0")
+        change -= sum(32 * (1 - elo.expected_score(start[w], start[l])) for w, l in matches if l == "p0")
+        self.assertEqual(a["rating"], round(start["p0"] + change, 2))
+        self.assertEqual(a["winRecord"], players[0][1] + sum(w == "p0" for w, _ in matches))
+
+    def test_rating_period_skips_removed_players(self):
+        """Results for players removed while queued are reported, and the queue survives to_dict."""
+        lb = Leaderboard("Period", players=[Player("a"), Player("b"), Player("c")])
+        with self.assertRaises(KeyError):
+            lb.queue_match("a", "zed")
+        lb.queue_match("a", "b")
+        lb.queue_match("c", "a")
+        copy = Leaderboard.from_dict(lb.to_dict())
+        self.assertEqual(copy.period_matches, 2)
+        lb.remove_player("c")
+        summary = lb.close_period()
+        self.assertEqual((summary["recorded"], [f["index"] for f in summary["failed"]]), (1, [1]))
+        self.assertEqual(lb.get_player("a").rating, 1516.0)
+        self.assertEqual(copy.close_period()["recorded"], 2)
+        self.assertEqual(copy.get_player("a").rating, 1500.0)
+        self.assertNotIn("period", copy.to_dict())
+
+    def test_record_matches_reports_failures(self):
+        """Bad entries are reported by position without aborting the batch."""
+        lb = Leaderboard("Failures")
+        lb.add_player("a")
+        lb.add_player("b")
+        summary = lb.record_matches([("a", "b"), ("a", "zed"), ("x",), ("b", "a")])
+        self.assertEqual(summary["recorded"], 2)
+        self.assertEqual([f["index"] for f in summary["failed"]], [1, 2])
+        self.assertIn("'zed' not found", summary["failed"][0]["error"])
+        self.assertEqual(lb.get_player("a").wins, 1)
+        self.assertEqual(lb.get_player("a").losses, 1)
+
+    def test_page_and_around(self):
+        """Pages and rank windows are slices of the full standings."""
+        lb = Leaderboard("Pages")
+        for i in range(30):
+            lb.add_player(f"p{i:02d}", wins=i % 7, losses=i % 3)
+        lb.rate_from_records()
+        full = lb.standings()
+        self.assertEqual(lb.page(10, 5), full[10:15])
+        self.assertEqual(lb.page(28, 10), full[28:])
+        self.assertEqual(lb.page(40, 10), [])
+
+        target = full[2]
+        offset, window = lb.around(target.name, radius=4)
+        self.assertEqual(offset, 0)
+        self.assertEqual(window, full[:7])
+        offset, window = lb.around(full[20].name, radius=2)
+        self.assertEqual((offset, window), (18, full[18:23]))
+
+    def test_remove_keeps_index_consistent(self):
+        """Removing players updates lookups, positions and ranks."""
+        lb = Leaderboard("Remove")
+        for name in ["a", "b", "c", "d"]:
+            lb.add_player(name)
+        lb.record_match("c", "a")
+        lb.remove_player("b")
+        lb.remove_player("d")
+        self.assertEqual(lb.find_index("c"), 1)
+        self.assertEqual([p.name for p in lb.standings()], ["c", "a"])
+        self.assertEqual(lb.rank("a"), 2)
+        with self.assertRaises(KeyError):
+            lb.rank("b")
+        lb.add_player("b")
+        self.assertEqual(lb.find_index("b"), 2)
+        self.assertEqual(lb.rank("b"), 2)
+
+    def test_positions_follow_many_removals(self):
+        """find_index matches the players list through interleaved adds and removals."""
+        import random
+        rng = random.Random(8)
+        lb = Leaderboard("Churn", players=[Player(f"p{i}") for i in range(40)])
+        added = 40
+        for step in range(400):
+            if lb.players and rng.random() < 0.55:
+                removed = rng.choice(lb.players).name
+                lb.remove_player(removed)
+            else:
+                lb.add_player(f"p{added}")
+                added += 1
+            if step % 25 == 0:
+                self.assertEqual([lb.find_index(p.name) for p in lb.players], list(range(len(lb.players))))
+        self.assertEqual([lb.find_index(p.name) for p in lb.players], list(range(len(lb.players))))
+        self.assertEqual(lb.find_index(removed), -1)
+
+    def test_version_tracks_mutations(self):
+        """Every mutation bumps version; reads and failed batches do not."""
+        lb = Leaderboard("Version")
+        v = lb.version
+        lb.add_player("a")
+        lb.add_player("b")
+        self.assertGreater(lb.version, v)
+        v = lb.version
+        lb.standings()
+        lb.page(0, 10)
+        self.assertEqual(lb.version, v)
+        lb.record_match("a", "b")
+        self.assertGreater(lb.version, v)
+        v = lb.version
+        lb.record_matches([("a", "zed")])
+        self.assertEqual(lb.version, v)
+        lb.record_matches([("b", "a")])
+        self.assertGreater(lb.version, v)
+        v = lb.version
+        lb.remove_player("b")
+        self.assertGreater(lb.version, v)
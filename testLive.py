@@ -0,0 +1,85 @@
+import json
+import time
+import unittest
+from leaderboard import Leaderboard
+from live import Subscription, diff_snapshots
+from service import LeaderboardService, StandingsSnapshot
+
+
+def parse(frame):
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+class TestLiveDeltas(unittest.TestCase):
+    """Unit tests for standings deltas and their fan-out."""
+
+    def setUp(self):
+        self.lb = Leaderboard("Live")
+        for name in ["a", "b", "c", "d"]:
+            self.lb.add_player(name)
+        self.service = LeaderboardService(self.lb)
+        self.broadcaster = self.service.attach_broadcaster(min_interval=0.05)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_diff_snapshots(self):
+        old = StandingsSnapshot.build(self.lb)
+        self.lb.record_match("d", "a")
+        self.lb.remove_player("b")
+        self.lb.add_player("e")
+        delta = diff_snapshots(old, StandingsSnapshot.build(self.lb), ["a", "b", "d", "e", "zed"])
+        rows = {p["name"]: p for p in delta["players"]}
+        self.assertEqual(set(rows), {"a", "b", "d", "e"})
+        self.assertEqual((rows["d"]["rank"], rows["d"]["prevRank"], rows["d"]["winRecord"]), (1, 1, 1))
+        self.assertEqual((rows["b"]["rank"], rows["b"]["prevRank"]), (None, 3))
+        self.assertIsNone(rows["e"]["prevRank"])
+        self.assertEqual((delta["total"], delta["baseVersion"]), (4, old.version))
+
+    def test_burst_is_coalesced_into_chained_deltas(self):
+        sub = self.broadcaster.subscribe()
+        for _ in range(20):
+            self.service.record_match("c", "a")
+        self.service.record_match("b", "d")
+        time.sleep(0.2)
+        frames = []
+        while True:
+            frame = sub.get(0.01)
+            if frame is None:
+                break
+            frames.append(parse(frame))
+        self.assertLess(len(frames), 21)
+        version = self.broadcaster.snapshot().version
+        self.assertEqual(frames[-1][1]["version"], version)
+        for (_, prev), (_, cur) in zip(frames, frames[1:]):
+            self.assertEqual(cur["baseVersion"], prev["version"])
+        self.assertTrue(all(event == "delta" for event, _ in frames))
+        self.assertEqual(self.broadcaster.snapshot().get("c")["winRecord"], 20)
+
+    def test_resets(self):
+        # a subscriber that stops reading gets one reset instead of a backlog
+        slow = Subscription(max_pending=2)
+        for i in range(4):
+            slow.deliver(b"frame %d" % i, b"reset")
+        self.assertEqual([slow.get(0), slow.get(0), slow.get(0)], [b"reset", b"frame 3", None])
+
+        # mutations the service cannot attribute to players force a reset
+        sub = self.broadcaster.subscribe()
+        self.service.submit(self.lb.record_match, "a", "b").result()
+        event, data = parse(sub.get(1.0))
+        self.assertEqual((event, data["version"]), ("reset", self.lb.version))
+
+    def test_event_stream(self):
+        stream = self.broadcaster.events(keepalive=0.01)
+        event, _ = parse(next(stream))
+        self.assertEqual(event, "reset")
+        self.assertEqual(next(stream), b": keepalive\n\n")
+        self.service.remove_player("a")
+        frame = next(stream)
+        while frame.startswith(b":"):
+            frame = next(stream)
+        event, delta = parse(frame)
+        self.assertEqual((event, delta["players"][0]["name"], delta["total"]), ("delta", "a", 3))
+        stream.close()
+        self.assertEqual(self.broadcaster.subscriber_count, 0)
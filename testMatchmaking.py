@@ -0,0 +1,76 @@
+import random
+import unittest
+from elo import Elo
+from matchmaking import Matchmaker
+
+
+class TestMatchmaker(unittest.TestCase):
+    """Unit tests for the rating-window matchmaking queue."""
+
+    def setUp(self):
+        self.mm = Matchmaker(Elo(32), base_window=50, window_growth=10, max_window=400, clock=lambda: 0.0)
+
+    def test_enqueue_and_dequeue(self):
+        self.mm.enqueue("a", 1500, now=0)
+        with self.assertRaises(ValueError):
+            self.mm.enqueue("a", 1600, now=0)
+        self.mm.enqueue("b", 1600, now=0)
+        self.assertEqual([t["name"] for t in self.mm.waiting(now=3)], ["b", "a"])
+        self.assertEqual(self.mm.waiting(now=3)[0]["window"], 80)
+        self.mm.dequeue("b")
+        with self.assertRaises(KeyError):
+            self.mm.dequeue("b")
+        self.assertEqual(len(self.mm), 1)
+
+    def test_find_opponent_window_expands(self):
+        """The closest player inside both windows is chosen, once the windows reach them."""
+        for name, rating in [("a", 1500), ("b", 1580), ("c", 1420), ("d", 1900)]:
+            self.mm.enqueue(name, rating, now=0)
+        self.assertIsNone(self.mm.find_opponent("a", now=0))
+        match = self.mm.find_opponent("a", now=3)
+        self.assertEqual(match["players"], ["a", "b"])
+        self.assertEqual(match["ratingGap"], 80)
+        self.assertAlmostEqual(match["quality"], self.mm.quality(1500, 1580), places=6)
+        self.assertNotIn("a", self.mm)
+        self.assertNotIn("b", self.mm)
+        with self.assertRaises(KeyError):
+            self.mm.find_opponent("a", now=3)
+
+    def test_newcomer_window_limits_pairing(self):
+        """A long wait does not force a lopsided game on a player who just joined."""
+        self.mm.enqueue("veteran", 1500, now=0)
+        self.mm.enqueue("newcomer", 1700, now=30)
+        self.assertIsNone(self.mm.find_opponent("veteran", now=30))
+        self.assertEqual(self.mm.find_opponent("veteran", now=45)["players"], ["veteran", "newcomer"])
+
+    def test_pair_all_takes_closest_adjacent_pairs(self):
+        for name, rating in [("a", 1500), ("b", 1510), ("c", 1530), ("d", 1700), ("e", 1560)]:
+            self.mm.enqueue(name, rating, now=0)
+        matches = self.mm.pair_all(now=0)
+        self.assertEqual([m["players"] for m in matches], [["b", "a"], ["e", "c"]])
+        self.assertEqual([t["name"] for t in self.mm.waiting(now=0)], ["d"])
+
+    def test_pair_all_respects_windows(self):
+        rng = random.Random(7)
+        for i in range(500):
+            self.mm.enqueue(f"p{i}", rng.uniform(1000, 2000), now=rng.uniform(0, 20))
+        matches = self.mm.pair_all(now=20)
+        names = [n for m in matches for n in m["players"]]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual(len(self.mm) + len(names), 500)
+        self.assertTrue(all(m["ratingGap"] <= 250 for m in matches))
+        # nobody left waiting has an acceptable opponent anywhere in the queue
+        left = sorted(self.mm._tickets.values(), key=lambda t: t.rating)
+        self.assertFalse(any(self.mm.acceptable(a, b, 20) for i, a in enumerate(left) for b in left[i + 1:]))
+
+    def test_pair_all_reaches_past_a_refusing_neighbour(self):
+        """A newcomer's narrow window between two waiting players does not block their pairing."""
+        self.mm.enqueue("a", 1000, now=0)
+        self.mm.enqueue("c", 1200, now=0)
+        self.mm.enqueue("b", 1100, now=20)
+        self.assertEqual(self.mm.find_opponent("a", now=20)["players"], ["a", "c"])
+        self.mm.enqueue("a", 1000, now=0)
+        self.mm.enqueue("c", 1200, now=0)
+        self.assertEqual([m["players"] for m in self.mm.pair_all(now=20)], [["c", "a"]])
+        self.assertEqual([t["name"] for t in self.mm.waiting(now=20)], ["b"])
+
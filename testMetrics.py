@@ -0,0 +1,71 @@
+import threading
+import time
+import unittest
+import leaderboard
+from leaderboard import Leaderboard
+from metrics import Counter, Gauge, Histogram, Registry
+from profiler import SamplingProfiler
+
+
+class TestMetrics(unittest.TestCase):
+    """Unit tests for metrics exposition and the sampling profiler."""
+
+    def test_render_text_format(self):
+        reg = Registry()
+        c = Counter("requests_total", "Requests", ("route",), registry=reg)
+        c.labels("/players").inc()
+        c.labels("/players").inc(2)
+        c.labels('/a"b').inc()
+        Gauge("players", "Players", registry=reg, fn=lambda: 7)
+        h = Histogram("latency_seconds", "Latency", registry=reg, buckets=(0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 3.0):
+            h.observe(v)
+        text = reg.render()
+        self.assertIn('requests_total{route="/players"} 3', text)
+        self.assertIn('requests_total{route="/a\\"b"} 1', text)
+        self.assertIn("# TYPE players gauge\nplayers 7", text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("latency_seconds_count 4", text)
+        with self.assertRaises(ValueError):
+            Counter("players", registry=reg)
+        with self.assertRaises(ValueError):
+            c.labels("a", "b")
+
+    def test_leaderboard_counters(self):
+        lb = Leaderboard("Counted")
+        lb.add_player("a")
+        lb.add_player("b")
+        updates = leaderboard.RATING_UPDATES.value
+        lb.record_match("a", "b")
+        lb.record_matches([("b", "a"), ("a", "zed")])
+        self.assertEqual(leaderboard.RATING_UPDATES.value - updates, 2)
+        ranks = leaderboard._RANK.value
+        lb.rank("a")
+        self.assertEqual(leaderboard._RANK.value - ranks, 1)
+
+    def test_profiler_samples_selected_thread(self):
+        stop = threading.Event()
+
+        def busy_loop():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=busy_loop)
+        worker.start()
+        try:
+            profiler = SamplingProfiler(0.001, thread_filter=lambda tid: tid == worker.ident)
+            profiler.start(5)
+            deadline = time.monotonic() + 0.1
+            while time.monotonic() < deadline:
+                # reads while the sampler writes see a consistent copy
+                report = profiler.report(None)
+                self.assertEqual(sum(s["count"] for s in report["stacks"]), report["samples"])
+            profiler.stop()
+        finally:
+            stop.set()
+            worker.join()
+        self.assertFalse(profiler.running)
+        self.assertGreater(profiler.samples, 0)
+        self.assertTrue(all("busy_loop" in stack for stack, _ in profiler.folded()))
+        self.assertEqual(profiler.report()["samples"], profiler.samples)
@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+import unittest
+from leaderboard import Player
+from persistence import LeaderboardStore
+from service import LeaderboardService
+
+
+class TestLeaderboardStore(unittest.TestCase):
+    """Unit tests for the mutation log and snapshots."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def populate(self, store):
+        lb = store.load("Main", k_factor=32)
+        for name in ["alice", "bob", "carol"]:
+            store.log_add(lb.add_player(name))
+        lb.record_match("alice", "bob")
+        store.log_match("alice", "bob")
+        lb.record_matches([("carol", "alice"), ("bob", "carol")])
+        store.log_matches([("carol", "alice"), ("bob", "carol")])
+        p = lb.get_player("bob")
+        p.update_records(4, 4, 1510.5)
+        store.log_update(p)
+        lb.remove_player("carol")
+        store.log_remove("carol")
+        # one closed rating period, and one still open
+        lb.queue_matches([("alice", "bob"), ("bob", "alice"), ("alice", "bob")])
+        store.log_queue([("alice", "bob"), ("bob", "alice"), ("alice", "bob")])
+        lb.close_period()
+        store.log_period()
+        lb.queue_matches([("bob", "alice")])
+        store.log_queue([("bob", "alice")])
+        return lb
+
+    def test_recover_from_log(self):
+        """Replaying the log rebuilds the exact board state."""
+        store = LeaderboardStore(self.dir)
+        lb = self.populate(store)
+        store.close()
+
+        recovered = LeaderboardStore(self.dir).load("Main", k_factor=32)
+        self.assertEqual(recovered.to_dict(), lb.to_dict())
+
+    def test_malformed_batch_entries_are_not_applied_or_logged(self):
+        """The service records and logs only valid pairs, so a restart sees every acknowledged result."""
+        store = LeaderboardStore(self.dir)
+        lb = store.load("Main", k_factor=32)
+        service = LeaderboardService(lb, store)
+        for name in ["a", "b"]:
+            service.add_player(name)
+        summary = service.record_matches([["a", "b"], 5, ["a"], ["a", None], "ab", ["a", "zed"], ("b", "a")])
+        self.assertEqual(summary["recorded"], 2)
+        self.assertEqual([f["index"] for f in summary["failed"]], [1, 2, 3, 4, 5])
+        self.assertEqual(summary["failed"][2]["error"], "missing loser")
+        summary = service.queue_matches([["a", "b"], [1, 2]])
+        self.assertEqual((summary["queued"], [f["index"] for f in summary["failed"]]), (1, [1]))
+        service.close()
+        store.close()
+
+        recovered = LeaderboardStore(self.dir)
+        self.assertEqual(recovered.load().to_dict(), lb.to_dict())
+        self.assertEqual((lb.get_player("a").wins, lb.get_player("a").losses), (1, 1))
+        recovered.close()
+
+    def test_import_rates_only_unrated_rows(self):
+        """Imported rows keep their rating; rows without one get a record-based rating, and both are logged."""
+        from elo import RECORD_RATINGS
+        store = LeaderboardStore(self.dir)
+        lb = store.load("Main", k_factor=32)
+        service = LeaderboardService(lb, store)
+        service.add_player("a", 1, 0)
+        rows = [{"name": "a", "winRecord": 3, "lossRecord": 1, "rating": 1612.5},
+                {"name": "b", "winRecord": 4, "lossRecord": 2},
+                {"name": "c", "winRecord": 2, "lossRecord": 0, "rating": 1550.0},
+                {"name": "c", "winRecord": 5, "lossRecord": 5}]
+        before = RECORD_RATINGS.value
+        self.assertEqual(service.import_players(rows), {"added": 2, "updated": 2})
+        self.assertEqual(RECORD_RATINGS.value - before, 2)
+        self.assertEqual(lb.get_player("a").rating, 1612.5)
+        self.assertEqual(lb.get_player("b").rating, lb.elo.rating_from_record(4, 2))
+        self.assertEqual(lb.get_player("c").rating, lb.elo.rating_from_record(5, 5))
+        service.close()
+        store.close()
+
+        recovered = LeaderboardStore(self.dir)
+        self.assertEqual(recovered.load().to_dict(), lb.to_dict())
+        recovered.close()
+
+    def test_recover_from_snapshot_and_tail(self):
+        """Snapshots drop old segments and recovery replays only the tail."""
+        store = LeaderboardStore(self.dir, snapshot_every=3)
+        lb = self.populate(store)
+        store.snapshot()
+        lb.add_player("dave")
+        store.log_add(lb.get_player("dave"))
+        store.close()
+
+        segments = [f for f in os.listdir(self.dir) if f.startswith("log-")]
+        self.assertEqual(len(segments), 1)
+        recovered = LeaderboardStore(self.dir).load()
+        self.assertEqual(recovered.to_dict(), lb.to_dict())
+
+    def test_torn_tail_is_ignored(self):
+        """A partially written last line is dropped on recovery."""
+        store = LeaderboardStore(self.dir)
+        lb = self.populate(store)
+        store.close()
+        segment = sorted(f for f in os.listdir(self.dir) if f.startswith("log-"))[-1]
+        with open(os.path.join(self.dir, segment), "a") as f:
+            f.write('{"seq": 99, "op": "add", "na')
+
+        store = LeaderboardStore(self.dir)
+        recovered = store.load()
+        self.assertEqual(recovered.to_dict(), lb.to_dict())
+        store.log_add(recovered.add_player("erin"))
+        store.close()
+        self.assertIsNotNone(LeaderboardStore(self.dir).load().get_player("erin"))
+
+    def test_directory_is_locked(self):
+        """A second store cannot open a directory in use, and never truncates its log."""
+        store = LeaderboardStore(self.dir)
+        self.populate(store)
+        with self.assertRaises(RuntimeError):
+            LeaderboardStore(self.dir).load()
+        store.log_add(Player("dave"))
+        store.close()
+        recovered = LeaderboardStore(self.dir)
+        self.assertIsNotNone(recovered.load().get_player("dave"))
+        recovered.close()
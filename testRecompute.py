@@ -0,0 +1,60 @@
+import json
+import os
+import random
+import unittest
+from leaderboard import Leaderboard
+from recompute import EncodedSeason, load_seasons, recompute, replay, summarize
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web", "sample_season.json")
+
+
+class TestRecompute(unittest.TestCase):
+    """Unit tests for encoded season replays and k-factor sweeps."""
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.names = [f"p{i}" for i in range(12)]
+        self.pairs = [tuple(rng.sample(self.names, 2)) for _ in range(300)]
+        self.season = EncodedSeason.encode("synthetic", self.pairs, ["idle"])
+
+    def test_encoding_round_trip(self):
+        self.assertEqual(len(self.season), 300)
+        self.assertEqual(len(self.season.payload), 300 * 8)
+        ids = self.season.decode()
+        names = self.season.names
+        self.assertEqual(names[0], "idle")
+        self.assertEqual([(names[ids[2 * i]], names[ids[2 * i + 1]]) for i in range(300)], self.pairs)
+
+    def test_replay_matches_leaderboard(self):
+        """A replay ends with the standings the Leaderboard computes for the same matches."""
+        for k in (16, 32):
+            lb = Leaderboard("Expected", k_factor=k)
+            for name in ["idle"] + self.names:
+                lb.add_player(name)
+            lb.record_matches(self.pairs)
+            result = replay(self.season, k)
+            expected = [dict(p.to_dict(), rank=i + 1) for i, p in enumerate(lb.standings())]
+            self.assertEqual(result["standings"], expected)
+            self.assertEqual(result["matches"], 300)
+            self.assertTrue(0 <= result["accuracy"] <= 1)
+        self.assertEqual(len(replay(self.season, 32, top=3)["standings"]), 3)
+
+    def test_parallel_sweep_matches_serial(self):
+        seasons = load_seasons(SAMPLE) + [self.season]
+        k_factors = [16, 32, 48]
+        serial = recompute(seasons, k_factors, workers=1)
+        self.assertEqual(recompute(seasons, k_factors, workers=2), serial)
+        self.assertEqual([(r["season"], r["kFactor"]) for r in serial[:3]],
+                         [("fall-2024", 16.0), ("fall-2024", 32.0), ("fall-2024", 48.0)])
+
+        summary = summarize(serial)
+        self.assertEqual([row["kFactor"] for row in summary["byK"]], [16.0, 32.0, 48.0])
+        self.assertEqual(summary["byK"][0]["matches"], 306)
+        self.assertIn(summary["bestK"], k_factors)
+
+    def test_load_seasons_filters_ids(self):
+        with open(SAMPLE, "r", encoding="utf-8") as f:
+            fall = [s for s in json.load(f)["seasons"] if s["seasonId"] == "fall-2024"][0]
+        [season] = load_seasons(SAMPLE, ["fall-2024"])
+        self.assertEqual(len(season), len(fall["matches"]))
+        self.assertEqual(set(season.names), {p["name"] for p in fall["players"]})
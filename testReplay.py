@@ -0,0 +1,72 @@
+import json
+import os
+import random
+import unittest
+from replay import ReplayEngine
+
+
+class TestReplayEngine(unittest.TestCase):
+    """Unit tests for checkpointed match history replay."""
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.names = [f"p{i}" for i in range(8)]
+        self.matches = []
+        for i in range(60):
+            w, l = rng.sample(self.names, 2)
+            self.matches.append({"matchId": i + 1, "winner": w, "loser": l})
+        self.engine = ReplayEngine(self.matches, checkpoint_every=7)
+
+    def rebuilt(self):
+        """Ratings from a from-scratch replay of the engine's current history."""
+        return ReplayEngine(self.engine.matches, checkpoint_every=1000).ratings()
+
+    def test_edits_match_full_rebuild(self):
+        """replace/delete/insert give the same ratings as rebuilding from scratch."""
+        before = self.engine.ratings()
+        changed = self.engine.replace(30, "p7", "p0")
+        after = self.engine.ratings()
+        self.assertEqual(after, self.rebuilt())
+        self.assertEqual(changed, {n for n in after if after[n] != before.get(n)})
+
+        self.engine.delete(3)
+        self.assertEqual(self.engine.ratings(), self.rebuilt())
+
+        self.engine.insert(50, {"matchId": 99, "winner": "new", "loser": "p1"})
+        self.assertEqual(self.engine.ratings(), self.rebuilt())
+
+        self.engine.append({"matchId": 100, "winner": "p2", "loser": "new"})
+        self.assertEqual(self.engine.ratings(), self.rebuilt())
+
+    def test_out_of_range_index_is_rejected(self):
+        """Negative or past-the-end positions raise ValueError and leave the history intact."""
+        before = self.engine.ratings()
+        for edit in (lambda: self.engine.replace(-1, "p1", "p2"), lambda: self.engine.delete(-3),
+                     lambda: self.engine.delete(60), lambda: self.engine.insert(-1, {"winner": "x", "loser": "p1"}),
+                     lambda: self.engine.insert(61, {"winner": "x", "loser": "p1"}), lambda: self.engine.state_at(-1)):
+            with self.assertRaises(ValueError):
+                edit()
+        self.assertEqual((len(self.engine.matches), self.engine.ratings()), (60, before))
+        self.engine.insert(60, {"winner": "p1", "loser": "p2"})
+        self.assertEqual(self.engine.ratings(), self.rebuilt())
+
+    def test_state_at_and_leaderboard(self):
+        """Point-in-time states and leaderboard export follow the history."""
+        partial = ReplayEngine(self.matches[:25]).ratings()
+        state = self.engine.state_at(25)
+        self.assertEqual({n: r for n, r in state.items() if n in partial}, partial)
+
+        lb = self.engine.to_leaderboard()
+        self.assertEqual(sum(p.wins for p in lb.players), 60)
+        self.assertEqual(lb.get_player("p0").rating, self.engine.ratings()["p0"])
+
+    def test_from_season(self):
+        """Sample season data replays in (date, matchId) order."""
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web", "sample_season.json")
+        with open(path) as f:
+            season = json.load(f)["seasons"][0]
+        engine = ReplayEngine.from_season(season)
+        self.assertEqual(len(engine.matches), len(season["matches"]))
+        self.assertGreater(engine.ratings()["alice"], 1500)
+        changed = engine.replace(engine.find(2), winner="dave", loser="carol")
+        self.assertEqual(changed, {"carol", "dave"})
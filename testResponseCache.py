@@ -0,0 +1,38 @@
+import unittest
+from response_cache import ResponseCache, etag_matches, make_etag
+
+
+class TestResponseCache(unittest.TestCase):
+    """Unit tests for the versioned response cache."""
+
+    def test_reuses_body_until_version_changes(self):
+        cache = ResponseCache()
+        calls = []
+
+        def build():
+            calls.append(1)
+            return b'{"n":%d}' % len(calls)
+
+        body, etag = cache.get("/players", 1, build)
+        self.assertEqual(cache.get("/players", 1, build), (body, etag))
+        self.assertEqual(len(calls), 1)
+        body2, etag2 = cache.get("/players", 2, build)
+        self.assertNotEqual(etag, etag2)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_lru_bound(self):
+        cache = ResponseCache(max_entries=2)
+        for key in ["a", "b", "c"]:
+            cache.store(key, 1, key.encode())
+        self.assertIsNone(cache.lookup("a", 1))
+        self.assertEqual(cache.lookup("c", 1)[0], b"c")
+
+    def test_etag_matching(self):
+        etag = make_etag(7, b"body")
+        self.assertTrue(etag_matches(etag, etag))
+        self.assertTrue(etag_matches(f'"x", W/{etag}', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches(None, etag))
+        self.assertFalse(etag_matches(make_etag(7, b"other"), etag))
+
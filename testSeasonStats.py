@@ -0,0 +1,97 @@
+import math
+import random
+import unittest
+from leaderboard import Leaderboard, Player
+from season_stats import SeasonStats
+
+
+class TestSeasonStats(unittest.TestCase):
+    """Unit tests for the incrementally maintained season aggregates."""
+
+    def recomputed(self, lb, matches):
+        """The same figures computed from scratch."""
+        players = lb.players
+        rates = sorted(p.win_rate for p in players if p.total_games)
+        pairs = {}
+        for w, l in matches:
+            key = tuple(sorted((w, l)))
+            pairs.setdefault(key, [0, 0])[key.index(w)] += 1
+        histogram = {}
+        for p in players:
+            b = math.floor(p.rating / 50)
+            histogram[b] = histogram.get(b, 0) + 1
+        return {
+            "players": len(players),
+            "matches": len(matches),
+            "games": sum(p.total_games for p in players),
+            "mean": round(sum(p.rating for p in players) / len(players), 2),
+            "min": min(p.rating for p in players),
+            "max": max(p.rating for p in players),
+            "histogram": sorted(histogram.items()),
+            "p50": round(rates[math.ceil(len(rates) / 2) - 1], 4),
+            "active": sorted(((p.total_games, p.name) for p in players), reverse=True)[:5],
+            "pairs": sorted(((sum(w), k) for k, w in pairs.items()), reverse=True)[:5],
+            "pair_wins": pairs,
+        }
+
+    def observed(self, stats):
+        d = stats.to_dict(5)
+        return {
+            "players": d["players"],
+            "matches": d["matches"],
+            "games": d["games"],
+            "mean": d["ratings"]["mean"],
+            "min": d["ratings"]["min"],
+            "max": d["ratings"]["max"],
+            "histogram": [(h["from"] // 50, h["count"]) for h in d["ratings"]["histogram"]],
+            "p50": d["winRates"]["p50"],
+            "active": [(a["games"], a["name"]) for a in d["mostActive"]],
+            "pairs": [(h["games"], tuple(h["players"])) for h in d["headToHead"]],
+            "pair_wins": {tuple(h["players"]): h["wins"] for h in d["headToHead"]},
+        }
+
+    def test_incremental_matches_recompute(self):
+        """Aggregates follow matches, batches, direct edits and removals like a full recompute."""
+        rng = random.Random(21)
+        names = [f"p{i}" for i in range(40)]
+        lb = Leaderboard("Season", players=[Player(n, rng.randint(0, 5), rng.randint(0, 5), 1500) for n in names])
+        matches = [tuple(rng.sample(names[:10], 2)) for _ in range(30)]
+        for w, l in matches:
+            lb.record_match(w, l)
+        stats = SeasonStats(lb, matches)
+
+        more = [tuple(rng.sample(names, 2)) for _ in range(300)]
+        lb.record_matches(more[:200])
+        for w, l in more[:200]:
+            stats.add_match(w, l)
+        for w, l in more[200:]:
+            lb.record_match(w, l)
+            stats.add_match(w, l)
+        lb.get_player("p3").update_records(0, 0, 1720.5)
+        version = stats.version
+        lb.remove_player("p4")
+        self.assertGreater(stats.version, version)
+
+        expected = self.recomputed(lb, matches + more)
+        got = self.observed(stats)
+        pair_wins = expected.pop("pair_wins")
+        for pair, wins in got.pop("pair_wins").items():
+            self.assertEqual(wins, pair_wins[pair])
+        self.assertEqual(got, expected)
+
+    def test_head_to_head_and_empty_board(self):
+        """Head-to-head is reported from either side; an empty board has no figures."""
+        lb = Leaderboard("Empty")
+        stats = SeasonStats(lb)
+        d = stats.to_dict()
+        self.assertEqual((d["players"], d["ratings"]["mean"], d["winRates"]["p50"]), (0, None, None))
+        lb.add_player("a")
+        lb.add_player("b")
+        for w, l in [("a", "b"), ("a", "b"), ("b", "a")]:
+            lb.record_match(w, l)
+            stats.add_match(w, l)
+        self.assertEqual(stats.head_to_head("b", "a"), {"players": ["b", "a"], "wins": [1, 2]})
+        self.assertEqual(stats.head_to_head("a", "zed")["wins"], [0, 0])
+        stats.close()
+        lb.record_match("a", "b")
+        self.assertEqual(stats.to_dict()["games"], 6)
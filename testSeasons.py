@@ -0,0 +1,101 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from seasons import SeasonRegistry, import_seasons
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web", "sample_season.json")
+
+
+class TestSeasonRegistry(unittest.TestCase):
+    """Unit tests for the lazily loaded season registry."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.ids = import_seasons(SAMPLE, self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_lazy_load_and_standings(self):
+        """Seasons load on first access and rank their stored players."""
+        registry = SeasonRegistry(self.dir)
+        self.assertEqual(registry.season_ids(), ["fall-2024", "winter-2024", "spring-2025"])
+        self.assertEqual(registry.catalog["currentSeasonId"], "winter-2024")
+        self.assertEqual(registry.loaded(), [])
+
+        fall = registry.get("fall-2024")
+        self.assertEqual(registry.loaded(), ["fall-2024"])
+        self.assertEqual(fall.leaderboard.top_n(1)[0].name, "alice")
+        self.assertEqual([t["teamName"] for t in fall.teams], ["Thunder", "Lightning"])
+        self.assertEqual(fall.recent_matches(0, 2)[0]["matchId"], 3)
+        with self.assertRaises(KeyError):
+            registry.get("../catalog")
+
+    def test_lru_eviction(self):
+        """The least recently used season is evicted first."""
+        registry = SeasonRegistry(self.dir, max_seasons=2)
+        registry.get("fall-2024")
+        registry.get("winter-2024")
+        registry.get("fall-2024")
+        registry.get("spring-2025")
+        self.assertEqual(registry.loaded(), ["fall-2024", "spring-2025"])
+
+        tiny = SeasonRegistry(self.dir, max_size=1)
+        tiny.get("fall-2024")
+        tiny.get("winter-2024")
+        self.assertEqual(tiny.loaded(), ["winter-2024"])
+
+    def test_replay_when_no_stored_players(self):
+        """A season without stored standings is rebuilt from its matches."""
+        path = os.path.join(self.dir, "winter-2024.json")
+        with open(path) as f:
+            data = json.load(f)
+        data["players"] = []
+        with open(path, "w") as f:
+            json.dump(data, f)
+        winter = SeasonRegistry(self.dir).get("winter-2024")
+        self.assertEqual(winter.leaderboard.top_n(1)[0].name, "frank")
+        self.assertEqual(winter.leaderboard.get_player("frank").wins, 2)
+
+    def test_recorded_matches_survive_eviction(self):
+        """Season matches update the stats and are written back when the season is evicted."""
+        registry = SeasonRegistry(self.dir, max_seasons=1)
+        fall = registry.get("fall-2024")
+        matches = fall.stats.match_count
+        self.assertFalse(fall.modified)
+        with self.assertRaises(KeyError):
+            fall.record_match("bob", "zed")
+        match = fall.record_match("bob", "alice", "2024-12-01")
+        self.assertEqual(match["matchId"], 4)
+        self.assertEqual(fall.stats.match_count, matches + 1)
+        self.assertEqual(fall.stats.head_to_head("bob", "alice")["wins"][0], 1)
+        standings = [p.to_dict() for p in fall.leaderboard.standings()]
+
+        registry.get("winter-2024")
+        self.assertEqual(registry.loaded(), ["winter-2024"])
+        reloaded = registry.get("fall-2024")
+        self.assertIsNot(reloaded, fall)
+        self.assertGreater(reloaded.generation, fall.generation)
+        self.assertEqual([p.to_dict() for p in reloaded.leaderboard.standings()], standings)
+        self.assertEqual(reloaded.recent_matches(0, 1)[0], match)
+        self.assertEqual(reloaded.stats.match_count, matches + 1)
+        self.assertEqual(SeasonRegistry(self.dir).catalog["seasons"][0]["matchCount"], matches + 1)
+
+    def test_checked_out_season_is_not_evicted(self):
+        """A season in use stays loaded past the budget and is saved with its writes once released."""
+        registry = SeasonRegistry(self.dir, max_seasons=1)
+        with registry.checkout("fall-2024") as fall:
+            registry.get("winter-2024")
+            self.assertEqual(registry.loaded(), ["fall-2024", "winter-2024"])
+            registry.evict("fall-2024")
+            with fall.lock:
+                match = fall.record_match("bob", "alice", "2024-12-02")
+            self.assertIs(registry.get("fall-2024"), fall)
+        self.assertEqual(registry.loaded(), ["fall-2024"])
+        registry.get("winter-2024")
+        self.assertEqual(registry.loaded(), ["winter-2024"])
+        self.assertFalse(fall.modified)
+        self.assertEqual(SeasonRegistry(self.dir).get("fall-2024").recent_matches(0, 1)[0], match)
+        self.assertFalse(registry.has_season("../catalog"))
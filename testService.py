@@ -0,0 +1,222 @@
+import threading
+import unittest
+from leaderboard import Leaderboard
+from service import LeaderboardService, StandingsSnapshot
+
+
+class TestLeaderboardService(unittest.TestCase):
+    """Unit tests for the single-writer service and its snapshots."""
+
+    def setUp(self):
+        self.lb = Leaderboard("Service")
+        self.service = LeaderboardService(self.lb)
+        for name in ["alice", "bob", "carol", "dave"]:
+            self.service.add_player(name)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_concurrent_writers_lose_no_updates(self):
+        """Matches submitted from many threads are all applied."""
+        def worker(w, l):
+            for _ in range(50):
+                self.service.record_match(w, l)
+
+        threads = [threading.Thread(target=worker, args=pair)
+                   for pair in [("alice", "bob"), ("carol", "dave"), ("bob", "carol"), ("dave", "alice")]]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        snap = self.service.snapshot()
+        self.assertEqual(sum(p["winRecord"] for p in snap.players), 200)
+        self.assertEqual(sum(p["lossRecord"] for p in snap.players), 200)
+
+    def test_order_matches_sequential_board(self):
+        """Submission order from one client is applied deterministically."""
+        pairs = [("alice", "bob"), ("bob", "carol"), ("carol", "alice"), ("dave", "bob")] * 5
+        futures = [self.service.submit(self.service._record_match, w, l) for w, l in pairs]
+        for f in futures:
+            f.result()
+
+        expected = Leaderboard("Expected")
+        for name in ["alice", "bob", "carol", "dave"]:
+            expected.add_player(name)
+        for w, l in pairs:
+            expected.record_match(w, l)
+        self.assertEqual(list(self.service.snapshot().players), [p.to_dict() for p in expected.standings()])
+
+    def test_snapshot_reads(self):
+        """Snapshots are immutable and reflect the caller's own writes."""
+        before = self.service.snapshot()
+        self.service.record_match("carol", "alice")
+        after = self.service.snapshot()
+        self.assertGreater(after.version, before.version)
+        self.assertEqual(before.get("carol")["winRecord"], 0)
+        self.assertEqual(after.rank("carol"), 1)
+        self.assertEqual(after.page(0, 1)[0]["rank"], 1)
+        offset, window = after.around("carol", 1)
+        self.assertEqual((offset, len(window)), (0, 2))
+
+        with self.assertRaises(KeyError):
+            self.service.update_player("zed", 1, 1)
+        with self.assertRaises(ValueError):
+            self.service.add_player("alice")
+
+
+    def test_derived_snapshots_match_full_build(self):
+        """Incrementally derived snapshots read exactly like a fresh build, across block splits."""
+        import random
+        from unittest import mock
+        rng = random.Random(11)
+        names = [f"p{i}" for i in range(60)]
+        with mock.patch.object(StandingsSnapshot, "BLOCK_SIZE", 4):
+            for name in names:
+                self.service.add_player(name, rng.randint(0, 9), rng.randint(0, 9))
+            for step in range(40):
+                if step % 10 == 9:
+                    self.service.remove_player(names.pop(rng.randrange(len(names))))
+                elif step % 3:
+                    self.service.record_matches([tuple(rng.sample(names, 2)) for _ in range(rng.randint(2, 30))])
+                else:
+                    self.service.record_match(*rng.sample(names, 2))
+                snap, full = self.service.snapshot(), StandingsSnapshot.build(self.lb)
+                self.assertEqual((snap.version, snap.total, snap.players), (full.version, full.total, full.players))
+                self.assertEqual(snap.page(7, 9), full.page(7, 9))
+                for name in rng.sample(names, 5) + ["zed"]:
+                    self.assertEqual((snap.get(name), snap.rank(name)), (full.get(name), full.rank(name)))
+
+
+class TestAsgiApp(unittest.TestCase):
+    """Drive the ASGI app in-process without a server."""
+
+    def setUp(self):
+        import tempfile
+        from asgi_server import LeaderboardApp
+        self.dir = tempfile.mkdtemp()
+        self.app = LeaderboardApp(self.dir)
+
+    def tearDown(self):
+        import shutil
+        self.app.shutdown()
+        shutil.rmtree(self.dir)
+
+    def request(self, method, path, body=None, query=b"", headers=()):
+        import asyncio
+        import json
+        sent = []
+        raw = json.dumps(body).encode() if body is not None else b""
+
+        async def receive():
+            return {"type": "http.request", "body": raw, "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": list(headers)}
+        asyncio.run(self.app(scope, receive, send))
+        self.last_headers = dict(sent[0]["headers"])
+        return sent[0]["status"], json.loads(sent[1]["body"]) if sent[1]["body"] else None
+
+    def test_routes(self):
+        """Mutations and reads go through the async facade."""
+        self.assertEqual(self.request("POST", "/add_player", {"name": "alice", "wins": 3, "losses": 1})[0], 200)
+        self.request("POST", "/add_player", {"name": "bob"})
+        self.assertEqual(self.request("POST", "/add_player", {"name": "bob"})[0], 400)
+        self.request("POST", "/record_match", {"winner": "bob", "loser": "alice"})
+        status, summary = self.request("POST", "/record_matches", {"matches": [["alice", "bob"], ["x", "bob"]]})
+        self.assertEqual(summary["recorded"], 1)
+
+        status, players = self.request("GET", "/players")
+        self.assertEqual([p["name"] for p in players], ["alice", "bob"])
+        status, page = self.request("GET", "/players", query=b"offset=1&limit=5")
+        self.assertEqual((page["total"], page["players"][0]["rank"]), (2, 2))
+        self.assertEqual(self.request("GET", "/player/bob/rank")[1]["rank"], 2)
+        self.assertEqual(self.request("GET", "/player/zed")[0], 404)
+        self.assertEqual(self.request("POST", "/update_player", {"name": "zed"})[0], 404)
+        self.request("POST", "/remove_player", {"name": "bob"})
+        self.assertEqual(self.request("GET", "/player/alice/around")[1]["players"][0]["name"], "alice")
+
+    def test_etag_revalidation(self):
+        """GETs carry an ETag; a matching If-None-Match gets 304 until the next write."""
+        self.request("POST", "/add_player", {"name": "alice"})
+        self.request("POST", "/add_player", {"name": "bob"})
+        status, _ = self.request("GET", "/players", query=b"limit=10")
+        etag = self.last_headers[b"etag"]
+        revalidate = [(b"if-none-match", etag)]
+        self.assertEqual(self.request("GET", "/players", query=b"limit=10", headers=revalidate), (304, None))
+        self.assertEqual(self.app.cache.hits, 1)
+        self.request("POST", "/record_match", {"winner": "bob", "loser": "alice"})
+        status, page = self.request("GET", "/players", query=b"limit=10", headers=revalidate)
+        self.assertEqual((status, page["players"][0]["name"]), (200, "bob"))
+        self.assertNotEqual(self.last_headers[b"etag"], etag)
+
+    def test_event_stream(self):
+        """GET /events streams a reset, then deltas, until the client disconnects."""
+        import asyncio
+        self.request("POST", "/add_player", {"name": "alice"})
+        self.request("POST", "/add_player", {"name": "bob"})
+        self.app.service.broadcaster.min_interval = 0.01
+        sent = []
+
+        async def run():
+            gone = asyncio.Event()
+            messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await gone.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {"type": "http", "method": "GET", "path": "/events", "query_string": b"", "headers": []}
+            task = asyncio.ensure_future(self.app(scope, receive, send))
+            await asyncio.sleep(0.05)
+            await self.app.board.record_match("bob", "alice")
+            for _ in range(100):
+                if any(b"event: delta" in m.get("body", b"") for m in sent):
+                    break
+                await asyncio.sleep(0.01)
+            gone.set()
+            await asyncio.wait_for(task, 1.0)
+
+        asyncio.run(run())
+        self.assertEqual(dict(sent[0]["headers"])[b"content-type"], b"text/event-stream")
+        self.assertTrue(sent[1]["body"].startswith(b"id: "))
+        delta = [m["body"] for m in sent[1:] if b"event: delta" in m["body"]][0]
+        self.assertIn(b'"name":"bob"', delta)
+        self.assertEqual(self.app.service.broadcaster.subscriber_count, 0)
+
+
+class TestFlaskServer(unittest.TestCase):
+    """Start server.py the way `python server.py` does."""
+
+    def test_reloader_imports_share_the_data_directory(self):
+        """The reloader's watcher process leaves the data directory to the serving child."""
+        import os
+        import subprocess
+        import sys
+        import tempfile
+        here = os.path.dirname(os.path.abspath(__file__))
+        # stands in for Werkzeug's reloader: app.run() in the watcher re-imports
+        # server.py in a child process while the watcher is still running
+        watcher = (
+            "import os, runpy, subprocess, sys, flask\n"
+            "def run(app, *args, **kwargs):\n"
+            "    env = dict(os.environ, WERKZEUG_RUN_MAIN='true')\n"
+            "    child = 'import server; print(len(server.lb.players), server.store is not None)'\n"
+            "    sys.exit(subprocess.run([sys.executable, '-c', child], env=env).returncode)\n"
+            "flask.Flask.run = run\n"
+            "runpy.run_path('server.py', run_name='__main__')\n"
+        )
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = dict(os.environ, LEADERBOARD_DATA_DIR=data_dir)
+            env.pop("WERKZEUG_RUN_MAIN", None)
+            result = subprocess.run([sys.executable, "-c", watcher], cwd=here, env=env,
+                                    capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ["0", "True"])
@@ -0,0 +1,69 @@
+import random
+import shutil
+import tempfile
+import unittest
+from leaderboard import Leaderboard
+from sharding import ShardedLeaderboard
+
+
+class TestShardedLeaderboard(unittest.TestCase):
+    """Multi-process tests for the sharded leaderboard against a single board."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_matches_single_board(self):
+        """Cross-shard matches, merged top-N, pages and ranks agree with one Leaderboard."""
+        rng = random.Random(17)
+        names = [f"p{i}" for i in range(60)]
+        matches = [tuple(rng.sample(names, 2)) for _ in range(400)]
+        single = Leaderboard("Single")
+        with ShardedLeaderboard(shards=3) as board:
+            self.assertEqual(len({board.shard_of(n) for n in names}), 3)
+            for name in names:
+                wins, losses = rng.randint(0, 9), rng.randint(0, 9)
+                board.add_player(name, wins, losses)
+                single.add_player(name, wins, losses).rating = single.elo.rating_from_record(wins, losses)
+            summary = board.record_matches(matches[:300])
+            self.assertEqual(summary, {"recorded": 300, "failed": []})
+            for w, l in matches[300:]:
+                board.record_match(w, l)
+            single.record_matches(matches)
+
+            expected = [p.to_dict() for p in single.standings()]
+            self.assertEqual(board.standings(), expected)
+            self.assertEqual(board.top_n(7), expected[:7])
+            self.assertEqual(board.page(20, 15), expected[20:35])
+            self.assertEqual(len(board), len(names))
+            for name in rng.sample(names, 10):
+                self.assertEqual(board.rank(name), single.rank(name))
+                self.assertEqual(board.get_player(name), single.get_player(name).to_dict())
+
+            board.remove_player("p1")
+            self.assertIsNone(board.get_player("p1"))
+            with self.assertRaises(KeyError):
+                board.rank("p1")
+            with self.assertRaises(KeyError):
+                board.record_match("p1", "p2")
+            with self.assertRaises(ValueError):
+                board.add_player("p2")
+            summary = board.record_matches([("p2", "p3"), ("p1", "p2"), ("x",)])
+            self.assertEqual(summary["recorded"], 1)
+            self.assertEqual([f["index"] for f in summary["failed"]], [1, 2])
+
+    def test_shards_persist(self):
+        """Each shard keeps its own store, and the shard count of a directory is fixed."""
+        with ShardedLeaderboard(shards=2, data_dir=self.dir) as board:
+            for name in ("alice", "bob", "carol"):
+                board.add_player(name)
+            board.record_matches([("alice", "bob"), ("carol", "alice")])
+            board.snapshot()
+            board.record_match("bob", "carol")
+            expected = board.standings()
+        with ShardedLeaderboard(shards=2, data_dir=self.dir) as board:
+            self.assertEqual(board.standings(), expected)
+        with self.assertRaises(ValueError):
+            ShardedLeaderboard(shards=3, data_dir=self.dir)
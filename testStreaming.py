@@ -0,0 +1,63 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import streaming
+from leaderboard import Leaderboard
+from streaming import export_leaderboard, iter_json, iter_leaderboard, load_leaderboard, load_table, read_players
+
+
+class TestStreaming(unittest.TestCase):
+    """Unit tests for chunked export and incremental import."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.lb = Leaderboard("Big \"quoted\" board")
+        for i in range(1200):
+            p = self.lb.add_player(f"player-{i}-é", i % 7, i % 5)
+            p.rating = 1400 + (i * 37) % 300 + 0.25
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_json_export_matches_to_dict(self):
+        """The streamed document is the to_dict() schema, emitted in several chunks."""
+        chunks = list(iter_leaderboard(self.lb, "json"))
+        self.assertGreater(len(chunks), 2)
+        self.assertEqual(json.loads("".join(chunks)), self.lb.to_dict())
+        self.assertEqual(json.loads("".join(iter_json("empty", []))), {"name": "empty", "playerCount": 0, "players": []})
+
+    def test_roundtrip_both_formats(self):
+        for fname in ("board.json", "board.ndjson"):
+            path = os.path.join(self.dir, fname)
+            export_leaderboard(self.lb, path)
+            loaded = load_leaderboard(path)
+            expected = [p.to_dict() for p in self.lb.standings()]
+            self.assertEqual([p.to_dict() for p in loaded.standings()], expected)
+            self.assertEqual(load_table(path).standings(), expected)
+            if fname.endswith(".json"):
+                self.assertEqual((loaded.name, loaded.playerCount), (self.lb.name, self.lb.playerCount))
+
+    def test_parser_handles_block_boundaries(self):
+        """Values split across tiny reads, bytes or text, still parse."""
+        doc = json.dumps(self.lb.to_dict(), indent=1)
+        old = streaming.READ_SIZE
+        streaming.READ_SIZE = 7
+        try:
+            meta = {}
+            rows = list(read_players(io.BytesIO(doc.encode("utf-8")), "json", meta))
+            self.assertEqual(rows, self.lb.to_dict()["players"])
+            self.assertEqual(meta["name"], self.lb.name)
+            self.assertEqual(list(read_players(io.StringIO("[ {\"name\": \"a\", \"rating\": 1234.5} ]"))),
+                             [{"name": "a", "rating": 1234.5}])
+        finally:
+            streaming.READ_SIZE = old
+
+    def test_malformed_input(self):
+        for bad in ('{"players": [{"name": "a"}', '{"players": [1 2]}', '{"players": []} {"x": 1}', '{"players": 5}'):
+            with self.assertRaises(ValueError):
+                list(read_players(io.StringIO(bad)))
+        with self.assertRaises(ValueError):
+            list(read_players(io.StringIO("{}\nnot json\n"), "ndjson"))
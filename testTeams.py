@@ -0,0 +1,76 @@
+import random
+import unittest
+from elo import BASE_RATING
+from leaderboard import Leaderboard
+from teams import Team, TeamBoard
+
+
+class TestTeamBoard(unittest.TestCase):
+    """Unit tests for incrementally maintained team ratings."""
+
+    def setUp(self):
+        self.lb = Leaderboard("Teams")
+        for name in ["alice", "bob", "carol", "dave", "eve"]:
+            self.lb.add_player(name)
+        self.teams = TeamBoard.from_dicts(self.lb, [
+            {"teamName": "Thunder", "members": ["alice", "bob"], "winRecord": 6, "lossRecord": 2, "rating": 1550},
+            {"teamName": "Lightning", "members": ["carol", "dave"]},
+            {"teamName": "Mixed", "members": ["alice", "carol", "zed"]},
+        ])
+
+    def assertRatingsMatchMembers(self):
+        for team in self.teams.standings():
+            present = [self.lb.get_player(m).rating for m in team.members if self.lb.get_player(m)]
+            expected = sum(present) / len(present) if present else BASE_RATING
+            self.assertAlmostEqual(team.rating, expected, places=6)
+        ratings = [t.rating for t in self.teams.standings()]
+        self.assertEqual(ratings, sorted(ratings, reverse=True))
+
+    def test_ratings_follow_member_changes(self):
+        """Single matches, batches, record updates and removals all reach the team aggregates."""
+        rng = random.Random(3)
+        names = ["alice", "bob", "carol", "dave", "eve"]
+        for _ in range(50):
+            w, l = rng.sample(names, 2)
+            self.lb.record_match(w, l)
+        self.assertRatingsMatchMembers()
+        self.lb.record_matches([tuple(rng.sample(names, 2)) for _ in range(100)])
+        self.assertRatingsMatchMembers()
+        self.lb.get_player("bob").update_records(3, 9, 1234.5)
+        self.assertRatingsMatchMembers()
+        self.lb.remove_player("alice")
+        self.assertRatingsMatchMembers()
+        self.lb.add_player("zed").rating = 1900
+        self.assertRatingsMatchMembers()
+        self.assertEqual(self.teams.rank("Mixed"), 1)
+
+    def test_team_match_moves_member_ratings(self):
+        version = self.teams.version
+        result = self.teams.record_team_match("Lightning", "Thunder")
+        self.assertEqual(result["delta"], 16.0)
+        self.assertEqual(self.lb.get_player("carol").rating, 1516.0)
+        self.assertEqual(self.lb.get_player("bob").rating, 1484.0)
+        self.assertEqual((self.teams.get_team("Lightning").winRecord, self.teams.get_team("Thunder").lossRecord), (1, 3))
+        self.assertEqual(self.teams.rank("Lightning"), 1)
+        self.assertGreater(self.teams.version, version)
+        self.assertRatingsMatchMembers()
+
+        with self.assertRaises(ValueError):
+            self.teams.record_team_match("Mixed", "Thunder")
+        with self.assertRaises(KeyError):
+            self.teams.record_team_match("Nobody", "Thunder")
+
+    def test_add_and_remove_teams(self):
+        with self.assertRaises(ValueError):
+            self.teams.add_team(Team("Thunder", []))
+        self.teams.add_team(Team("Solo", ["eve"]))
+        self.assertEqual([t.name for t in self.teams.teams_of("eve")], ["Solo"])
+        self.teams.remove_team("Solo")
+        self.assertEqual(len(self.teams), 3)
+        self.lb.record_match("eve", "dave")
+        self.assertRatingsMatchMembers()
+        # a closed board stops following the players
+        self.teams.close()
+        before = self.teams.get_team("Lightning").rating
+        self.lb.record_match("carol", "eve")
+        self.assertEqual(self.teams.get_team("Lightning").rating, before)
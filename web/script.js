@@ -14,7 +14,17 @@ const statusEl = document.getElementById('status');
 const tbody = document.querySelector('#leaderboard tbody');
 const refreshBtn = document.getElementById('refreshBtn');
 
-let currentPlayers = []; // store players fetched from backend
+let currentPlayers = []; // players on the page currently shown
+
+// The server pages the standings, so only the visible rows are fetched.
+const PAGE_SIZE = 25;
+let pageOffset = 0;
+let totalPlayers = 0;
+
+// Live updates: /events pushes deltas that apply on top of boardVersion.
+let liveSource = null;
+let boardVersion = null;
+const rowEls = new Map(); // player name -> <tr>
 
 function setStatus(msg, isError = false) {
   statusEl.textContent = msg;
@@ -26,47 +36,129 @@ function computeWinRate(p) {
   return total === 0 ? 0 : p.winRecord / total;
 }
 
-function sortPlayers(players) {
-  return players.sort((a, b) => {
-    if (b.rating !== a.rating) return b.rating - a.rating;
-    const wb = computeWinRate(b), wa = computeWinRate(a);
-    if (wb !== wa) return wb - wa;
-    if (b.winRecord !== a.winRecord) return b.winRecord - a.winRecord;
-    if (a.lossRecord !== b.lossRecord) return a.lossRecord - b.lossRecord;
-    return a.name.localeCompare(b.name);
-  });
+function setCell(td, text) {
+  if (td.textContent !== text) td.textContent = text;
 }
 
+// Patch the table in place: rows are reused by player name and only
+// cells whose text changed are touched.
 function render(players) {
-  tbody.innerHTML = '';
-  players.forEach((p, i) => {
-    const tr = document.createElement('tr');
-
-    tr.innerHTML = `
-      <td class="rank">${i + 1}</td>
-      <td class="name">${p.name}</td>
-      <td>${p.rating.toFixed(0)}</td>
-      <td>${p.winRecord}</td>
-      <td>${p.lossRecord}</td>
-      <td>${(computeWinRate(p) * 100).toFixed(1)}%</td>
-    `;
-    tbody.appendChild(tr);
+  const keep = new Set();
+  players.forEach((p) => {
+    let tr = rowEls.get(p.name);
+    if (!tr) {
+      tr = document.createElement('tr');
+      tr.innerHTML = '<td class="rank"></td><td class="name"></td><td></td><td></td><td></td><td></td>';
+      tr.cells[1].textContent = p.name;
+      rowEls.set(p.name, tr);
+    }
+    setCell(tr.cells[0], String(p.rank));
+    setCell(tr.cells[2], p.rating.toFixed(0));
+    setCell(tr.cells[3], String(p.winRecord));
+    setCell(tr.cells[4], String(p.lossRecord));
+    setCell(tr.cells[5], `${(computeWinRate(p) * 100).toFixed(1)}%`);
+    tbody.appendChild(tr); // moves existing rows into standings order
+    keep.add(p.name);
   });
+  for (const [name, tr] of rowEls) {
+    if (!keep.has(name)) {
+      tr.remove();
+      rowEls.delete(name);
+    }
+  }
+}
+
+function renderPager() {
+  const lastPage = Math.max(0, Math.ceil(totalPlayers / PAGE_SIZE) - 1);
+  const page = Math.floor(pageOffset / PAGE_SIZE);
+  document.getElementById('pageInfo').textContent = `Page ${page + 1} of ${lastPage + 1}`;
+  document.getElementById('prevPageBtn').disabled = page <= 0;
+  document.getElementById('nextPageBtn').disabled = page >= lastPage;
 }
 
 async function fetchPlayers() {
   try {
-    const res = await fetch("/players");
-    const players = await res.json();
-    currentPlayers = players;
-    render(sortPlayers(players));
-    setStatus(`Loaded ${players.length} players.`);
+    const live = liveSource && liveSource.readyState === EventSource.OPEN ? '&live=1' : '';
+    const res = await fetch(`/players?offset=${pageOffset}&limit=${PAGE_SIZE}${live}`);
+    const data = await res.json();
+    totalPlayers = data.total;
+    boardVersion = live ? data.version : null;
+    // the board may have shrunk under us; step back to the last page
+    if (pageOffset > 0 && pageOffset >= totalPlayers) {
+      pageOffset = Math.max(0, (Math.ceil(totalPlayers / PAGE_SIZE) - 1) * PAGE_SIZE);
+      return fetchPlayers();
+    }
+    currentPlayers = data.players;
+    render(currentPlayers);
+    renderPager();
+    setStatus(`Loaded ${currentPlayers.length} of ${totalPlayers} players.`);
   } catch (err) {
     console.error(err);
     setStatus('Failed to load players: ' + err.message, true);
   }
 }
 
+// Rank of an unchanged player after a delta: unchanged players keep their
+// relative order and fill the ranks the changed players do not occupy.
+function shiftedRank(rank, prevRanks, newRanks) {
+  let pos = rank - prevRanks.filter((r) => r < rank).length;
+  for (const r of newRanks) {
+    if (r > pos) break;
+    pos += 1;
+  }
+  return pos;
+}
+
+function applyDelta(delta) {
+  if (boardVersion === null || delta.version <= boardVersion) return;
+  if (delta.baseVersion !== boardVersion) {
+    fetchPlayers(); // missed a delta
+    return;
+  }
+  const changed = new Map(delta.players.map((p) => [p.name, p]));
+  const prevRanks = delta.players.filter((p) => p.prevRank !== null).map((p) => p.prevRank);
+  const newRanks = delta.players.filter((p) => p.rank !== null).map((p) => p.rank).sort((a, b) => a - b);
+  const rows = currentPlayers
+    .filter((p) => !changed.has(p.name))
+    .map((p) => ({ ...p, rank: shiftedRank(p.rank, prevRanks, newRanks) }))
+    .concat(delta.players.filter((p) => p.rank !== null));
+
+  const first = pageOffset + 1;
+  const page = rows
+    .filter((p) => p.rank >= first && p.rank < first + PAGE_SIZE)
+    .sort((a, b) => a.rank - b.rank);
+  totalPlayers = delta.total;
+  boardVersion = delta.version;
+  // rows that shifted in from a neighbouring page are not known here
+  const expected = Math.max(0, Math.min(PAGE_SIZE, totalPlayers - pageOffset));
+  if (page.length !== expected || page.some((p, i) => p.rank !== first + i)) {
+    fetchPlayers();
+    return;
+  }
+  currentPlayers = page;
+  render(currentPlayers);
+  renderPager();
+}
+
+function connectLive() {
+  if (!window.EventSource) return;
+  liveSource = new EventSource('/events');
+  // every (re)connect starts with a reset: reload the page the deltas apply to
+  liveSource.addEventListener('reset', () => fetchPlayers());
+  liveSource.addEventListener('delta', (e) => applyDelta(JSON.parse(e.data)));
+  liveSource.onerror = () => { boardVersion = null; };
+}
+
+// With the live channel open, the pushed delta updates the table.
+async function refreshAfterWrite() {
+  if (!liveSource || liveSource.readyState !== EventSource.OPEN) await fetchPlayers();
+}
+
+function changePage(delta) {
+  pageOffset = Math.max(0, pageOffset + delta * PAGE_SIZE);
+  fetchPlayers();
+}
+
 async function addPlayer() {
   const name = document.getElementById('newName').value.trim();
   const wins = Number(document.getElementById('newWins').value || 0);
@@ -85,8 +177,7 @@ async function addPlayer() {
     });
 
     const newPlayer = await res.json();
-    currentPlayers.push(newPlayer);
-    render(sortPlayers(currentPlayers));
+    await refreshAfterWrite();
     setStatus(`Added player '${newPlayer.name}' with rating ${newPlayer.rating.toFixed(0)}`);
   } catch (err) {
     console.error(err);
@@ -99,6 +190,8 @@ async function addPlayer() {
 }
 
 refreshBtn.addEventListener('click', fetchPlayers);
+document.getElementById('prevPageBtn').addEventListener('click', () => changePage(-1));
+document.getElementById('nextPageBtn').addEventListener('click', () => changePage(1));
 document.getElementById('addPlayerBtn').addEventListener('click', addPlayer);
 
 // In script.js
@@ -128,8 +221,8 @@ async function updatePlayer() {
 
         const updatedPlayer = await res.json();
         
-        // Refresh the entire list to show the new standings/rating
-        await fetchPlayers(); 
+        // Refresh the list to show the new standings/rating
+        await refreshAfterWrite();
         
         setStatus(`Updated records for '${updatedPlayer.name}'. New rating: ${updatedPlayer.rating.toFixed(0)}`);
     } catch (err) {
@@ -172,7 +265,7 @@ async function removePlayer() {
         }
 
         // Refresh the leaderboard to reflect the removal
-        await fetchPlayers();
+        await refreshAfterWrite();
 
         setStatus(`Successfully removed '${name}' from the leaderboard.`);
     } catch (err) {
@@ -188,4 +281,5 @@ async function removePlayer() {
 document.getElementById('removePlayerBtn').addEventListener('click', removePlayer);
 
 // initial load
+connectLive();
 fetchPlayers();
\ No newline at end of file